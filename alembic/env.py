@@ -21,11 +21,26 @@ fileConfig(config.config_file_name)
 from app.utils.config import settings # noqa
 # Import models explicitly to register with SQLModel.metadata
 from app.apis.users.models import User, Role  # Import your models
-from app.apis.products.models import Product  # Import your models
+from app.apis.products.models import Product, ProductListing, ProductTombstone  # Import your models
+from app.apis.orders.models import Order, OrderIdempotencyKey, OrderItem  # Import your models
+from app.apis.inventory.models import InventoryShard  # Import your models
+from app.apis.events.models import OutboxEvent  # Import your models
+from app.apis.orders.partitions import is_partition
 from sqlmodel import SQLModel
 
 target_metadata = SQLModel.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip monthly order partitions, they are managed at runtime."""
+    if type_ == "table":
+        return not is_partition(name)
+    if type_ == "index":
+        return not is_partition(object.table.name)
+    if type_ == "foreign_key_constraint":
+        return not is_partition(object.referred_table.name)
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,7 +65,11 @@ def run_migrations_offline():
     """
     url = get_url()
     context.configure(
-        url=url, target_metadata=target_metadata, literal_binds=True, compare_type=True
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -74,7 +93,10 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata, compare_type=True
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
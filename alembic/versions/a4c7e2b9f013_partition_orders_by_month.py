@@ -0,0 +1,158 @@
+"""partition orders by month
+
+Revision ID: a4c7e2b9f013
+Revises: 8d2f6a0c3e91
+Create Date: 2026-10-19 15:42:18.207314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2b9f013'
+down_revision: Union[str, None] = '8d2f6a0c3e91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Monthly partitions from the oldest existing order through three months
+# ahead; later months are created by app.apis.orders.partitions
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month timestamp;
+BEGIN
+    FOR month IN SELECT generate_series(
+        date_trunc('month', LEAST((SELECT min(created_at) FROM order_unpartitioned), now() AT TIME ZONE 'utc')),
+        date_trunc('month', now() AT TIME ZONE 'utc') + interval '3 months',
+        interval '1 month'
+    ) LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF "order" FOR VALUES FROM (%L) TO (%L)',
+                       'order_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month');
+        EXECUTE format('CREATE TABLE %I PARTITION OF orderitem FOR VALUES FROM (%L) TO (%L)',
+                       'orderitem_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month');
+    END LOOP;
+END $$;
+"""
+
+
+def _rename_tables(suffix: str) -> None:
+    op.execute(f'ALTER TABLE orderitem RENAME TO orderitem_{suffix}')
+    op.execute(f'ALTER TABLE "order" RENAME TO order_{suffix}')
+    op.execute(f'ALTER INDEX orderitem_pkey RENAME TO orderitem_{suffix}_pkey')
+    op.execute(f'ALTER INDEX order_pkey RENAME TO order_{suffix}_pkey')
+
+
+def upgrade() -> None:
+    _rename_tables('unpartitioned')
+    op.drop_index('ix_orderitem_order_id', table_name='orderitem_unpartitioned')
+    op.drop_index('ix_order_user_id_idempotency_key', table_name='order_unpartitioned')
+    op.drop_index('ix_order_user_id_created_at', table_name='order_unpartitioned')
+
+    op.create_table('order',
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('idempotency_key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_order_created_at_brin', 'order', ['created_at'], unique=False, postgresql_using='brin')
+    op.create_index('ix_order_user_id_created_at', 'order', ['user_id', 'created_at'], unique=False)
+    op.create_table('orderitem',
+    sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('order_created_at', sa.DateTime(), nullable=False),
+    sa.Column('order_id', sa.Uuid(), nullable=False),
+    sa.Column('line', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Uuid(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id', 'order_created_at'], ['order.id', 'order.created_at'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'order_created_at'),
+    postgresql_partition_by='RANGE (order_created_at)'
+    )
+    op.create_index(op.f('ix_orderitem_order_id'), 'orderitem', ['order_id'], unique=False)
+    op.create_index('ix_orderitem_order_created_at_brin', 'orderitem', ['order_created_at'], unique=False, postgresql_using='brin')
+    op.create_table('orderidempotencykey',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('idempotency_key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('order_id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'idempotency_key')
+    )
+
+    op.execute(CREATE_PARTITIONS)
+    op.execute("""
+        INSERT INTO "order" (id, created_at, user_id, status, total, item_count, idempotency_key)
+        SELECT id, created_at, user_id, status, total, item_count, idempotency_key FROM order_unpartitioned
+    """)
+    op.execute("""
+        INSERT INTO orderitem (id, order_created_at, order_id, line, product_id, title, unit_price, quantity)
+        SELECT i.id, o.created_at, i.order_id, i.line, i.product_id, i.title, i.unit_price, i.quantity
+        FROM orderitem_unpartitioned i JOIN order_unpartitioned o ON o.id = i.order_id
+    """)
+    op.execute("""
+        INSERT INTO orderidempotencykey (user_id, idempotency_key, order_id, created_at)
+        SELECT user_id, idempotency_key, id, created_at FROM order_unpartitioned
+        WHERE idempotency_key IS NOT NULL
+    """)
+    op.drop_table('orderitem_unpartitioned')
+    op.drop_table('order_unpartitioned')
+
+
+def downgrade() -> None:
+    _rename_tables('partitioned')
+    op.drop_index('ix_orderitem_order_created_at_brin', table_name='orderitem_partitioned')
+    op.drop_index('ix_orderitem_order_id', table_name='orderitem_partitioned')
+    op.drop_index('ix_order_user_id_created_at', table_name='order_partitioned')
+    op.drop_index('ix_order_created_at_brin', table_name='order_partitioned')
+
+    op.create_table('order',
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.Column('total', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('idempotency_key', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_user_id_created_at', 'order', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_order_user_id_idempotency_key', 'order', ['user_id', 'idempotency_key'], unique=True)
+    op.create_table('orderitem',
+    sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('order_id', sa.Uuid(), nullable=False),
+    sa.Column('line', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Uuid(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_orderitem_order_id'), 'orderitem', ['order_id'], unique=False)
+
+    op.execute("""
+        INSERT INTO "order" (id, user_id, status, total, item_count, idempotency_key, created_at)
+        SELECT id, user_id, status, total, item_count, idempotency_key, created_at FROM order_partitioned
+    """)
+    op.execute("""
+        INSERT INTO orderitem (id, order_id, line, product_id, title, unit_price, quantity)
+        SELECT id, order_id, line, product_id, title, unit_price, quantity FROM orderitem_partitioned
+    """)
+    op.drop_table('orderidempotencykey')
+    op.drop_table('orderitem_partitioned')
+    op.drop_table('order_partitioned')
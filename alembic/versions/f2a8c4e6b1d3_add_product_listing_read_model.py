@@ -0,0 +1,105 @@
+"""add product listing read model
+
+Revision ID: f2a8c4e6b1d3
+Revises: e7b3d9f1a5c8
+Create Date: 2026-10-19 20:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8c4e6b1d3'
+down_revision: Union[str, None] = 'e7b3d9f1a5c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Current card of each product in :products, live ones only
+CARDS = """
+    SELECT p.id, p.owner_id, u.user_name, p.title, p.description, p.price,
+           (SELECT sum(s.available)::int FROM inventoryshard s WHERE s.product_id = p.id)
+    FROM {products} p
+    JOIN "user" u ON u.id = p.owner_id
+    WHERE p.deleted_at IS NULL
+"""
+
+# Upsert the cards of inserted and updated products, drop soft-deleted ones;
+# hard deletes cascade. One statement per write, for batches and imports alike
+UPSERT_CARDS = f"""
+CREATE FUNCTION productlisting_upsert() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM productlisting l USING changed c WHERE l.id = c.id AND c.deleted_at IS NOT NULL;
+    INSERT INTO productlisting (id, owner_id, owner_name, title, description, price, stock)
+    {CARDS.format(products="changed")}
+    ON CONFLICT (id) DO UPDATE SET
+        owner_id = EXCLUDED.owner_id, owner_name = EXCLUDED.owner_name, title = EXCLUDED.title,
+        description = EXCLUDED.description, price = EXCLUDED.price, stock = EXCLUDED.stock
+    WHERE (productlisting.owner_id, productlisting.owner_name, productlisting.title,
+           productlisting.description, productlisting.price, productlisting.stock)
+        IS DISTINCT FROM (EXCLUDED.owner_id, EXCLUDED.owner_name, EXCLUDED.title,
+                          EXCLUDED.description, EXCLUDED.price, EXCLUDED.stock);
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER productlisting_insert AFTER INSERT ON product
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION productlisting_upsert();
+
+CREATE TRIGGER productlisting_update AFTER UPDATE ON product
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION productlisting_upsert();
+"""
+
+RENAME_OWNER = """
+CREATE FUNCTION productlisting_owner_name() RETURNS trigger AS $$
+BEGIN
+    UPDATE productlisting SET owner_name = NEW.user_name WHERE owner_id = NEW.id;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER productlisting_owner_name AFTER UPDATE OF user_name ON "user"
+    FOR EACH ROW WHEN (OLD.user_name IS DISTINCT FROM NEW.user_name)
+    EXECUTE FUNCTION productlisting_owner_name();
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('productlisting',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('owner_id', sa.Uuid(), nullable=False),
+    sa.Column('owner_name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+    sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=True),
+    sa.Column('stock', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_productlisting_owner_id_title_id', 'productlisting', ['owner_id', 'title', 'id'], unique=False, postgresql_include=['owner_name', 'description', 'price', 'stock'])
+    op.create_index('ix_productlisting_title_id', 'productlisting', ['title', 'id'], unique=False, postgresql_include=['owner_id', 'owner_name', 'description', 'price', 'stock'])
+    # ### end Alembic commands ###
+    op.execute(
+        "INSERT INTO productlisting (id, owner_id, owner_name, title, description, price, stock)"
+        + CARDS.format(products="product")
+    )
+    op.execute(UPSERT_CARDS)
+    op.execute(RENAME_OWNER)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER productlisting_owner_name ON "user"')
+    op.execute("DROP FUNCTION productlisting_owner_name()")
+    op.execute("DROP TRIGGER productlisting_update ON product")
+    op.execute("DROP TRIGGER productlisting_insert ON product")
+    op.execute("DROP FUNCTION productlisting_upsert()")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_productlisting_title_id', table_name='productlisting', postgresql_include=['owner_id', 'owner_name', 'description', 'price', 'stock'])
+    op.drop_index('ix_productlisting_owner_id_title_id', table_name='productlisting', postgresql_include=['owner_name', 'description', 'price', 'stock'])
+    op.drop_table('productlisting')
+    # ### end Alembic commands ###
@@ -6,7 +6,8 @@ from typing import Optional
 from app.utils.database  import SessionDep
 from sqlmodel import  select
 from app.apis.users.models import User
-from app.utils.security import create_access_token,  get_user_permissions_raw, verify_password
+from app.apis.users.cache import lookup_by_email
+from app.utils.security import create_access_token,  get_user_permissions, verify_password
 from app.utils.logging_utitl import logger
 # ---------- User Services ----------
 
@@ -35,7 +36,7 @@ def authenticate_user(email: str, password: str, session: SessionDep, expires_de
     
 
     # Get user's permissions
-    permissions = get_user_permissions_raw(str(user.id), session)
+    permissions = get_user_permissions(str(user.id), session)
     logger.info(f"User permissions: {permissions}")
     
     # Create token with permissions baked in
@@ -70,7 +71,7 @@ def authenticate_user_otp(email: str, session: SessionDep, expires_delta: timede
     
 
     # Get user's permissions
-    permissions = get_user_permissions_raw(str(user.id), session)
+    permissions = get_user_permissions(str(user.id), session)
     logger.info(f"User permissions: {permissions}")
     
     # Create token with permissions baked in
@@ -83,8 +84,8 @@ def authenticate_user_otp(email: str, session: SessionDep, expires_delta: timede
 
 
 def get_user_by_mail(session: SessionDep, email: str) -> User:
-    """Fetch a User by email from the database."""
-    return session.exec(select(User).where(User.email == email)).first()
+    """Fetch a User by email from the database, skipping emails known not to exist."""
+    return lookup_by_email(email, lambda: session.exec(select(User).where(User.email == email)).first())
 
 
 
@@ -0,0 +1,175 @@
+"""
+Consumer groups reading domain events from Redis Streams.
+
+Each ConsumerGroup is one independent subscriber (emails, indexing,
+analytics...) with its own position in the streams; run several worker
+processes of a group to share its load. A message is acknowledged only
+after its handler returns, so a crash leaves it pending and another worker
+reclaims it after EVENT_CLAIM_IDLE_MS: delivery is at least once, and
+handlers must tolerate duplicates. Messages that keep failing are moved to
+the dead-letter stream after EVENT_MAX_DELIVERIES attempts.
+"""
+import time
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+from redis.exceptions import RedisError, ResponseError
+
+from app.apis.events.models import StreamEvent
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+
+DEAD_LETTER_STREAM = "events:dead"
+
+Handler = Callable[[StreamEvent], None]
+
+
+class ConsumerGroup:
+    """
+    Args:
+        name: Group name, unique per subscriber
+        streams: Streams to read, e.g. ["events:user", "events:product"]
+        handler: Called once per event; raise to have it retried
+    """
+
+    def __init__(self, name: str, streams: list[str], handler: Handler) -> None:
+        self.name = name
+        self.streams = streams
+        self.handler = handler
+        consumer_groups[name] = self
+
+    def ensure(self) -> None:
+        """
+        Create the group on each stream, starting from its oldest entry.
+        """
+        for stream in self.streams:
+            try:
+                redis_client.xgroup_create(stream, self.name, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def _handle(self, stream: str, message_id: str, fields: dict[str, str]) -> bool:
+        try:
+            event = StreamEvent(
+                id=int(fields["id"]),
+                type=fields["type"],
+                aggregate_id=fields["aggregate_id"],
+                payload=orjson.loads(fields["payload"]),
+                created_at=fields["created_at"],
+                stream=stream,
+                message_id=message_id,
+            )
+            self.handler(event)
+        except Exception as e:
+            logger.error(f"Consumer {self.name} failed on {stream} {message_id}: {e}")
+            return False
+        redis_client.xack(stream, self.name, message_id)
+        return True
+
+    def reclaim(self, consumer: str) -> int:
+        """
+        Retry messages other consumers left unacknowledged for too long, and
+        dead-letter those that failed EVENT_MAX_DELIVERIES times.
+
+        Returns:
+            Number of messages handled successfully
+        """
+        handled = 0
+        for stream in self.streams:
+            stale = redis_client.xpending_range(
+                stream, self.name, min="-", max="+", count=100, idle=settings.EVENT_CLAIM_IDLE_MS
+            )
+            retry = []
+            for entry in stale:
+                if entry["times_delivered"] >= settings.EVENT_MAX_DELIVERIES:
+                    self._dead_letter(stream, entry["message_id"])
+                else:
+                    retry.append(entry["message_id"])
+            if not retry:
+                continue
+            for message_id, fields in redis_client.xclaim(
+                stream, self.name, consumer, settings.EVENT_CLAIM_IDLE_MS, retry
+            ):
+                # Trimmed from the stream meanwhile
+                if fields:
+                    handled += self._handle(stream, message_id, fields)
+                else:
+                    redis_client.xack(stream, self.name, message_id)
+        return handled
+
+    def _dead_letter(self, stream: str, message_id: str) -> None:
+        entries = redis_client.xrange(stream, min=message_id, max=message_id)
+        fields = entries[0][1] if entries else {}
+        pipeline = redis_client.pipeline()
+        pipeline.xadd(
+            DEAD_LETTER_STREAM,
+            {**fields, "group": self.name, "stream": stream, "message_id": message_id},
+            maxlen=settings.EVENT_STREAM_MAXLEN,
+            approximate=True,
+        )
+        pipeline.xack(stream, self.name, message_id)
+        pipeline.execute()
+        logger.error(f"Consumer {self.name} gave up on {stream} {message_id}, moved to {DEAD_LETTER_STREAM}")
+
+    def poll(self, consumer: str, count: int = 100, block_ms: int = 5000) -> int:
+        """
+        Read and handle up to count new messages, waiting up to block_ms for them.
+
+        Returns:
+            Number of messages handled successfully
+        """
+        response = redis_client.xreadgroup(
+            self.name, consumer, {stream: ">" for stream in self.streams}, count=count, block=block_ms
+        )
+        handled = 0
+        for stream, messages in response or []:
+            for message_id, fields in messages:
+                handled += self._handle(stream, message_id, fields)
+        return handled
+
+    def run(self, consumer: str) -> None:
+        """
+        Consume forever as consumer, one name per worker process.
+        """
+        self.ensure()
+        last_reclaim = 0.0
+        while True:
+            try:
+                if time.monotonic() - last_reclaim > settings.EVENT_CLAIM_IDLE_MS / 1000:
+                    self.reclaim(consumer)
+                    last_reclaim = time.monotonic()
+                self.poll(consumer)
+            except RedisError as e:
+                logger.error(f"Consumer {self.name} lost Redis, retrying: {e}")
+                time.sleep(1)
+
+
+consumer_groups: dict[str, ConsumerGroup] = {}
+
+
+def consumer_lag() -> dict[str, dict[str, dict[str, Any]]]:
+    """
+    Per group and stream: messages not yet delivered (lag; None when Redis
+    can't tell, e.g. after trimming), delivered but unacknowledged
+    (pending), and the number of consumers.
+    """
+    stats: dict[str, dict[str, dict[str, Any]]] = {}
+    for group in consumer_groups.values():
+        stats[group.name] = {}
+        for stream in group.streams:
+            try:
+                info = next(
+                    (g for g in redis_client.xinfo_groups(stream) if g["name"] == group.name), None
+                )
+            except ResponseError:
+                # Stream doesn't exist yet
+                info = None
+            stats[group.name][stream] = {
+                "lag": info.get("lag") if info else None,
+                "pending": info["pending"] if info else 0,
+                "consumers": info["consumers"] if info else 0,
+            }
+    return stats
@@ -0,0 +1,73 @@
+"""
+Consumer groups shipped with the app; run one with
+python -m app.scripts.event_worker <group>.
+"""
+from sqlmodel import Session
+
+from app.apis.events.consumers import ConsumerGroup, consumer_groups  # noqa: F401
+from app.apis.events.models import StreamEvent
+from app.apis.inventory.services import get_stock_with_owner
+from app.apis.messaging.services import publish_to_topic, publish_to_user
+from app.apis.products.listing import refresh_stock
+from app.utils.database import engine
+from app.utils.redis_db import redis_client
+
+ANALYTICS_RETENTION = 90 * 24 * 3600
+
+
+def count_event(event: StreamEvent) -> None:
+    """
+    Daily counts per event type in analytics:events:<YYYY-MM-DD>. A
+    redelivered event is counted once.
+    """
+    if not redis_client.set(f"analytics:seen:{event.id}", 1, nx=True, ex=24 * 3600):
+        return
+    key = f"analytics:events:{event.created_at:%Y-%m-%d}"
+    pipeline = redis_client.pipeline()
+    pipeline.hincrby(key, event.type, 1)
+    pipeline.expire(key, ANALYTICS_RETENTION)
+    pipeline.execute()
+
+
+analytics = ConsumerGroup(
+    "analytics", ["events:user", "events:product", "events:order", "events:inventory"], count_event
+)
+
+
+def notify(event: StreamEvent) -> None:
+    """
+    Push changes to connected WebSocket and SSE clients: order and account
+    changes to their user, stock levels to the product's owner, product
+    changes to the product's topic.
+    """
+    if event.type.startswith("order."):
+        publish_to_user(event.payload["user_id"], event.type, {"order_id": str(event.aggregate_id), **event.payload})
+    elif event.type in ("user.updated", "user.deleted"):
+        publish_to_user(event.aggregate_id, event.type, event.payload)
+    elif event.type in ("product.updated", "product.deleted"):
+        publish_to_topic(f"product:{event.aggregate_id}", event.type, event.payload)
+    elif event.type == "inventory.changed":
+        with Session(engine) as session:
+            stock = get_stock_with_owner(session, event.aggregate_id)
+        if stock:
+            owner_id, level = stock
+            publish_to_user(owner_id, "stock.updated", level.model_dump(mode="json"))
+
+
+notifications = ConsumerGroup(
+    "notifications", ["events:user", "events:product", "events:order", "events:inventory"], notify
+)
+
+
+def update_listing_stock(event: StreamEvent) -> None:
+    """
+    Keep the stock on product listing cards current. Reads the level when
+    handled, so redelivered and out of order events are harmless.
+    """
+    if event.type == "inventory.changed":
+        with Session(engine) as session:
+            refresh_stock(session, [event.aggregate_id])
+            session.commit()
+
+
+listings = ConsumerGroup("listings", ["events:inventory"], update_listing_stock)
@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+# ---------- Event Models ----------
+"""
+Domain events are written to the outbox table in the same transaction as
+the change they describe, so an event exists if and only if the change was
+committed. The relay then moves them to Redis Streams.
+"""
+
+
+class OutboxEvent(SQLModel, table=True):
+    # Sequential, and the relay publishes in id order. Ids are taken at insert,
+    # not at commit, so an event of a transaction that commits late can follow
+    # events with higher ids: consumers must not rely on commit order
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    # "<aggregate>.<what happened>", e.g. "user.registered"; the aggregate
+    # picks the stream
+    event_type: str = Field(max_length=64)
+    aggregate_id: uuid.UUID
+    payload: dict[str, Any] = Field(default_factory=dict, sa_type=JSONB)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
+# An event as read back from its stream
+class StreamEvent(SQLModel):
+    id: int
+    type: str
+    aggregate_id: uuid.UUID
+    payload: dict[str, Any]
+    created_at: datetime
+    # Redis stream entry, what gets acknowledged
+    stream: str
+    message_id: str
@@ -0,0 +1,132 @@
+"""
+Transactional outbox and its relay to Redis Streams.
+
+Writes call record_event() before committing, inside the same transaction,
+instead of doing side effects in the request. The relay locks a batch of
+outbox rows, appends them to the stream of their aggregate
+("events:<aggregate>") with one pipelined round-trip, and deletes them in
+the same transaction. Delivery is at least once: if the relay dies after
+XADD but before its commit, the batch is published again, so consumers
+dedupe on the event id when a duplicate matters.
+"""
+import time
+import uuid
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlalchemy import insert
+from sqlmodel import Session, delete, func, select
+
+from app.apis.events.models import OutboxEvent
+from app.utils.config import settings
+from app.utils.database import engine
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+
+STREAM_PREFIX = "events:"
+
+
+def stream_for(event_type: str) -> str:
+    return STREAM_PREFIX + event_type.split(".", 1)[0]
+
+
+def record_event(
+    session: Session, event_type: str, aggregate_id: uuid.UUID, payload: dict[str, Any] | None = None
+) -> None:
+    """
+    Add an event to the caller's transaction; it is published once that commits.
+
+    Args:
+        event_type: "<aggregate>.<what happened>", e.g. "product.created"
+        aggregate_id: Id of the changed row
+        payload: JSON-serializable details consumers need without a lookup
+    """
+    session.add(OutboxEvent(event_type=event_type, aggregate_id=aggregate_id, payload=payload or {}))
+
+
+def record_events(
+    session: Session, event_type: str, events: list[tuple[uuid.UUID, dict[str, Any]]]
+) -> None:
+    """
+    Add one event per (aggregate_id, payload) pair with a single executemany
+    INSERT, for batch writes.
+    """
+    if events:
+        session.execute(
+            insert(OutboxEvent),
+            [
+                {"event_type": event_type, "aggregate_id": aggregate_id, "payload": payload,
+                 "created_at": datetime.utcnow()}
+                for aggregate_id, payload in events
+            ],
+        )
+
+
+def _message(event: OutboxEvent) -> dict[str, str]:
+    return {
+        "id": str(event.id),
+        "type": event.event_type,
+        "aggregate_id": str(event.aggregate_id),
+        "payload": orjson.dumps(event.payload).decode(),
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def relay_batch(session: Session, batch_size: int | None = None) -> int:
+    """
+    Publish the oldest unpublished events and remove them from the outbox.
+    Relays running in parallel take different rows.
+
+    Returns:
+        Number of events published
+    """
+    events = session.exec(
+        select(OutboxEvent)
+        .order_by(OutboxEvent.id)
+        .limit(batch_size or settings.EVENT_RELAY_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not events:
+        session.rollback()
+        return 0
+
+    pipeline = redis_client.pipeline(transaction=False)
+    for event in events:
+        pipeline.xadd(
+            stream_for(event.event_type),
+            _message(event),
+            maxlen=settings.EVENT_STREAM_MAXLEN,
+            approximate=True,
+        )
+    pipeline.execute()
+    session.exec(delete(OutboxEvent).where(OutboxEvent.id.in_([event.id for event in events])))
+    session.commit()
+    return len(events)
+
+
+def run_relay(interval: float | None = None) -> None:
+    """
+    Relay forever: back to back while there is a backlog, polling every
+    interval seconds once it is drained.
+    """
+    interval = settings.EVENT_RELAY_INTERVAL if interval is None else interval
+    while True:
+        try:
+            with Session(engine) as session:
+                while relay_batch(session) == settings.EVENT_RELAY_BATCH_SIZE:
+                    pass
+        except Exception as e:
+            logger.error(f"Outbox relay failed, retrying: {e}")
+        time.sleep(interval)
+
+
+def outbox_backlog(session: Session) -> dict[str, Any]:
+    """
+    Events waiting to be relayed, and the age in seconds of the oldest one.
+    """
+    count, oldest = session.execute(
+        select(func.count(), func.min(OutboxEvent.created_at)).select_from(OutboxEvent)
+    ).one()
+    age = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+    return {"pending": count, "oldest_seconds": round(age, 3)}
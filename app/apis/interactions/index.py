@@ -0,0 +1,197 @@
+"""
+In-memory drug interaction index.
+
+The dataset is a local CSV or NDJSON file of interacting ingredient pairs:
+ingredient_a, ingredient_b, severity (one of SEVERITIES) and description.
+It is loaded into an InteractionIndex, which keeps the pairs as sorted
+adjacency arrays, so checking a cart is one intersection of its
+ingredients with the neighbours of each of them, in memory: tens of
+microseconds for a typical cart.
+
+Every worker polls the file and, when it changed, builds a new index next
+to the current one and swaps the module reference; requests keep the index
+they started with, so a check never sees half a dataset. A file that fails
+to load leaves the current index in place.
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Any, BinaryIO
+
+from app.apis.products.utils import FileFormat, detect_format, iter_rows
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+
+# Least severe first; indexes store the position
+SEVERITIES = ("minor", "moderate", "major", "contraindicated")
+
+# (code a, code b, severity, description)
+Interaction = tuple[str, str, int, str]
+
+
+def normalize_code(code: str) -> str:
+    return code.strip().upper()
+
+
+class InteractionIndex:
+    """
+    Interacting ingredient pairs in compressed sparse row form. Ingredients
+    get dense ids in code order; the neighbours of ingredient i are
+    neighbors[offsets[i]:offsets[i + 1]], sorted, and records[k] is the
+    interaction (severity and description) of the pair at neighbors[k].
+    """
+
+    def __init__(self, interactions: dict[tuple[str, str], tuple[int, str]], version: str) -> None:
+        self.version = version
+        self.codes = sorted({code for pair in interactions for code in pair})
+        self.ids = {code: id for id, code in enumerate(self.codes)}
+        self.severities = array("B")
+        self.descriptions: list[str] = []
+
+        adjacency: list[list[tuple[int, int]]] = [[] for _ in self.codes]
+        for record, ((a, b), (severity, description)) in enumerate(interactions.items()):
+            self.severities.append(severity)
+            self.descriptions.append(description)
+            adjacency[self.ids[a]].append((self.ids[b], record))
+            adjacency[self.ids[b]].append((self.ids[a], record))
+
+        self.offsets = array("I", [0])
+        self.neighbors = array("I")
+        self.records = array("I")
+        for pairs in adjacency:
+            pairs.sort()
+            self.neighbors.extend(neighbor for neighbor, _ in pairs)
+            self.records.extend(record for _, record in pairs)
+            self.offsets.append(len(self.neighbors))
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.ids
+
+    def check(self, codes: Iterable[str]) -> list[Interaction]:
+        """
+        Interactions between any two of codes, codes the dataset doesn't
+        know are ignored. Each pair is reported once, codes in order.
+        """
+        ids = {self.ids[code] for code in codes if code in self.ids}
+        found = []
+        for a in sorted(ids):
+            start, end = self.offsets[a], self.offsets[a + 1]
+            # One set intersection per ingredient rather than a lookup per
+            # pair: the loop runs in C, and only hits come back to Python
+            for b in sorted(ids.intersection(self.neighbors[start:end])):
+                if b > a:
+                    record = self.records[bisect_left(self.neighbors, b, start, end)]
+                    found.append((self.codes[a], self.codes[b], self.severities[record], self.descriptions[record]))
+        return found
+
+    def stats(self) -> dict[str, Any]:
+        return {"version": self.version, "ingredients": len(self.codes), "interactions": len(self)}
+
+
+def parse_dataset(stream: BinaryIO, fmt: FileFormat) -> tuple[dict[tuple[str, str], tuple[int, str]], int]:
+    """
+    Read interaction rows. A pair listed more than once keeps its most
+    severe interaction; pairs are keyed in code order.
+
+    Returns:
+        The interactions by pair, and the number of rows skipped as invalid
+    """
+    interactions: dict[tuple[str, str], tuple[int, str]] = {}
+    # Datasets repeat the same few descriptions for thousands of pairs
+    descriptions: dict[str, str] = {}
+    skipped = 0
+    for _, row, _ in iter_rows(stream, fmt):
+        try:
+            a = normalize_code(row["ingredient_a"])
+            b = normalize_code(row["ingredient_b"])
+            severity = SEVERITIES.index(str(row["severity"]).strip().lower())
+        except (TypeError, KeyError, AttributeError, ValueError):
+            skipped += 1
+            continue
+        if not a or not b or a == b:
+            skipped += 1
+            continue
+        description = str(row.get("description") or "")
+        description = descriptions.setdefault(description, description)
+        pair = (a, b) if a < b else (b, a)
+        if pair not in interactions or interactions[pair][0] < severity:
+            interactions[pair] = (severity, description)
+    return interactions, skipped
+
+
+def load_index(path: str) -> InteractionIndex:
+    """
+    Build an index from a dataset file; its version is a hash of the content.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    interactions, skipped = parse_dataset(io.BytesIO(data), detect_format(path) or "csv")
+    if skipped:
+        logger.warning(f"Skipped {skipped} invalid rows of interaction dataset {path}")
+    return InteractionIndex(interactions, hashlib.blake2b(data, digest_size=8).hexdigest())
+
+
+_index: InteractionIndex | None = None
+# (inode, size, mtime) of the loaded file
+_loaded_stat: tuple[int, int, int] | None = None
+
+
+def current_index() -> InteractionIndex | None:
+    return _index
+
+
+def _file_stat(path: str) -> tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def reload_index(path: str | None = None) -> InteractionIndex | None:
+    """
+    Load the dataset when the file changed since it was last loaded.
+
+    Returns:
+        The index now in use
+    """
+    global _index, _loaded_stat
+    path = path or settings.INTERACTIONS_DATASET_PATH
+    if not path:
+        return _index
+    before = _file_stat(path)
+    if before == _loaded_stat:
+        return _index
+    index = load_index(path)
+    # Rewritten while it was read: the next poll loads the finished file
+    if _file_stat(path) != before:
+        return _index
+    _index, _loaded_stat = index, before
+    logger.info(
+        f"Loaded interaction dataset {index.version}: {len(index.codes)} ingredients, {len(index)} interactions"
+    )
+    return index
+
+
+def _reload_forever() -> None:
+    while True:
+        try:
+            reload_index()
+        except Exception as e:
+            logger.error(f"Interaction dataset reload failed: {e}")
+        time.sleep(settings.INTERACTIONS_RELOAD_INTERVAL)
+
+
+def start_interaction_reloader() -> threading.Thread:
+    """
+    Load the dataset and keep following changes to the file in a daemon
+    thread.
+    """
+    thread = threading.Thread(target=_reload_forever, name="interaction-reloader", daemon=True)
+    thread.start()
+    return thread
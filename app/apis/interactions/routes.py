@@ -0,0 +1,90 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.apis.events.outbox import record_event
+from app.apis.interactions import services
+from app.apis.interactions.schemas import (
+    IngredientsUpdate,
+    InteractionCheckRequest,
+    InteractionCheckResponse,
+    ProductIngredients,
+)
+from app.apis.orders.services import merge_lines
+from app.apis.products.models import Product
+from app.apis.products.utils import can_access, invalidate_products
+from app.utils.database import SessionDep
+from app.utils.security import (
+    CurrentUser,
+    get_current_active_superuser,
+    get_current_user,
+)
+
+router = APIRouter(tags=["interactions"])
+
+
+@router.post(
+    "/cart/check-interactions",
+    dependencies=[Depends(get_current_user)],
+    response_model=InteractionCheckResponse,
+)
+def check_cart_interactions(session: SessionDep, check_in: InteractionCheckRequest) -> Any:
+    """
+    Check the products of a cart for interactions between their active
+    ingredients, most severe first. Answers 503 while no interaction dataset
+    is loaded.
+    """
+    return services.check_interactions(
+        session, list(merge_lines(check_in.items)), min_severity=check_in.min_severity
+    )
+
+
+def _get_product(session: SessionDep, product_id: uuid.UUID) -> Product:
+    product = session.get(Product, product_id)
+    if not product or product.deleted_at:
+        raise HTTPException(status_code=404, detail="product not found")
+    return product
+
+
+@router.get(
+    "/interactions/products/{product_id}",
+    dependencies=[Depends(get_current_user)],
+    response_model=ProductIngredients,
+)
+def read_product_ingredients(session: SessionDep, product_id: uuid.UUID) -> Any:
+    """
+    Get the active ingredient codes of a product.
+    """
+    return services.product_ingredients(_get_product(session, product_id))
+
+
+@router.put("/interactions/products/{product_id}", response_model=ProductIngredients)
+def update_product_ingredients(
+    session: SessionDep, current_user: CurrentUser, product_id: uuid.UUID, ingredients_in: IngredientsUpdate
+) -> Any:
+    """
+    Set the active ingredient codes of a product. Codes the interaction
+    dataset doesn't know are kept, and listed as unknown.
+    """
+    product = _get_product(session, product_id)
+    if not can_access(product.owner_id, current_user):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    product.ingredients = ingredients_in.ingredients
+    session.add(product)
+    record_event(
+        session, "product.updated", product_id, {"owner_id": str(product.owner_id), "fields": ["ingredients"]}
+    )
+    session.commit()
+    session.refresh(product)
+    invalidate_products([product_id])
+    return services.product_ingredients(product)
+
+
+@router.get("/interactions/dataset", dependencies=[Depends(get_current_active_superuser)])
+def read_interaction_dataset() -> Any:
+    """
+    Version and size of the interaction dataset loaded by this worker.
+    """
+    index = services.require_index()
+    return index.stats()
@@ -0,0 +1,64 @@
+import re
+import uuid
+from typing import Literal
+
+from pydantic import field_validator
+from sqlmodel import Field, SQLModel
+
+from app.apis.interactions.index import normalize_code
+from app.apis.orders.schemas import CheckoutItem
+from app.utils.config import settings
+
+# Ingredient codes, e.g. ATC "N02BA01" or "RXCUI:1191", stored upper case
+INGREDIENT_PATTERN = r"^[A-Z0-9][A-Z0-9._:-]{0,31}$"
+MAX_INGREDIENTS = 50
+
+Severity = Literal["minor", "moderate", "major", "contraindicated"]
+
+# ---------- Ingredient Schemas ----------
+
+
+class IngredientsUpdate(SQLModel):
+    ingredients: list[str] = Field(max_length=MAX_INGREDIENTS)
+
+    @field_validator("ingredients")
+    @classmethod
+    def check_codes(cls, codes: list[str]) -> list[str]:
+        codes = list(dict.fromkeys(normalize_code(code) for code in codes))
+        invalid = [code for code in codes if not re.match(INGREDIENT_PATTERN, code)]
+        if invalid:
+            raise ValueError(f"Invalid ingredient codes: {', '.join(invalid)}")
+        return codes
+
+
+class ProductIngredients(SQLModel):
+    product_id: uuid.UUID
+    ingredients: list[str]
+    # Codes the loaded interaction dataset doesn't know
+    unknown: list[str]
+
+
+# ---------- Interaction Check Schemas ----------
+
+
+class InteractionCheckRequest(SQLModel):
+    items: list[CheckoutItem] = Field(min_length=1, max_length=settings.ORDER_MAX_ITEMS)
+    min_severity: Severity = "minor"
+
+
+# Two products of the cart whose ingredients interact
+class InteractionFound(SQLModel):
+    product_ids: list[uuid.UUID]
+    ingredients: list[str]
+    severity: Severity
+    description: str
+
+
+class InteractionCheckResponse(SQLModel):
+    dataset_version: str
+    # Most severe first
+    interactions: list[InteractionFound]
+    # Not checked: ingredients the dataset doesn't know, and products
+    # without ingredients
+    unknown_ingredients: list[str]
+    unlinked_product_ids: list[uuid.UUID]
@@ -0,0 +1,90 @@
+import uuid
+
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.apis.interactions.index import SEVERITIES, InteractionIndex, current_index
+from app.apis.interactions.schemas import (
+    InteractionCheckResponse,
+    InteractionFound,
+    ProductIngredients,
+)
+from app.apis.products.models import Product
+
+
+def require_index() -> InteractionIndex:
+    """
+    Raises:
+        HTTPException: 503 until the interaction dataset is loaded
+    """
+    index = current_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Interaction dataset not loaded")
+    return index
+
+
+def product_ingredients(product: Product) -> ProductIngredients:
+    index = current_index()
+    return ProductIngredients(
+        product_id=product.id,
+        ingredients=product.ingredients,
+        unknown=[code for code in product.ingredients if index is not None and code not in index],
+    )
+
+
+def check_interactions(
+    session: Session, product_ids: list[uuid.UUID], min_severity: str = "minor"
+) -> InteractionCheckResponse:
+    """
+    Check the products of a cart for interactions between their ingredients.
+    Ingredients of the same product are not checked against each other.
+
+    Raises:
+        HTTPException: 503 without a dataset, 400 when a product doesn't
+        exist or was removed
+    """
+    index = require_index()
+    rows = session.exec(
+        select(Product.id, Product.ingredients).where(Product.id.in_(product_ids), Product.deleted_at.is_(None))
+    ).all()
+    ingredients = dict(rows)
+    missing = [str(id) for id in product_ids if id not in ingredients]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Products not available: {', '.join(missing)}")
+
+    # Products of each ingredient, in cart order
+    products: dict[str, list[uuid.UUID]] = {}
+    for id in product_ids:
+        for code in ingredients[id]:
+            products.setdefault(code, []).append(id)
+
+    threshold = SEVERITIES.index(min_severity)
+    position = {id: index for index, id in enumerate(product_ids)}
+    found = []
+    for a, b, severity, description in index.check(products):
+        if severity < threshold:
+            continue
+        # Two products that both hold a and b would otherwise be reported
+        # once per direction
+        pairs = {
+            tuple(sorted((first, second), key=position.__getitem__))
+            for first in products[a]
+            for second in products[b]
+            if first != second
+        }
+        found.extend(
+            InteractionFound(
+                product_ids=list(pair),
+                ingredients=[a, b],
+                severity=SEVERITIES[severity],
+                description=description,
+            )
+            for pair in sorted(pairs, key=lambda pair: (position[pair[0]], position[pair[1]]))
+        )
+    found.sort(key=lambda interaction: -SEVERITIES.index(interaction.severity))
+    return InteractionCheckResponse(
+        dataset_version=index.version,
+        interactions=found,
+        unknown_ingredients=sorted(code for code in products if code not in index),
+        unlinked_product_ids=[id for id in product_ids if not ingredients[id]],
+    )
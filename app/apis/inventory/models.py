@@ -0,0 +1,30 @@
+import uuid
+
+from sqlmodel import CheckConstraint, Field, SQLModel
+
+# ---------- Inventory Models ----------
+"""
+Stock of a product is split over one or more shard rows whose available
+counts add up to the product's stock. Most products have a single shard;
+hot products get several so concurrent checkouts decrement different rows
+instead of queueing on one row lock. Products without shard rows aren't
+stock-tracked.
+"""
+
+
+class InventoryShard(SQLModel, table=True):
+    __table_args__ = (
+        # Last line of defense against overselling
+        CheckConstraint("available >= 0", name="ck_inventoryshard_available"),
+    )
+
+    product_id: uuid.UUID = Field(foreign_key="product.id", primary_key=True, ondelete="CASCADE")
+    shard: int = Field(default=0, primary_key=True)
+    available: int = Field(default=0)
+
+
+# Properties to return via API
+class StockResponse(SQLModel):
+    product_id: uuid.UUID
+    available: int
+    shards: int
@@ -0,0 +1,194 @@
+"""
+Time-limited stock reservations.
+
+Reserving takes the stock in Postgres right away, so a reserved cart can
+always be checked out; Redis only remembers what was reserved, by whom and
+until when. Checkout or cancelling claims the reservation, and a background
+reaper claims expired ones and returns their stock. A reservation is claimed
+with one atomic script, so exactly one of them handles it. If the reaper
+dies between claiming and returning stock, that stock stays taken: it errs
+on the side of not overselling.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+import orjson
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+from sqlmodel import Session
+
+from app.apis.inventory.schemas import ReservationResponse
+from app.apis.inventory.services import release_stock, take_stock
+from app.apis.orders.schemas import CheckoutItem
+from app.utils.config import settings
+from app.utils.database import engine
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+
+EXPIRY_KEY = "inv:reservations"
+
+# Remove the reservation from the expiry index and return its record, or
+# nil when someone else claimed it first
+_CLAIM_SCRIPT = """
+if redis.call('zrem', KEYS[1], ARGV[1]) == 0 then
+    return false
+end
+local record = redis.call('get', KEYS[2])
+redis.call('del', KEYS[2])
+return record
+"""
+
+
+def _key(id: uuid.UUID | str) -> str:
+    return f"inv:reservation:{id}"
+
+
+def _save(id: uuid.UUID | str, record: dict[str, Any]) -> None:
+    pipeline = redis_client.pipeline()
+    pipeline.set(_key(id), orjson.dumps(record))
+    pipeline.zadd(EXPIRY_KEY, {str(id): record["expires_at"]})
+    pipeline.execute()
+
+
+def _claim(id: uuid.UUID | str) -> dict[str, Any] | None:
+    record = redis_client.eval(_CLAIM_SCRIPT, 2, EXPIRY_KEY, _key(id), str(id))
+    return orjson.loads(record) if record else None
+
+
+def _quantities(record: dict[str, Any]) -> dict[uuid.UUID, int]:
+    return {uuid.UUID(id): quantity for id, quantity in record["items"].items()}
+
+
+def create_reservation(
+    session: Session, user_id: uuid.UUID, quantities: dict[uuid.UUID, int]
+) -> ReservationResponse:
+    """
+    Take the stock for quantities and hold it for INVENTORY_RESERVATION_TTL.
+
+    Raises:
+        HTTPException: 409 when stock is short, 503 when Redis is unavailable
+    """
+    take_stock(session, quantities)
+    session.commit()
+
+    id = uuid.uuid4()
+    expires_at = time.time() + settings.INVENTORY_RESERVATION_TTL
+    record = {
+        "user_id": str(user_id),
+        "items": {str(product_id): quantity for product_id, quantity in quantities.items()},
+        "expires_at": expires_at,
+    }
+    try:
+        _save(id, record)
+    except RedisError as e:
+        logger.error(f"Reservation {id} not stored, returning its stock: {e}")
+        release_stock(session, quantities)
+        session.commit()
+        raise HTTPException(status_code=503, detail="Reservations are unavailable")
+
+    return ReservationResponse(
+        id=id,
+        expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+        items=[CheckoutItem(product_id=product_id, quantity=quantity) for product_id, quantity in quantities.items()],
+    )
+
+
+def claim_reservation(
+    id: uuid.UUID, user_id: uuid.UUID, quantities: dict[uuid.UUID, int] | None = None
+) -> dict[str, Any]:
+    """
+    Claim a live reservation of user_id, so the reaper won't return its stock.
+
+    Args:
+        quantities: Cart the reservation must match, None to accept any
+    Raises:
+        HTTPException: 404 when it doesn't exist or has expired, 400 when the cart differs
+    """
+    try:
+        raw = redis_client.get(_key(id))
+        record = orjson.loads(raw) if raw else None
+        if record is None or record["user_id"] != str(user_id):
+            raise HTTPException(status_code=404, detail="reservation not found")
+        if quantities is not None and _quantities(record) != quantities:
+            raise HTTPException(status_code=400, detail="Cart doesn't match the reservation")
+        claimed = _claim(id)
+    except RedisError as e:
+        logger.error(f"Reservation {id} not claimed: {e}")
+        raise HTTPException(status_code=503, detail="Reservations are unavailable")
+    if claimed is None:
+        # Reaped or checked out between the read and the claim
+        raise HTTPException(status_code=404, detail="reservation not found")
+    return claimed
+
+
+def restore_reservation(id: uuid.UUID, record: dict[str, Any]) -> None:
+    """
+    Put back a claimed reservation whose checkout failed. It keeps its
+    expiry, so the reaper returns the stock if it isn't retried in time.
+    """
+    try:
+        _save(id, record)
+    except RedisError as e:
+        logger.error(f"Reservation {id} lost, its stock stays taken: {e}")
+
+
+def cancel_reservation(session: Session, id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """
+    Release a reservation's stock before it expires.
+    """
+    record = claim_reservation(id, user_id)
+    release_stock(session, _quantities(record))
+    session.commit()
+
+
+def reap_expired_reservations(session: Session, now: float | None = None) -> int:
+    """
+    Return the stock of up to INVENTORY_REAPER_BATCH_SIZE expired reservations.
+
+    Returns:
+        Number of reservations reaped
+    """
+    ids = redis_client.zrangebyscore(
+        EXPIRY_KEY, "-inf", now or time.time(), start=0, num=settings.INVENTORY_REAPER_BATCH_SIZE
+    )
+    claimed = {id: record for id in ids if (record := _claim(id)) is not None}
+    if not claimed:
+        return 0
+
+    totals: dict[uuid.UUID, int] = {}
+    for record in claimed.values():
+        for product_id, quantity in _quantities(record).items():
+            totals[product_id] = totals.get(product_id, 0) + quantity
+    try:
+        release_stock(session, totals)
+        session.commit()
+    except Exception:
+        session.rollback()
+        for id, record in claimed.items():
+            restore_reservation(id, record)
+        raise
+    return len(claimed)
+
+
+def _reap_forever() -> None:
+    while True:
+        try:
+            with Session(engine) as session:
+                while reap_expired_reservations(session) == settings.INVENTORY_REAPER_BATCH_SIZE:
+                    pass
+        except Exception as e:
+            logger.error(f"Reservation reaper failed: {e}")
+        time.sleep(settings.INVENTORY_REAPER_INTERVAL)
+
+
+def start_reservation_reaper() -> threading.Thread:
+    """
+    Run the reaper in a daemon thread. Every worker can run one: claims are
+    atomic, so a reservation is only ever reaped once.
+    """
+    thread = threading.Thread(target=_reap_forever, name="reservation-reaper", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,69 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.apis.inventory import reservations
+from app.apis.inventory import services as crud
+from app.apis.inventory.models import StockResponse
+from app.apis.inventory.schemas import (
+    ReservationRequest,
+    ReservationResponse,
+    StockUpdate,
+)
+from app.apis.orders.services import merge_lines
+from app.apis.products.models import Product
+from app.apis.products.utils import can_access
+from app.models import Message
+from app.utils.database import SessionDep
+from app.utils.security import CurrentUser, RequireCreateOrder, get_current_user
+
+router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+
+@router.get("/{product_id}", response_model=StockResponse, dependencies=[Depends(get_current_user)])
+def read_stock(session: SessionDep, product_id: uuid.UUID) -> Any:
+    """
+    Get available stock of a product.
+    """
+    stock = crud.get_stock(session, product_id)
+    if stock is None:
+        raise HTTPException(status_code=404, detail="product stock not tracked")
+    return stock
+
+
+@router.put("/{product_id}", response_model=StockResponse)
+def update_stock(
+    session: SessionDep, current_user: CurrentUser, product_id: uuid.UUID, stock_in: StockUpdate
+) -> Any:
+    """
+    Set available stock of a product, and how many shards it is split over.
+    """
+    product = session.get(Product, product_id)
+    if not product or product.deleted_at:
+        raise HTTPException(status_code=404, detail="product not found")
+    if not can_access(product.owner_id, current_user):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return crud.set_stock(session, product_id, available=stock_in.available, shards=stock_in.shards)
+
+
+@router.post("/reservations", response_model=ReservationResponse, status_code=201)
+def create_reservation(
+    session: SessionDep, current_user: RequireCreateOrder, reservation_in: ReservationRequest
+) -> Any:
+    """
+    Hold stock for a cart for INVENTORY_RESERVATION_TTL seconds. Check out
+    with the reservation id to use it; unused reservations expire.
+    """
+    return reservations.create_reservation(
+        session, uuid.UUID(current_user.id), merge_lines(reservation_in.items)
+    )
+
+
+@router.delete("/reservations/{id}")
+def cancel_reservation(session: SessionDep, current_user: RequireCreateOrder, id: uuid.UUID) -> Message:
+    """
+    Release a reservation's stock.
+    """
+    reservations.cancel_reservation(session, id, uuid.UUID(current_user.id))
+    return Message(message="Reservation cancelled")
@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+from app.apis.orders.schemas import CheckoutItem
+from app.utils.config import settings
+
+# ---------- Inventory Schemas ----------
+
+
+class StockUpdate(SQLModel):
+    available: int = Field(ge=0)
+    # More shards for products bought concurrently by many users
+    shards: int = Field(default=1, ge=1, le=settings.INVENTORY_MAX_SHARDS)
+
+
+class ReservationRequest(SQLModel):
+    items: list[CheckoutItem] = Field(min_length=1, max_length=settings.ORDER_MAX_ITEMS)
+
+
+class ReservationResponse(SQLModel):
+    id: uuid.UUID
+    expires_at: datetime
+    items: list[CheckoutItem]
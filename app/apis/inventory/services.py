@@ -0,0 +1,172 @@
+"""
+inventory services
+"""
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlmodel import Session, delete, func, select
+
+from app.apis.events.outbox import record_event
+from app.apis.inventory.models import InventoryShard, StockResponse
+from app.apis.products.models import Product
+
+# Takes each cart line from one randomly picked shard that can cover it, in
+# one statement, and returns the lines that are done: taken, or for products
+# that aren't stock-tracked. The picked rows are locked in (product_id, shard)
+# order before the update, the same order _take_spread locks in, so carts
+# that overlap wait for each other instead of deadlocking. The WHERE is
+# re-checked against the latest row version when a concurrent checkout got
+# there first, so stock never goes negative; lines missing from the result
+# need the slower spread path.
+_take_from_one_shard = text("""
+    WITH cart AS (
+        SELECT * FROM unnest(CAST(:product_ids AS uuid[]), CAST(:quantities AS integer[]))
+            AS c(product_id, quantity)
+    ), target AS (
+        SELECT DISTINCT ON (s.product_id) s.product_id, s.shard, c.quantity
+        FROM inventoryshard s JOIN cart c ON c.product_id = s.product_id
+        WHERE s.available >= c.quantity
+        ORDER BY s.product_id, random()
+    ), locked AS MATERIALIZED (
+        SELECT s.product_id, s.shard, t.quantity
+        FROM inventoryshard s JOIN target t ON t.product_id = s.product_id AND t.shard = s.shard
+        ORDER BY s.product_id, s.shard
+        FOR UPDATE OF s
+    ), taken AS (
+        UPDATE inventoryshard s SET available = s.available - l.quantity
+        FROM locked l
+        WHERE s.product_id = l.product_id AND s.shard = l.shard AND s.available >= l.quantity
+        RETURNING s.product_id
+    )
+    SELECT c.product_id FROM cart c
+    WHERE c.product_id IN (SELECT product_id FROM taken)
+        OR NOT EXISTS (SELECT 1 FROM inventoryshard s WHERE s.product_id = c.product_id)
+""")
+
+_release = text("""
+    UPDATE inventoryshard s SET available = s.available + c.quantity
+    FROM unnest(CAST(:product_ids AS uuid[]), CAST(:quantities AS integer[]))
+        AS c(product_id, quantity)
+    WHERE s.product_id = c.product_id AND s.shard = 0
+""")
+
+
+def _take_spread(session: Session, product_id: uuid.UUID, quantity: int) -> bool:
+    """
+    Take quantity from several shards of one product, locking all of them.
+    Used when no single shard holds enough.
+
+    Returns:
+        False when the product's total stock is too low; True when it was
+        taken or the product isn't stock-tracked
+    """
+    shards = session.exec(
+        select(InventoryShard)
+        .where(InventoryShard.product_id == product_id)
+        .order_by(InventoryShard.shard)
+        .with_for_update()
+    ).all()
+    if not shards:
+        return True
+    if sum(shard.available for shard in shards) < quantity:
+        return False
+    for shard in shards:
+        taken = min(shard.available, quantity)
+        shard.available -= taken
+        quantity -= taken
+        session.add(shard)
+        if not quantity:
+            break
+    session.flush()
+    return True
+
+
+def _record_stock_changes(session: Session, product_ids: list[uuid.UUID]) -> None:
+    # No level in the payload: consumers read the current one, so changes
+    # committed concurrently can't be reported out of order
+    for product_id in product_ids:
+        record_event(session, "inventory.changed", product_id)
+
+
+def take_stock(session: Session, quantities: dict[uuid.UUID, int]) -> None:
+    """
+    Decrement stock for every cart line within the caller's transaction, so
+    it is returned if the transaction rolls back. Doesn't commit.
+
+    Raises:
+        HTTPException: 409 listing the products without enough stock
+    """
+    product_ids = list(quantities)
+    savepoint = session.begin_nested()
+    done = session.execute(
+        _take_from_one_shard, {"product_ids": product_ids, "quantities": list(quantities.values())}
+    ).scalars().all()
+    if len(done) == len(product_ids):
+        savepoint.commit()
+        _record_stock_changes(session, product_ids)
+        return
+
+    # Undo the partial take: a row whose re-check failed stays locked until the
+    # savepoint is gone, and holding it while locking whole products deadlocks.
+    # Products are locked in id order for the same reason.
+    savepoint.rollback()
+    short = [str(id) for id in sorted(product_ids) if not _take_spread(session, id, quantities[id])]
+    if short:
+        raise HTTPException(status_code=409, detail=f"Not enough stock: {', '.join(short)}")
+    _record_stock_changes(session, product_ids)
+
+
+def release_stock(session: Session, quantities: dict[uuid.UUID, int]) -> None:
+    """
+    Return stock taken by take_stock, e.g. for an expired reservation. Doesn't commit.
+    """
+    session.execute(
+        _release, {"product_ids": list(quantities), "quantities": list(quantities.values())}
+    )
+    _record_stock_changes(session, list(quantities))
+
+
+def get_stock(session: Session, product_id: uuid.UUID) -> StockResponse | None:
+    """
+    Total available stock of a product, None when it isn't stock-tracked.
+    """
+    available, shards = session.execute(
+        select(func.sum(InventoryShard.available), func.count()).where(
+            InventoryShard.product_id == product_id
+        )
+    ).one()
+    if not shards:
+        return None
+    return StockResponse(product_id=product_id, available=available, shards=shards)
+
+
+def get_stock_with_owner(session: Session, product_id: uuid.UUID) -> tuple[uuid.UUID, StockResponse] | None:
+    """
+    A product's owner and total stock, None when it isn't stock-tracked.
+    """
+    row = session.execute(
+        select(Product.owner_id, func.sum(InventoryShard.available), func.count())
+        .join(Product, Product.id == InventoryShard.product_id)
+        .where(InventoryShard.product_id == product_id)
+        .group_by(Product.owner_id)
+    ).first()
+    if row is None:
+        return None
+    owner_id, available, shards = row
+    return owner_id, StockResponse(product_id=product_id, available=available, shards=shards)
+
+
+def set_stock(session: Session, product_id: uuid.UUID, available: int, shards: int) -> StockResponse:
+    """
+    Replace a product's stock, spread evenly over shards rows.
+    """
+    session.exec(delete(InventoryShard).where(InventoryShard.product_id == product_id))
+    per_shard, remainder = divmod(available, shards)
+    session.add_all(
+        InventoryShard(product_id=product_id, shard=shard, available=per_shard + (shard < remainder))
+        for shard in range(shards)
+    )
+    _record_stock_changes(session, [product_id])
+    session.commit()
+    return StockResponse(product_id=product_id, available=available, shards=shards)
@@ -3,7 +3,11 @@ from fastapi import APIRouter
 from app.apis.users.routes import router as users_router
 from app.apis.products.routes import router as products_router
 from app.apis.orders.routes import router as orders_router
+from app.apis.inventory.routes import router as inventory_router
+from app.apis.interactions.routes import router as interactions_router
+from app.apis.messaging.routes import router as messaging_router
 from app.apis.auth.routes import router as auth_router
+from app.apis.system.routes import router as system_router
 
 
 from app.utils.config import settings
@@ -14,6 +18,10 @@ api_router.include_router(auth_router)
 api_router.include_router(users_router)
 api_router.include_router(products_router)
 api_router.include_router(orders_router)
+api_router.include_router(inventory_router)
+api_router.include_router(interactions_router)
+api_router.include_router(messaging_router)
+api_router.include_router(system_router)
 
 # if settings.ENVIRONMENT == "local":
 #     api_router.include_router(private.router)
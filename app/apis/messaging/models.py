@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Any
+
+from sqlmodel import Field, SQLModel
+
+
+# What a WebSocket client receives, for pushed notifications and replies alike
+class Notification(SQLModel):
+    # e.g. "order.created", "product.updated", "subscribed", "error"
+    type: str
+    # Set for messages published to a topic
+    topic: str | None = None
+    data: dict[str, Any] = Field(default_factory=dict)
+    sent_at: datetime = Field(default_factory=datetime.utcnow)
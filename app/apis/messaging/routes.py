@@ -0,0 +1,172 @@
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+
+import anyio
+from fastapi import (
+    APIRouter,
+    Cookie,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+
+from app.apis.messaging.schemas import (
+    TOPIC_PATTERN,
+    PublishResponse,
+    TopicCommand,
+    TopicMessage,
+)
+from app.apis.messaging.services import (
+    TOKEN_COOKIE,
+    TOKEN_SUBPROTOCOL,
+    Connection,
+    EventStream,
+    authenticate,
+    gateway,
+    notification,
+    publish_to_topic,
+    request_token,
+    subprotocol_token,
+)
+from app.utils.config import settings
+from app.utils.security import get_current_active_superuser
+
+router = APIRouter(prefix="/messaging", tags=["messaging"])
+
+
+@router.websocket("/ws")
+async def notifications_socket(websocket: WebSocket) -> None:
+    """
+    Realtime notifications for the signed-in user: their orders and account,
+    plus the topics they subscribe to by sending
+    {"action": "subscribe", "topic": "product:<id>"}.
+
+    Browsers can't set headers on a WebSocket, so the access token may also
+    be offered as a subprotocol: new WebSocket(url, ["access_token", token]).
+    It isn't accepted in the query string, which ends up in access logs.
+    """
+    subprotocols = websocket.scope.get("subprotocols", [])
+    token = request_token(websocket.headers.get("authorization"), subprotocol_token(subprotocols))
+    try:
+        current_user = await run_in_threadpool(authenticate, token)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+
+    # Browsers drop the connection unless one offered subprotocol is echoed
+    await websocket.accept(subprotocol=TOKEN_SUBPROTOCOL if TOKEN_SUBPROTOCOL in subprotocols else None)
+    connection = Connection(websocket, current_user.id)
+    connected = False
+    try:
+        await gateway.connect(connection)
+        connected = True
+        connection.start_sending()
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                command = TopicCommand.model_validate_json(raw)
+                if command.action == "subscribe":
+                    await gateway.subscribe(connection, command.topic)
+                else:
+                    await gateway.unsubscribe(connection, command.topic)
+            except ValidationError as e:
+                connection.offer(notification("error", {"detail": e.errors(include_url=False)}))
+                continue
+            except HTTPException as e:
+                connection.offer(notification("error", {"detail": e.detail}))
+                continue
+            connection.offer(notification(f"{command.action}d", topic=command.topic))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        connection.stop_sending()
+        if connected:
+            await gateway.disconnect(connection)
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def notification_events(
+    authorization: Annotated[str | None, Header()] = None,
+    access_token: Annotated[str | None, Cookie(alias=TOKEN_COOKIE)] = None,
+    last_event_id: Annotated[str | None, Header(pattern=r"^\d+-\d+$")] = None,
+) -> Any:
+    """
+    The signed-in user's order and stock notifications as Server-Sent Events,
+    for clients that can't use the WebSocket. One long-lived response
+    replaces polling; EventSource reconnects on its own and sends
+    Last-Event-ID to resume where it left off.
+
+    Browsers authenticate with the access_token cookie, sent by
+    new EventSource(url, {withCredentials: true}); other clients with the
+    Authorization header.
+    """
+    current_user = await run_in_threadpool(authenticate, request_token(authorization, access_token))
+    if gateway.event_streams >= settings.SSE_MAX_CONNECTIONS:
+        raise HTTPException(
+            status_code=503, detail="Too many event streams", headers={"Retry-After": "5"}
+        )
+    # Taken with the check, so concurrent requests can't all pass it
+    gateway.event_streams += 1
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            gateway.event_streams -= 1
+
+    stream = EventStream(current_user.id)
+
+    # Joins the gateway only once the response starts, so a request that
+    # never gets that far leaves nothing behind
+    async def body() -> AsyncIterator[str]:
+        try:
+            await gateway.connect(stream)
+            try:
+                async for frame in stream.frames(last_event_id):
+                    yield frame
+            finally:
+                # The client went away: this runs cancelled
+                with anyio.CancelScope(shield=True):
+                    await gateway.disconnect(stream)
+        finally:
+            release()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also frees the slot of a client that left before the body started
+        background=BackgroundTask(release),
+    )
+
+
+@router.post(
+    "/topics/{topic}",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=PublishResponse,
+)
+def publish_topic_message(
+    topic: Annotated[str, Path(max_length=80, pattern=TOPIC_PATTERN)], message_in: TopicMessage
+) -> Any:
+    """
+    Broadcast a message to everyone following a topic, on every worker.
+    """
+    return PublishResponse(workers=publish_to_topic(topic, message_in.type, message_in.data))
+
+
+@router.get("/stats", dependencies=[Depends(get_current_active_superuser)])
+def read_gateway_stats() -> Any:
+    """
+    Connections, subscribed channels and delivery counters of this worker.
+    """
+    return gateway.stats()
@@ -0,0 +1,32 @@
+import re
+from typing import Any, Literal
+
+from pydantic import field_validator
+from sqlmodel import Field, SQLModel
+
+# "<kind>" or "<kind>:<id>", e.g. "announcements" or "product:<uuid>"
+TOPIC_PATTERN = r"^[a-z]+(:[\w-]{1,64})?$"
+
+
+# Sent by WebSocket clients to follow or stop following a topic
+class TopicCommand(SQLModel):
+    action: Literal["subscribe", "unsubscribe"]
+    topic: str = Field(max_length=80)
+
+    @field_validator("topic")
+    @classmethod
+    def check_topic(cls, topic: str) -> str:
+        if not re.match(TOPIC_PATTERN, topic):
+            raise ValueError("Topics look like 'announcements' or 'product:<id>'")
+        return topic
+
+
+# Broadcast to everyone following a topic
+class TopicMessage(SQLModel):
+    type: str = Field(min_length=1, max_length=64)
+    data: dict[str, Any] = Field(default_factory=dict)
+
+
+class PublishResponse(SQLModel):
+    # Workers that had a subscriber for the channel
+    workers: int
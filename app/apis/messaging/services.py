@@ -0,0 +1,365 @@
+"""
+Realtime notifications over WebSockets and Server-Sent Events.
+
+Each worker keeps its own subscribers and subscribes one Redis pub/sub
+connection to the channels they need: ws:user:<id> for every connected user
+and ws:topic:<name> for every topic a local client follows. publish_to_user()
+and publish_to_topic() can therefore be called from any process (API worker,
+event consumer, script) and reach the right clients on every node. A message
+is serialized once by its publisher and forwarded to clients as-is.
+
+Notifications to a user are also appended to a short per-user Redis Stream
+(ws:backlog:<id>), and carry its entry id, so an SSE client that reconnects
+with Last-Event-ID gets what it missed in between.
+
+Each subscriber has a bounded send queue. A WebSocket client that can't keep
+up fills it and is disconnected with code 1013; an SSE stream is ended, and
+the client resumes from the backlog. Either way one slow client can't buffer
+without limit or slow the fan-out to everyone else.
+"""
+import asyncio
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, WebSocket
+from jwt.exceptions import InvalidTokenError
+from redis.exceptions import RedisError
+from sqlmodel import Session
+
+from app.apis.messaging.models import Notification
+from app.models import AuthUser
+from app.utils.config import settings
+from app.utils.database import engine
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import async_redis_client, redis_client
+from app.utils.security import get_current_user
+
+USER_CHANNEL = "ws:user:"
+TOPIC_CHANNEL = "ws:topic:"
+BACKLOG_KEY = "ws:backlog:"
+# "Try again later": closes a connection whose send queue overflowed
+SLOW_CONSUMER = 1013
+# Browsers can't set headers on a WebSocket, so they offer the access token as
+# a second subprotocol: new WebSocket(url, ["access_token", token])
+TOKEN_SUBPROTOCOL = "access_token"
+# EventSource can't set headers either; it sends this cookie along instead
+TOKEN_COOKIE = "access_token"
+
+
+def user_channel(user_id: uuid.UUID | str) -> str:
+    return f"{USER_CHANNEL}{user_id}"
+
+
+def topic_channel(topic: str) -> str:
+    return f"{TOPIC_CHANNEL}{topic}"
+
+
+def backlog_key(user_id: uuid.UUID | str) -> str:
+    return f"{BACKLOG_KEY}{user_id}"
+
+
+# Append to the user's backlog, then publish "<entry id>\n<message>"
+_PUBLISH_TO_USER_SCRIPT = """
+local id = redis.call('xadd', KEYS[1], 'maxlen', '~', ARGV[3], '*', 'message', ARGV[2])
+redis.call('expire', KEYS[1], ARGV[4])
+return redis.call('publish', ARGV[1], id .. '\\n' .. ARGV[2])
+"""
+
+
+def notification(type: str, data: dict[str, Any] | None = None, topic: str | None = None) -> str:
+    return orjson.dumps(Notification(type=type, topic=topic, data=data or {}).model_dump(mode="json")).decode()
+
+
+def publish_to_user(user_id: uuid.UUID | str, type: str, data: dict[str, Any] | None = None) -> int:
+    """
+    Push a notification to every open connection of a user.
+
+    Returns:
+        Number of workers that had one
+    """
+    return redis_client.eval(
+        _PUBLISH_TO_USER_SCRIPT,
+        1,
+        backlog_key(user_id),
+        user_channel(user_id),
+        notification(type, data),
+        settings.SSE_BACKLOG_SIZE,
+        settings.SSE_BACKLOG_TTL,
+    )
+
+
+def publish_to_topic(topic: str, type: str, data: dict[str, Any] | None = None) -> int:
+    """
+    Push a notification to every connection following topic.
+
+    Returns:
+        Number of workers that had one
+    """
+    # Topics have no backlog, so no entry id
+    return redis_client.publish(topic_channel(topic), "\n" + notification(type, data, topic))
+
+
+def request_token(authorization: str | None, token: str | None) -> str | None:
+    """
+    The access token of a Bearer Authorization header, else token: the one
+    a browser offered as a WebSocket subprotocol or EventSource cookie, as it
+    can't set headers on either. Never taken from the query string, which
+    ends up in access logs.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    return token
+
+
+def subprotocol_token(subprotocols: list[str]) -> str | None:
+    """
+    The access token offered after TOKEN_SUBPROTOCOL in a WebSocket
+    handshake's subprotocols; unlike a query parameter, it stays out of
+    access logs.
+    """
+    if TOKEN_SUBPROTOCOL in subprotocols:
+        index = subprotocols.index(TOKEN_SUBPROTOCOL)
+        if index + 1 < len(subprotocols):
+            return subprotocols[index + 1]
+    return None
+
+
+def authenticate(token: str | None) -> AuthUser:
+    """
+    Resolve the user of a WebSocket or event stream, with the same checks as
+    get_current_user on other routes.
+
+    Raises:
+        HTTPException: When the token is missing or invalid
+    """
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    with Session(engine) as session:
+        try:
+            return get_current_user(session, token)
+        except InvalidTokenError:
+            raise HTTPException(status_code=403, detail="Could not validate credentials")
+
+
+class Subscriber:
+    """
+    One client of the gateway, following its user's channel and its topics.
+    """
+
+    def __init__(self, user_id: str) -> None:
+        self.user_id = user_id
+        self.topics: set[str] = set()
+        # (backlog entry id or "", message)
+        self.queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, message: str, event_id: str = "") -> bool:
+        """
+        Queue a message without waiting; False when the client is too far behind.
+        """
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait((event_id, message))
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.on_overflow()
+            return False
+        return True
+
+    def on_overflow(self) -> None:
+        pass
+
+
+class Connection(Subscriber):
+    """
+    A WebSocket client, written to by its own task.
+    """
+
+    def __init__(self, websocket: WebSocket, user_id: str) -> None:
+        super().__init__(user_id)
+        self.websocket = websocket
+        # Started by start_sending() once the connection is registered
+        self.sender: asyncio.Task[None] | None = None
+
+    def start_sending(self) -> None:
+        self.sender = asyncio.create_task(self._send_loop())
+
+    def stop_sending(self) -> None:
+        if self.sender is not None:
+            self.sender.cancel()
+
+    async def _send_loop(self) -> None:
+        while True:
+            _, message = await self.queue.get()
+            await self.websocket.send_text(message)
+
+    def on_overflow(self) -> None:
+        self.stop_sending()
+        asyncio.create_task(self._close(SLOW_CONSUMER, "Send queue full"))
+
+    async def _close(self, code: int, reason: str) -> None:
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except RuntimeError:
+            # Already closed by the client
+            pass
+
+
+def _stream_id(id: str) -> tuple[int, int]:
+    milliseconds, _, sequence = id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def _frame(message: str, event_id: str = "") -> str:
+    return f"id: {event_id}\ndata: {message}\n\n" if event_id else f"data: {message}\n\n"
+
+
+class EventStream(Subscriber):
+    """
+    A Server-Sent Events client. Ends when it overflows; the client's
+    EventSource reconnects with Last-Event-ID and resumes from the backlog.
+    """
+
+    async def frames(self, last_event_id: str | None = None) -> AsyncIterator[str]:
+        """
+        The user's notifications after last_event_id from the backlog, then
+        live ones, with a comment line every SSE_HEARTBEAT_INTERVAL seconds
+        of silence so proxies keep the connection open.
+
+        Must run after the stream joined the gateway, so nothing published
+        while the backlog is read is missed.
+        """
+        last = _stream_id(last_event_id) if last_event_id else None
+        if last_event_id:
+            key = backlog_key(self.user_id)
+            # From the client's last entry on: while it is still in the
+            # backlog, nothing after it can have been trimmed
+            entries = await async_redis_client.xrange(key, min=last_event_id, count=settings.SSE_BACKLOG_SIZE + 1)
+            if entries and entries[0][0] == last_event_id:
+                entries = entries[1:]
+            else:
+                oldest = await async_redis_client.xrange(key, count=1)
+                if not oldest or _stream_id(oldest[0][0]) > last:
+                    # Trimmed or expired past what the client has: it must refetch
+                    yield _frame(notification("reset"))
+            for event_id, fields in entries:
+                yield _frame(fields["message"], event_id)
+                last = _stream_id(event_id)
+
+        while not self.overflowed:
+            try:
+                event_id, message = await asyncio.wait_for(
+                    self.queue.get(), timeout=settings.SSE_HEARTBEAT_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if event_id:
+                # Published while the backlog was read, and already replayed
+                if last and _stream_id(event_id) <= last:
+                    continue
+                last = _stream_id(event_id)
+            yield _frame(message, event_id)
+
+
+class Gateway:
+    """
+    This worker's connections, indexed by the Redis channels they listen on.
+    """
+
+    def __init__(self) -> None:
+        self.channels: dict[str, set[Subscriber]] = defaultdict(set)
+        self.connections = 0
+        self.event_streams = 0
+        self.delivered = 0
+        self.slow_disconnects = 0
+        self._pubsub = async_redis_client.pubsub(ignore_subscribe_messages=True)
+        self._reader: asyncio.Task[None] | None = None
+        self._lock: asyncio.Lock | None = None
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except RedisError as e:
+                logger.error(f"WebSocket gateway lost Redis, retrying: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message:
+                self._fan_out(message["channel"], message["data"])
+
+    def _fan_out(self, channel: str, data: str) -> None:
+        event_id, _, message = data.partition("\n")
+        for connection in list(self.channels.get(channel, ())):
+            if connection.offer(message, event_id):
+                self.delivered += 1
+            else:
+                self.slow_disconnects += 1
+                self.channels[channel].discard(connection)
+
+    async def _join(self, connection: Subscriber, channel: str) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.channels[channel]:
+                await self._pubsub.subscribe(channel)
+            self.channels[channel].add(connection)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+
+    async def _leave(self, connection: Subscriber, channel: str) -> None:
+        async with self._lock:
+            subscribers = self.channels.get(channel)
+            if subscribers is None:
+                return
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.channels[channel]
+                await self._pubsub.unsubscribe(channel)
+
+    async def connect(self, connection: Subscriber) -> None:
+        await self._join(connection, user_channel(connection.user_id))
+        self.connections += 1
+
+    async def disconnect(self, connection: Subscriber) -> None:
+        for channel in [user_channel(connection.user_id), *map(topic_channel, connection.topics)]:
+            await self._leave(connection, channel)
+        self.connections -= 1
+
+    async def subscribe(self, connection: Subscriber, topic: str) -> None:
+        """
+        Raises:
+            HTTPException: 400 when the connection follows WS_MAX_TOPICS already
+        """
+        if topic in connection.topics:
+            return
+        if len(connection.topics) >= settings.WS_MAX_TOPICS:
+            raise HTTPException(status_code=400, detail="Too many topics")
+        connection.topics.add(topic)
+        await self._join(connection, topic_channel(topic))
+
+    async def unsubscribe(self, connection: Subscriber, topic: str) -> None:
+        if topic in connection.topics:
+            connection.topics.discard(topic)
+            await self._leave(connection, topic_channel(topic))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "connections": self.connections,
+            "event_streams": self.event_streams,
+            "channels": len(self.channels),
+            "delivered": self.delivered,
+            "slow_disconnects": self.slow_disconnects,
+        }
+
+    async def stop(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+        await self._pubsub.aclose()
+
+
+gateway = Gateway()
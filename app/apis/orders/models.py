@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlmodel import Field, ForeignKeyConstraint, Index, SQLModel
+
+# ---------- Order Models ----------
+"""
+An order is created at checkout from the user's cart. Items keep the title
+and unit price the product had at that moment, so later catalog changes
+don't rewrite order history.
+"""
+
+
+class OrderBase(SQLModel):
+    status: str = Field(default="pending", max_length=20)
+    total: Decimal = Field(max_digits=12, decimal_places=2)
+    item_count: int
+
+
+# Database model, the table is "order" (quoted in raw SQL, it's a keyword).
+# Orders and their items are range-partitioned by month of created_at; see
+# app/apis/orders/partitions.py. Ids are UUIDv7 so they carry created_at.
+class Order(OrderBase, table=True):
+    __table_args__ = (
+        Index("ix_order_user_id_created_at", "user_id", "created_at"),
+        Index("ix_order_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: uuid.UUID = Field(primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
+    user_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, ondelete="CASCADE")
+    idempotency_key: str | None = Field(default=None, max_length=255)
+
+
+# Unique keys of a partitioned table must include the partition key, so
+# checkouts are deduplicated per idempotency key here instead
+class OrderIdempotencyKey(SQLModel, table=True):
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+    idempotency_key: str = Field(max_length=255, primary_key=True)
+    order_id: uuid.UUID
+    created_at: datetime
+    # Hash of the checkout request, a key can't be reused for another cart.
+    # None on keys claimed before it was stored.
+    fingerprint: str | None = Field(default=None, max_length=32)
+
+
+class OrderItemBase(SQLModel):
+    product_id: uuid.UUID | None
+    title: str = Field(max_length=255)
+    unit_price: Decimal = Field(max_digits=12, decimal_places=2)
+    quantity: int
+
+
+class OrderItem(OrderItemBase, table=True):
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"], ["order.id", "order.created_at"], ondelete="CASCADE"
+        ),
+        Index("ix_orderitem_order_created_at_brin", "order_created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (order_created_at)"},
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Copy of the order's created_at, so items live in the same month's partition
+    order_created_at: datetime = Field(primary_key=True)
+    order_id: uuid.UUID = Field(nullable=False, index=True)
+    # Position in the cart, starting at 1
+    line: int
+    # Kept when the product is deleted, the item still has its title and price
+    product_id: uuid.UUID | None = Field(
+        default=None, foreign_key="product.id", nullable=True, ondelete="SET NULL"
+    )
+
+
+# Properties to return via API
+class OrderItemResponse(OrderItemBase):
+    id: uuid.UUID
+
+
+class OrderSummary(OrderBase):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime
+
+
+class OrderResponse(OrderSummary):
+    items: list[OrderItemResponse]
+
+
+class OrdersResponse(SQLModel):
+    data: list[OrderSummary]
+    count: int
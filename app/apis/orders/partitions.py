@@ -0,0 +1,156 @@
+"""
+Monthly partitions of the order and orderitem tables.
+
+Both tables are range-partitioned on the order's created_at, one partition
+per calendar month (UTC), named <table>_pYYYYMM. There is no default
+partition: maintain_partitions() must have created the month before the
+first order of that month arrives, so it runs daily from
+app.scripts.maintain_order_partitions (the order-partitions service in
+docker-compose) and creates ORDER_PARTITIONS_AHEAD months in advance;
+workers also create them at startup. Partitions older than
+ORDER_PARTITION_RETENTION_MONTHS are detached, not dropped, by the script
+only: they stay behind as plain tables for archiving, outside every order
+query.
+"""
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlmodel import Session, delete
+
+from app.apis.orders.models import OrderIdempotencyKey
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+
+# Parent tables, referencing table first: its partitions must be detached
+# before the partitions they reference
+PARTITIONED_TABLES = ("orderitem", "order")
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<month>\d{6})$")
+
+
+def month_start(at: datetime) -> datetime:
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partition(name: str) -> bool:
+    match = _PARTITION_NAME.match(name)
+    return bool(match) and match["table"] in PARTITIONED_TABLES
+
+
+def list_partitions(session: Session, table: str) -> dict[datetime, str]:
+    """
+    Attached partitions of table, by the month they hold.
+    """
+    names = session.execute(
+        text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+        """),
+        {"table": table},
+    ).scalars()
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            partitions[datetime.strptime(match["month"], "%Y%m")] = name
+    return partitions
+
+
+def create_partitions(session: Session, start: datetime, end: datetime) -> list[str]:
+    """
+    Create the missing monthly partitions from start's month through end's.
+
+    Returns:
+        Names of the partitions created
+    """
+    created = []
+    for table in reversed(PARTITIONED_TABLES):
+        existing = list_partitions(session, table)
+        month = month_start(start)
+        while month <= end:
+            if month not in existing:
+                name = partition_name(table, month)
+                session.execute(
+                    text(
+                        f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                    )
+                )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(session: Session, before: datetime) -> list[str]:
+    """
+    Detach partitions of months before before's month.
+
+    Returns:
+        Names of the partitions detached
+    """
+    detached = []
+    for table in PARTITIONED_TABLES:
+        for month, name in sorted(list_partitions(session, table).items()):
+            if month >= month_start(before):
+                break
+            session.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            # The detached table keeps its foreign keys to the parents, which
+            # would block detaching the partitions it references
+            foreign_keys = session.execute(
+                text("""
+                    SELECT conname FROM pg_constraint
+                    JOIN pg_class child ON child.oid = pg_constraint.conrelid
+                    JOIN pg_class parent ON parent.oid = pg_constraint.confrelid
+                    WHERE child.relname = :name AND contype = 'f' AND parent.relname = ANY(:parents)
+                """),
+                {"name": name, "parents": list(PARTITIONED_TABLES)},
+            ).scalars().all()
+            for foreign_key in foreign_keys:
+                session.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{foreign_key}"'))
+            detached.append(name)
+    return detached
+
+
+def maintain_partitions(
+    session: Session,
+    now: datetime | None = None,
+    ahead: int | None = None,
+    retention: int | None = None,
+) -> tuple[list[str], list[str]]:
+    """
+    Create partitions through ahead months from now and detach those older
+    than retention months; retention 0 keeps everything. Commits.
+
+    Returns:
+        Names of the partitions created and detached
+    """
+    now = now or datetime.utcnow()
+    ahead = settings.ORDER_PARTITIONS_AHEAD if ahead is None else ahead
+    retention = settings.ORDER_PARTITION_RETENTION_MONTHS if retention is None else retention
+
+    # Serializes concurrent runs, e.g. several workers starting at once
+    session.execute(text("SELECT pg_advisory_xact_lock(hashtext('order_partitions'))"))
+    created = create_partitions(session, now, add_months(month_start(now), ahead))
+    detached = detach_partitions(session, add_months(month_start(now), -retention)) if retention else []
+    # Keys only guard retries within the replay window
+    session.execute(
+        delete(OrderIdempotencyKey).where(
+            OrderIdempotencyKey.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_TTL)
+        )
+    )
+    session.commit()
+    if created or detached:
+        logger.info(f"Order partitions created: {created}, detached: {detached}")
+    return created, detached
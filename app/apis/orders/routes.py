@@ -1,8 +1,75 @@
-from fastapi import APIRouter, Depends
-from app.utils.security import AuthUser, RequireViewOrder, CurrentUser
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+
+from app.apis.orders import services as crud
+from app.apis.orders.models import OrderResponse, OrdersResponse
+from app.apis.orders.schemas import CheckoutRequest
+from app.utils.database import SessionDep
+from app.utils.idempotency import IdempotencyKey, run_idempotent
+from app.utils.responses import page_response
+from app.utils.security import RequireCreateOrder, RequireViewOrder
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-@router.get("/")
-def get_orders(route_deps:RequireViewOrder):
-    return {"orders": ["order1", "order2"], "user": route_deps.id}
\ No newline at end of file
+
+@router.get("/", response_model=OrdersResponse)
+def read_orders(
+    session: SessionDep,
+    current_user: RequireViewOrder,
+    skip: int = 0,
+    limit: int = 100,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Any:
+    """
+    Retrieve own orders created in [since, until), newest first.
+    Without since, covers the last ORDER_HISTORY_DAYS days.
+    """
+    rows, count = crud.get_paginated_orders(
+        session=session, current_user=current_user, skip=skip, limit=limit, since=since, until=until
+    )
+    return page_response(rows, count)
+
+
+@router.get("/{id}", response_model=OrderResponse)
+def read_order(session: SessionDep, current_user: RequireViewOrder, id: uuid.UUID) -> Any:
+    """
+    Get order by ID, with its items.
+    """
+    order = crud.get_order(session, id)
+    if not order:
+        raise HTTPException(status_code=404, detail="order not found")
+    if not current_user.is_verified and str(order.user_id) != current_user.id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return crud.get_order_response(session, order)
+
+
+@router.post("/", response_model=OrderResponse, status_code=201)
+def checkout(
+    session: SessionDep,
+    current_user: RequireCreateOrder,
+    checkout_in: CheckoutRequest,
+    idempotency_key: IdempotencyKey = None,
+) -> Any:
+    """
+    Place an order for the items in the cart.
+    Send an Idempotency-Key header to retry safely: retries with the same key
+    return the original order instead of creating another.
+    """
+    user_id = uuid.UUID(current_user.id)
+    return run_idempotent(
+        scope=f"orders:{user_id}",
+        key=idempotency_key,
+        payload=checkout_in,
+        handler=lambda: crud.create_order(
+            session=session,
+            user_id=user_id,
+            items=checkout_in.items,
+            idempotency_key=idempotency_key,
+            reservation_id=checkout_in.reservation_id,
+        ),
+        status_code=201,
+    )
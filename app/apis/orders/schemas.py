@@ -0,0 +1,18 @@
+import uuid
+
+from sqlmodel import Field, SQLModel
+
+from app.utils.config import settings
+
+# ---------- Checkout Schemas ----------
+
+
+class CheckoutItem(SQLModel):
+    product_id: uuid.UUID
+    quantity: int = Field(gt=0, le=settings.ORDER_MAX_QUANTITY)
+
+
+class CheckoutRequest(SQLModel):
+    items: list[CheckoutItem] = Field(min_length=1, max_length=settings.ORDER_MAX_ITEMS)
+    # Check out stock held by POST /inventory/reservations for this cart
+    reservation_id: uuid.UUID | None = None
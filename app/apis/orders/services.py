@@ -0,0 +1,278 @@
+"""
+orders services
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Row, text
+from sqlmodel import Session, func, select
+
+from app.apis.events.outbox import record_event
+from app.apis.inventory.reservations import claim_reservation, restore_reservation
+from app.apis.inventory.services import take_stock
+from app.apis.orders.models import (
+    Order,
+    OrderIdempotencyKey,
+    OrderItem,
+    OrderItemResponse,
+    OrderResponse,
+    OrderSummary,
+)
+from app.apis.orders.schemas import CheckoutItem, CheckoutRequest
+from app.apis.products.models import Product
+from app.models import AuthUser
+from app.utils.config import settings
+from app.utils.idempotency import request_fingerprint
+from app.utils.ids import uuid7, uuid7_time
+from app.utils.responses import response_columns
+
+_summary_columns = response_columns(Order, OrderSummary)
+_item_columns = response_columns(OrderItem, OrderItemResponse)
+
+# Inserts the order and all of its items in one statement and returns them
+# joined, one row per item. A second checkout with the same idempotency key
+# loses on the key table, inserts nothing and returns no rows.
+_insert_order = text("""
+    WITH claimed AS (
+        INSERT INTO orderidempotencykey (user_id, idempotency_key, order_id, created_at, fingerprint)
+        SELECT :user_id, CAST(:idempotency_key AS varchar), :id, :created_at, :fingerprint
+        WHERE CAST(:idempotency_key AS varchar) IS NOT NULL
+        ON CONFLICT DO NOTHING
+        RETURNING order_id
+    ), new_order AS (
+        INSERT INTO "order" (id, user_id, status, total, item_count, idempotency_key, created_at)
+        SELECT :id, :user_id, 'pending', :total, :item_count, :idempotency_key, :created_at
+        WHERE CAST(:idempotency_key AS varchar) IS NULL OR EXISTS (SELECT 1 FROM claimed)
+        RETURNING id, user_id, status, total, item_count, created_at
+    ), new_items AS (
+        INSERT INTO orderitem (id, order_id, order_created_at, line, product_id, title, unit_price, quantity)
+        SELECT gen_random_uuid(), new_order.id, new_order.created_at, i.line,
+               i.product_id, i.title, i.unit_price, i.quantity
+        FROM new_order, unnest(
+            CAST(:product_ids AS uuid[]),
+            CAST(:titles AS varchar[]),
+            CAST(:unit_prices AS numeric[]),
+            CAST(:quantities AS integer[])
+        ) WITH ORDINALITY AS i(product_id, title, unit_price, quantity, line)
+        RETURNING id, order_id, line, product_id, title, unit_price, quantity
+    )
+    SELECT o.id AS order_id, o.user_id, o.status, o.total, o.item_count, o.created_at,
+           i.id, i.product_id, i.title, i.unit_price, i.quantity
+    FROM new_order o JOIN new_items i ON i.order_id = o.id
+    ORDER BY i.line
+""")
+
+
+def merge_lines(items: list[CheckoutItem]) -> dict[uuid.UUID, int]:
+    """
+    Quantities per product, in cart order, with repeated products added up.
+    """
+    quantities: dict[uuid.UUID, int] = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+
+def _resolve_prices(session: Session, product_ids: list[uuid.UUID]) -> dict[uuid.UUID, Row]:
+    """
+    Fetch title and price of every product in the cart with one query.
+
+    Raises:
+        HTTPException: When a product doesn't exist, was removed or has no price
+    """
+    rows = session.execute(
+        select(Product.id, Product.title, Product.price).where(
+            Product.id.in_(product_ids), Product.deleted_at.is_(None)
+        )
+    ).all()
+    products = {row.id: row for row in rows}
+    missing = [str(id) for id in product_ids if id not in products]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Products not available: {', '.join(missing)}")
+    unpriced = [str(id) for id in product_ids if products[id].price is None]
+    if unpriced:
+        raise HTTPException(status_code=400, detail=f"Products without a price: {', '.join(unpriced)}")
+    return products
+
+
+def _order_response(order: OrderSummary, items: list[Any]) -> OrderResponse:
+    return OrderResponse(
+        **order.model_dump(), items=[OrderItemResponse.model_validate(item) for item in items]
+    )
+
+
+def _replay_order(
+    session: Session, user_id: uuid.UUID, idempotency_key: str | None, fingerprint: str | None
+) -> OrderResponse:
+    """
+    The order an earlier checkout created with the same idempotency key.
+
+    Raises:
+        HTTPException: 422 when the key was used for a different cart, 409
+            when the key or its order has been removed since
+    """
+    key = session.get(OrderIdempotencyKey, (user_id, idempotency_key))
+    if key is None:
+        # Purged between the conflict and this read, the checkout can run again
+        raise HTTPException(status_code=409, detail="Idempotency-Key has just expired, retry the checkout")
+    if key.fingerprint is not None and key.fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    order = get_order(session, key.order_id)
+    if order is None:
+        # Its partition was detached
+        raise HTTPException(
+            status_code=409, detail="The order of this Idempotency-Key is no longer available"
+        )
+    return get_order_response(session, order)
+
+
+def create_order(
+    session: Session,
+    user_id: uuid.UUID,
+    items: list[CheckoutItem],
+    idempotency_key: str | None = None,
+    reservation_id: uuid.UUID | None = None,
+) -> OrderResponse:
+    """
+    Check out a cart: price it with one query and insert the order and its
+    items in one round-trip.
+
+    Stock is taken in the same transaction, or comes from a reservation made
+    earlier for the same cart. With an idempotency key, a checkout that
+    already created an order returns that order instead of creating another.
+
+    Raises:
+        HTTPException: 409 when stock is short or the order of a reused key is
+            gone, 404 when the reservation has expired, 422 when the key was
+            used for a different cart
+    """
+    quantities = merge_lines(items)
+    products = _resolve_prices(session, list(quantities))
+
+    product_ids = list(quantities)
+    unit_prices = [products[id].price for id in product_ids]
+    total = sum((price * quantity for price, quantity in zip(unit_prices, quantities.values(), strict=True)), Decimal(0))
+
+    reservation = None
+    if reservation_id is None:
+        take_stock(session, quantities)
+    else:
+        reservation = claim_reservation(reservation_id, user_id, quantities)
+
+    created_at = datetime.utcnow()
+    fingerprint = None
+    if idempotency_key is not None:
+        fingerprint = request_fingerprint(CheckoutRequest(items=items, reservation_id=reservation_id))
+    try:
+        rows = session.execute(
+            _insert_order,
+            {
+                "id": uuid7(created_at),
+                "user_id": user_id,
+                "total": total,
+                "item_count": sum(quantities.values()),
+                "idempotency_key": idempotency_key,
+                "created_at": created_at,
+                "fingerprint": fingerprint,
+                "product_ids": product_ids,
+                "titles": [products[id].title for id in product_ids],
+                "unit_prices": unit_prices,
+                "quantities": list(quantities.values()),
+            },
+        ).all()
+        if rows:
+            record_event(
+                session,
+                "order.created",
+                rows[0].order_id,
+                {
+                    "user_id": str(user_id),
+                    "total": str(total),
+                    "items": [
+                        {"product_id": str(id), "quantity": quantity} for id, quantity in quantities.items()
+                    ],
+                },
+            )
+            session.commit()
+        else:
+            # Lost the race to an earlier checkout with the same key, which took its own stock
+            session.rollback()
+            if reservation is not None:
+                restore_reservation(reservation_id, reservation)
+    except Exception:
+        if reservation is not None:
+            restore_reservation(reservation_id, reservation)
+        raise
+
+    if not rows:
+        return _replay_order(session, user_id, idempotency_key, fingerprint)
+
+    first = rows[0]
+    order = OrderSummary(
+        id=first.order_id,
+        user_id=first.user_id,
+        status=first.status,
+        total=first.total,
+        item_count=first.item_count,
+        created_at=first.created_at,
+    )
+    return _order_response(order, rows)
+
+
+def get_order(session: Session, id: uuid.UUID) -> Order | None:
+    """
+    Order by id. The creation time in UUIDv7 ids limits the lookup to the
+    partition holding the order.
+    """
+    filters = [Order.id == id]
+    created_at = uuid7_time(id)
+    if created_at is not None:
+        filters += [Order.created_at >= created_at, Order.created_at < created_at + timedelta(milliseconds=1)]
+    return session.exec(select(Order).where(*filters)).first()
+
+
+def get_order_response(session: Session, order: Order) -> OrderResponse:
+    """
+    An order with its items, in the order they were added.
+    """
+    items = session.execute(
+        select(*_item_columns)
+        .where(OrderItem.order_id == order.id, OrderItem.order_created_at == order.created_at)
+        .order_by(OrderItem.line)
+    ).all()
+    return _order_response(OrderSummary.model_validate(order), items)
+
+
+def get_paginated_orders(
+    session: Session,
+    current_user: AuthUser,
+    skip: int = 0,
+    limit: int = 100,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[list[Row], int]:
+    """
+    Page of order summaries created in [since, until), newest first.
+    Verified users see every order.
+
+    The window, by default the last ORDER_HISTORY_DAYS, limits the count
+    and the scan to the partitions of those months, so the cost doesn't
+    grow with the length of the order history.
+    """
+    filters = [Order.created_at >= (since or datetime.utcnow() - timedelta(days=settings.ORDER_HISTORY_DAYS))]
+    if until is not None:
+        filters.append(Order.created_at < until)
+    if not current_user.is_verified:
+        filters.append(Order.user_id == current_user.id)
+    count = session.exec(select(func.count()).select_from(Order).where(*filters)).one()
+    rows = session.execute(
+        select(*_summary_columns)
+        .where(*filters)
+        .order_by(Order.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return rows, count
@@ -0,0 +1,193 @@
+"""
+Batch product reads and writes.
+
+Each batch runs in a single transaction: ownership is checked for all items
+with one query, the writes go out as one executemany / RETURNING statement,
+and every item gets its own result instead of failing the whole batch.
+"""
+import uuid
+from typing import Any
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, select
+
+from app.apis.events.outbox import record_events
+from app.apis.products.catalog import fresh_rows
+from app.apis.products.models import Product, ProductCreate, ProductResponse
+from app.apis.products.schemas import (
+    ProductBatchItemResult,
+    ProductBatchResponse,
+    ProductBatchUpdateItem,
+    ProductLookupResponse,
+)
+from app.apis.products.utils import can_access
+from app.models import AuthUser
+from app.utils.responses import response_columns
+
+_response_columns = response_columns(Product, ProductResponse)
+# Columns an update may leave out but not set to null
+_not_null = {column.name for column in Product.__table__.columns if not column.nullable}
+
+
+def _batch_response(results: list[ProductBatchItemResult]) -> ProductBatchResponse:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.status < 400)
+    return ProductBatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+def _load_for_batch(session: Session, ids: list[uuid.UUID]) -> dict[uuid.UUID, dict[str, Any]]:
+    """
+    Fetch the live products of a batch with one IN query, keyed by id.
+    """
+    rows = session.execute(
+        select(*_response_columns).where(Product.id.in_(ids), Product.deleted_at.is_(None))
+    ).all()
+    return {row.id: row._asdict() for row in rows}
+
+
+def _check_items(
+    ids: list[uuid.UUID],
+    products: dict[uuid.UUID, dict[str, Any]],
+    current_user: AuthUser,
+) -> tuple[list[int], list[ProductBatchItemResult]]:
+    """
+    Split batch items into the indexes that may be written and failed results.
+    """
+    allowed: list[int] = []
+    failed: list[ProductBatchItemResult] = []
+    seen: set[uuid.UUID] = set()
+    for index, id in enumerate(ids):
+        product = products.get(id)
+        if id in seen:
+            failed.append(ProductBatchItemResult(index=index, id=id, status=400, detail="Duplicate id in batch"))
+        elif not product:
+            failed.append(ProductBatchItemResult(index=index, id=id, status=404, detail="product not found"))
+        elif not can_access(product["owner_id"], current_user):
+            failed.append(ProductBatchItemResult(index=index, id=id, status=400, detail="Not enough permissions"))
+        else:
+            allowed.append(index)
+        seen.add(id)
+    return allowed, failed
+
+
+def lookup_products(
+    session: Session, current_user: AuthUser, ids: list[uuid.UUID]
+) -> ProductLookupResponse:
+    """
+    Resolve many products from the catalog snapshot, and those it can't
+    vouch for with one IN query.
+
+    Products that don't exist or that the user may not read are reported as
+    missing, the same way read_product hides them.
+    """
+    products, unresolved = fresh_rows(dict.fromkeys(ids))
+    if unresolved:
+        products.update(_load_for_batch(session, unresolved))
+    data: dict[uuid.UUID, ProductResponse | None] = {}
+    missing: list[uuid.UUID] = []
+    for id in ids:
+        product = products.get(id)
+        if product and can_access(product["owner_id"], current_user):
+            data[id] = ProductResponse(**product)
+        elif id not in data:
+            data[id] = None
+            missing.append(id)
+    return ProductLookupResponse(data=data, missing=missing)
+
+
+def batch_create_products(
+    session: Session, owner_id: uuid.UUID, items: list[ProductCreate]
+) -> ProductBatchResponse:
+    """
+    Insert products in one executemany statement with RETURNING.
+    """
+    rows = [{"id": uuid.uuid4(), "owner_id": owner_id, **item.model_dump()} for item in items]
+    created = session.execute(
+        insert(Product).returning(*_response_columns, sort_by_parameter_order=True), rows
+    ).all()
+    record_events(
+        session,
+        "product.created",
+        [(row.id, ProductResponse(**row._asdict()).model_dump(mode="json", exclude={"id"})) for row in created],
+    )
+    session.commit()
+    return _batch_response(
+        [
+            ProductBatchItemResult(index=index, id=row.id, status=201, data=ProductResponse(**row._asdict()))
+            for index, row in enumerate(created)
+        ]
+    )
+
+
+def batch_update_products(
+    session: Session, current_user: AuthUser, items: list[ProductBatchUpdateItem]
+) -> ProductBatchResponse:
+    """
+    Partially update products; items only change the fields they set.
+    """
+    ids = [item.id for item in items]
+    products = _load_for_batch(session, ids)
+    allowed, results = _check_items(ids, products, current_user)
+    for index in list(allowed):
+        item = items[index]
+        nulls = sorted(field for field in item.model_fields_set & _not_null if getattr(item, field) is None)
+        if nulls:
+            allowed.remove(index)
+            results.append(
+                ProductBatchItemResult(
+                    index=index, id=item.id, status=422, detail=f"May not be null: {', '.join(nulls)}"
+                )
+            )
+
+    # Bulk UPDATE by primary key, grouped into one executemany per set of fields
+    updates = [
+        {"id": items[index].id, **items[index].model_dump(exclude_unset=True, exclude={"id"})}
+        for index in allowed
+    ]
+    if any(len(row) > 1 for row in updates):
+        session.execute(update(Product), [row for row in updates if len(row) > 1])
+    record_events(
+        session,
+        "product.updated",
+        [
+            (row["id"], {"owner_id": str(products[row["id"]]["owner_id"]), "fields": sorted(set(row) - {"id"})})
+            for row in updates
+            if len(row) > 1
+        ],
+    )
+    session.commit()
+
+    for index, row in zip(allowed, updates, strict=True):
+        data = ProductResponse(**{**products[row["id"]], **row})
+        results.append(ProductBatchItemResult(index=index, id=data.id, status=200, data=data))
+    return _batch_response(results)
+
+
+def batch_delete_products(
+    session: Session, current_user: AuthUser, ids: list[uuid.UUID]
+) -> ProductBatchResponse:
+    """
+    Delete products with one DELETE ... RETURNING statement.
+    """
+    products = _load_for_batch(session, ids)
+    allowed, results = _check_items(ids, products, current_user)
+
+    deleted: set[uuid.UUID] = set()
+    if allowed:
+        deleted = set(
+            session.execute(
+                delete(Product).where(Product.id.in_([ids[index] for index in allowed])).returning(Product.id)
+            ).scalars()
+        )
+    record_events(
+        session, "product.deleted", [(id, {"owner_id": str(products[id]["owner_id"])}) for id in deleted]
+    )
+    session.commit()
+
+    for index in allowed:
+        if ids[index] in deleted:
+            result = ProductBatchItemResult(index=index, id=ids[index], status=200, detail="product deleted successfully")
+        else:
+            result = ProductBatchItemResult(index=index, id=ids[index], status=404, detail="product not found")
+        results.append(result)
+    return _batch_response(results)
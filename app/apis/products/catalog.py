@@ -0,0 +1,448 @@
+"""
+Memory-mapped catalog snapshot shared by the workers of a host.
+
+The live product set is written to one file in a columnar layout: fixed
+width arrays (ids, owner ids, prices in cents, string offsets and sort
+orders) and UTF-8 blobs, each section 8-byte aligned behind a small header,
+in native byte order since the file never leaves the host. Every worker maps
+it read-only and reads the columns through memoryviews: the pages are shared
+by all workers through the page cache, loading deserializes nothing, and a
+lookup only decodes the rows it returns.
+
+Every CATALOG_SNAPSHOT_INTERVAL seconds, the worker holding the host's file
+lock rebuilds the snapshot if products changed, writing a new file and
+renaming it over the old one. Workers notice the new inode and swap their
+reference; requests still reading the old snapshot keep a valid mapping of
+the unlinked file until they drop it.
+
+Autocomplete accepts that the snapshot lags the database by up to the
+interval. Lookups don't: fresh_rows() leaves out the ids this worker saw
+invalidated in the product cache since the snapshot was built, and the
+whole snapshot until it is known to be current, so those are read from
+Postgres.
+"""
+import array
+import fcntl
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import ColumnElement, func, text
+from sqlmodel import Session
+
+from app.apis.products.utils import product_cache
+from app.utils.config import settings
+from app.utils.database import engine
+from app.utils.logging_utitl import logger
+
+MAGIC = b"DHCATLG1"
+# In file order, each located by an (offset, length) entry after the header
+SECTIONS = (
+    "ids",
+    "owner_ids",
+    "prices",
+    "flags",
+    "title_offsets",
+    "titles",
+    "description_offsets",
+    "descriptions",
+    "key_offsets",
+    "keys",
+    "by_key",
+    "by_owner_key",
+)
+
+# magic, rows, built_at (unix time), horizon (oldest xid possibly missing)
+_HEADER = struct.Struct("=8sIdq")
+_SECTION = struct.Struct("=QQ")
+_NO_PRICE = -1
+_NULL_DESCRIPTION = 1
+# Seconds between refresher rounds, and allowance for the order of
+# timestamps taken by different processes
+_POLL_SECONDS = 5.0
+_CLOCK_SLACK = 1.0
+
+# (id, owner_id, title, description, price)
+CatalogRow = tuple[uuid.UUID, uuid.UUID, str, str | None, Decimal | None]
+
+
+def normalize(title: str) -> str:
+    """
+    Autocomplete key: casefolded, whitespace collapsed.
+    """
+    return " ".join(title.casefold().split())
+
+
+def normalized_sql(title: ColumnElement[str]) -> ColumnElement[str]:
+    """
+    normalize() as an SQL expression, for queries that must match the same
+    keys as the snapshot. lower() is close to casefold(), not identical: it
+    differs for a few characters such as "ß".
+    """
+    return func.btrim(func.regexp_replace(func.lower(title), r"\s+", " ", "g"))
+
+
+def _strings(values: list[bytes]) -> tuple[array.array, bytes]:
+    offsets = array.array("I", [0])
+    position = 0
+    for value in values:
+        position += len(value)
+        offsets.append(position)
+    return offsets, b"".join(values)
+
+
+def write_snapshot(path: str, rows: Iterable[CatalogRow], built_at: float, horizon: int) -> int:
+    """
+    Write rows to a new snapshot file and atomically replace path with it.
+
+    Args:
+        built_at: Time the rows were read, lookups trust the snapshot from then
+        horizon: Transactions from this xid on may be missing from rows
+
+    Returns:
+        Number of products written
+    """
+    rows = sorted(rows, key=lambda row: row[0].bytes)
+    keys = [normalize(row[2]).encode() for row in rows]
+    title_offsets, titles = _strings([row[2].encode() for row in rows])
+    description_offsets, descriptions = _strings([(row[3] or "").encode() for row in rows])
+    key_offsets, key_blob = _strings(keys)
+    order = range(len(rows))
+    sections = {
+        "ids": b"".join(row[0].bytes for row in rows),
+        "owner_ids": b"".join(row[1].bytes for row in rows),
+        "prices": array.array(
+            "q", (_NO_PRICE if row[4] is None else int(row[4] * 100) for row in rows)
+        ).tobytes(),
+        "flags": bytes(_NULL_DESCRIPTION if row[3] is None else 0 for row in rows),
+        "title_offsets": title_offsets.tobytes(),
+        "titles": titles,
+        "description_offsets": description_offsets.tobytes(),
+        "descriptions": descriptions,
+        "key_offsets": key_offsets.tobytes(),
+        "keys": key_blob,
+        "by_key": array.array("I", sorted(order, key=keys.__getitem__)).tobytes(),
+        "by_owner_key": array.array(
+            "I", sorted(order, key=lambda index: (rows[index][1].bytes, keys[index]))
+        ).tobytes(),
+    }
+
+    table = []
+    offset = _HEADER.size + len(SECTIONS) * _SECTION.size
+    for name in SECTIONS:
+        offset += -offset % 8
+        table.append((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, len(rows), built_at, horizon))
+        for entry in table:
+            file.write(_SECTION.pack(*entry))
+        for name, (offset, _) in zip(SECTIONS, table, strict=True):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(sections[name])
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp, path)
+    return len(rows)
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of a snapshot file. Never closed explicitly: the mapping
+    goes away with the last reference, so a swap can't pull pages from
+    under a request still reading them.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            self.inode = os.fstat(file.fileno()).st_ino
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, self.count, self.built_at, self.horizon = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        # Lookups trust it from this time, later when it is verified unchanged
+        self.current_at = self.built_at
+
+        sections = {}
+        for index, name in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(view, _HEADER.size + index * _SECTION.size)
+            sections[name] = view[offset:offset + length]
+        self._ids = sections["ids"]
+        self._owner_ids = sections["owner_ids"]
+        self._prices = sections["prices"].cast("q")
+        self._flags = sections["flags"]
+        self._title_offsets = sections["title_offsets"].cast("I")
+        self._titles = sections["titles"]
+        self._description_offsets = sections["description_offsets"].cast("I")
+        self._descriptions = sections["descriptions"]
+        self._key_offsets = sections["key_offsets"].cast("I")
+        self._keys = sections["keys"]
+        self._by_key = sections["by_key"].cast("I")
+        self._by_owner_key = sections["by_owner_key"].cast("I")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _id(self, row: int) -> bytes:
+        return self._ids[row * 16:row * 16 + 16].tobytes()
+
+    def _owner_id(self, row: int) -> bytes:
+        return self._owner_ids[row * 16:row * 16 + 16].tobytes()
+
+    def _key(self, row: int) -> bytes:
+        return self._keys[self._key_offsets[row]:self._key_offsets[row + 1]].tobytes()
+
+    def row(self, row: int) -> dict[str, Any]:
+        """
+        The ProductResponse fields of a row.
+        """
+        price = self._prices[row]
+        description = None
+        if not self._flags[row] & _NULL_DESCRIPTION:
+            start, end = self._description_offsets[row], self._description_offsets[row + 1]
+            description = str(self._descriptions[start:end], "utf-8")
+        return {
+            "id": uuid.UUID(bytes=self._id(row)),
+            "owner_id": uuid.UUID(bytes=self._owner_id(row)),
+            "title": str(self._titles[self._title_offsets[row]:self._title_offsets[row + 1]], "utf-8"),
+            "description": description,
+            "price": None if price == _NO_PRICE else Decimal(price).scaleb(-2),
+        }
+
+    def get(self, id: uuid.UUID) -> dict[str, Any] | None:
+        """
+        Binary search by id.
+        """
+        target = id.bytes
+        row = bisect_left(range(self.count), target, key=self._id)
+        if row < self.count and self._id(row) == target:
+            return self.row(row)
+        return None
+
+    def autocomplete(
+        self, prefix: str, limit: int, owner_id: uuid.UUID | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Products whose normalized title starts with prefix, in title order,
+        only those of owner_id when given.
+        """
+        key = normalize(prefix).encode()
+        if owner_id is None:
+            order = self._by_key
+            position = bisect_left(order, key, key=self._key)
+        else:
+            owner = owner_id.bytes
+            order = self._by_owner_key
+            position = bisect_left(order, (owner, key), key=lambda row: (self._owner_id(row), self._key(row)))
+
+        matches = []
+        while position < len(order) and len(matches) < limit:
+            row = order[position]
+            if not self._key(row).startswith(key) or (owner_id is not None and self._owner_id(row) != owner):
+                break
+            matches.append(self.row(row))
+            position += 1
+        return matches
+
+
+_snapshot_horizon = text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+_snapshot_rows = text(
+    "SELECT id, owner_id, title, description, price FROM product WHERE deleted_at IS NULL"
+)
+_changed_since = text(
+    """
+    SELECT EXISTS (SELECT 1 FROM product WHERE change_xid >= :horizon)
+        OR EXISTS (SELECT 1 FROM producttombstone WHERE change_xid >= :horizon)
+    """
+)
+
+
+def build_snapshot(session: Session, path: str | None = None) -> int:
+    """
+    Write the live products to a new snapshot, read in one repeatable read
+    transaction.
+
+    Returns:
+        Number of products written
+    """
+    path = path or settings.CATALOG_SNAPSHOT_PATH
+    session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    built_at = time.time()
+    try:
+        horizon = session.execute(_snapshot_horizon).scalar_one()
+        rows = session.execute(_snapshot_rows.execution_options(yield_per=10_000))
+        return write_snapshot(path, (tuple(row) for row in rows), built_at, horizon)
+    finally:
+        session.rollback()
+
+
+def changed_since(session: Session, horizon: int) -> bool:
+    """
+    Whether a product may have been written or deleted after a snapshot
+    with this horizon.
+    """
+    return session.execute(_changed_since, {"horizon": horizon}).scalar_one()
+
+
+_snapshot: CatalogSnapshot | None = None
+# Ids invalidated in this worker's product cache, with the time: the
+# snapshot may have missed those writes
+_changed: dict[str, float] = {}
+# Lookups only use a snapshot current at or after this time: when this
+# worker started following invalidations, or the last catalog-wide write
+_lookups_from = math.inf
+_lock = threading.Lock()
+
+
+def _on_product_eviction(ids: Iterable[Any] | None) -> None:
+    global _lookups_from
+    if _lookups_from == math.inf:
+        # No refresher in this process: nothing to track for
+        return
+    now = time.time()
+    with _lock:
+        if ids is None:
+            _lookups_from = max(_lookups_from, now + _CLOCK_SLACK)
+        else:
+            for id in ids:
+                _changed[str(id)] = now
+
+
+product_cache.listeners.append(_on_product_eviction)
+
+
+def current_snapshot() -> CatalogSnapshot | None:
+    return _snapshot
+
+
+def _trust(snapshot: CatalogSnapshot, at: float) -> None:
+    """
+    Record that snapshot holds every write committed before at, and forget
+    the changes it covers.
+    """
+    global _changed
+    with _lock:
+        snapshot.current_at = max(snapshot.current_at, at)
+        if snapshot is _snapshot:
+            _changed = {id: time for id, time in _changed.items() if time >= at - _CLOCK_SLACK}
+
+
+def fresh_rows(ids: Iterable[uuid.UUID]) -> tuple[dict[uuid.UUID, dict[str, Any]], list[uuid.UUID]]:
+    """
+    Rows of ids from the snapshot, as of now.
+
+    Returns:
+        The rows found, and the ids to read from Postgres instead: not in the
+        snapshot, changed since it was built, or all of them while it isn't
+        known to be current
+    """
+    snapshot = _snapshot
+    if snapshot is None or snapshot.current_at < _lookups_from:
+        return {}, list(ids)
+    found: dict[uuid.UUID, dict[str, Any]] = {}
+    missing: list[uuid.UUID] = []
+    for id in ids:
+        row = None if str(id) in _changed else snapshot.get(id)
+        if row is None:
+            missing.append(id)
+        else:
+            found[id] = row
+    return found, missing
+
+
+def _rebuild_if_due(path: str) -> None:
+    try:
+        age = time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        age = math.inf
+    if age < settings.CATALOG_SNAPSHOT_INTERVAL:
+        return
+    if age < math.inf:
+        with Session(engine) as session:
+            if not changed_since(session, CatalogSnapshot(path).horizon):
+                # Still current, check again in an interval
+                os.utime(path)
+                return
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = build_snapshot(session, path)
+    logger.info(f"Catalog snapshot of {count} products built in {time.perf_counter() - started:.2f}s")
+
+
+def refresh_snapshot(path: str | None = None) -> CatalogSnapshot | None:
+    """
+    One refresher round: rebuild the file when this worker holds the host's
+    lock and the snapshot is due, then switch to the newest file.
+
+    Returns:
+        The snapshot now in use, None until one was built
+    """
+    global _snapshot
+    path = path or settings.CATALOG_SNAPSHOT_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker of this host is the builder
+            pass
+        else:
+            _rebuild_if_due(path)
+
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return _snapshot
+    if _snapshot is None or _snapshot.inode != inode:
+        snapshot = CatalogSnapshot(path)
+        _snapshot = snapshot
+        _trust(snapshot, snapshot.built_at)
+        logger.info(f"Catalog snapshot of {len(snapshot)} products loaded")
+
+    snapshot = _snapshot
+    if snapshot.current_at < _lookups_from:
+        # Built before this worker followed every write: usable for lookups
+        # once nothing changed since
+        checked_at = time.time()
+        with Session(engine) as session:
+            if not changed_since(session, snapshot.horizon):
+                _trust(snapshot, checked_at)
+    return snapshot
+
+
+def _refresh_forever() -> None:
+    while True:
+        try:
+            refresh_snapshot()
+        except Exception as e:
+            logger.error(f"Catalog snapshot refresh failed: {e}")
+        time.sleep(min(_POLL_SECONDS, settings.CATALOG_SNAPSHOT_INTERVAL))
+
+
+def start_catalog_refresher(follows_invalidations: bool) -> threading.Thread:
+    """
+    Keep this worker on the newest snapshot in a daemon thread; one worker
+    per host also builds it.
+
+    Args:
+        follows_invalidations: Whether this worker receives product cache
+            invalidations; lookups never use the snapshot otherwise
+    """
+    global _lookups_from
+    if follows_invalidations:
+        _lookups_from = time.time() + _CLOCK_SLACK
+    thread = threading.Thread(target=_refresh_forever, name="catalog-refresher", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,147 @@
+"""
+Product change feed for incremental client sync.
+
+Every insert or update of a product stamps it with the id of the writing
+transaction (change_xid), and a hard delete leaves a tombstone stamped the
+same way; soft-deleted products are tombstones already. A client keeps an
+opaque cursor, a position in (change_xid, id) order, and asks for what
+changed after it.
+
+Sequence numbers alone would skip rows: a transaction can take a lower
+number and commit after a higher one was already served. So a page only
+includes changes of transactions older than every transaction still running
+(the snapshot's xmin); anything committing later has a higher xid and lands
+after the cursor. A long-running transaction delays the feed, never loses
+changes.
+
+Tombstones are kept PRODUCT_TOMBSTONE_RETENTION_DAYS, then purged by
+app.scripts.purge_product_tombstones (the product-tombstones service in
+docker-compose); older cursors get a 410 and the client syncs from scratch.
+"""
+import base64
+import struct
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlmodel import Session, delete
+
+from app.apis.products.models import ProductTombstone
+from app.models import AuthUser
+from app.utils.config import settings
+
+# Per row, in this order
+CHANGE_FIELDS = ("id", "title", "description", "price", "owner_id")
+
+_MAX_ID = uuid.UUID(int=(1 << 128) - 1)
+_CURSOR = struct.Struct(">Q16sI")
+
+# Live products and tombstones after the cursor, in feed order, up to the
+# horizon: the xmin of this statement's snapshot
+_changes = """
+    WITH horizon AS (
+        SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS xmin
+    ), changes AS (
+        (SELECT p.change_xid, p.id, p.deleted_at IS NOT NULL AS deleted,
+                p.title, p.description, p.price, p.owner_id
+         FROM product p
+         WHERE (p.change_xid, p.id) > (:xid, :id)
+             AND p.change_xid < (SELECT xmin FROM horizon) {product_scope}
+         ORDER BY p.change_xid, p.id
+         LIMIT :limit)
+        UNION ALL
+        (SELECT t.change_xid, t.product_id, true, NULL, NULL, NULL, t.owner_id
+         FROM producttombstone t
+         WHERE (t.change_xid, t.product_id) > (:xid, :id)
+             AND t.change_xid < (SELECT xmin FROM horizon) {tombstone_scope}
+         ORDER BY t.change_xid, t.product_id
+         LIMIT :limit)
+    )
+    SELECT (SELECT xmin FROM horizon) AS horizon, changes.*
+    FROM (SELECT 1) AS one
+    LEFT JOIN (SELECT * FROM changes ORDER BY change_xid, id LIMIT :limit) AS changes ON true
+"""
+_statements = {
+    scoped: text(
+        _changes.format(
+            product_scope="AND p.owner_id = :owner_id" if scoped else "",
+            tombstone_scope="AND t.owner_id = :owner_id" if scoped else "",
+        )
+    )
+    for scoped in (False, True)
+}
+
+
+def encode_cursor(xid: int, id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(_CURSOR.pack(xid, id.bytes, int(time.time()))).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, uuid.UUID]:
+    """
+    Raises:
+        HTTPException: 400 for a malformed cursor, 410 when it is older than
+        the tombstone retention
+    """
+    try:
+        xid, id, issued_at = _CURSOR.unpack(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, struct.error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if issued_at < time.time() - settings.PRODUCT_TOMBSTONE_RETENTION_DAYS * 86400:
+        raise HTTPException(status_code=410, detail="Cursor expired, sync from scratch")
+    return xid, uuid.UUID(bytes=id)
+
+
+def get_changes(
+    session: Session, current_user: AuthUser, since: str | None = None, limit: int | None = None
+) -> dict[str, Any]:
+    """
+    Products changed after the since cursor, oldest change first; the whole
+    catalog when since is None.
+
+    Returns:
+        {"cursor", "has_more", "fields", "upserts", "deleted"}: upserts are
+        rows of CHANGE_FIELDS values, deleted are product ids. Fetch again
+        with cursor while has_more, and on the next sync.
+    """
+    limit = limit or settings.PRODUCT_CHANGES_PAGE_SIZE
+    xid, id = decode_cursor(since) if since else (0, uuid.UUID(int=0))
+    scoped = not current_user.is_verified
+    params = {"xid": xid, "id": id, "limit": limit}
+    if scoped:
+        params["owner_id"] = current_user.id
+    rows = session.execute(_statements[scoped], params).all()
+
+    horizon = rows[0].horizon
+    changes = [row for row in rows if row.id is not None]
+    upserts = [[row.id, row.title, row.description, row.price, row.owner_id] for row in changes if not row.deleted]
+    deleted = [row.id for row in changes if row.deleted]
+
+    has_more = len(changes) == limit
+    if has_more:
+        cursor = encode_cursor(changes[-1].change_xid, changes[-1].id)
+    else:
+        # Everything before the horizon has been served
+        cursor = encode_cursor(max(xid, horizon - 1), _MAX_ID)
+    return {
+        "cursor": cursor,
+        "has_more": has_more,
+        "fields": CHANGE_FIELDS,
+        "upserts": upserts,
+        "deleted": deleted,
+    }
+
+
+def purge_tombstones(session: Session, now: datetime | None = None) -> int:
+    """
+    Delete tombstones past PRODUCT_TOMBSTONE_RETENTION_DAYS. Commits.
+
+    Returns:
+        Number of tombstones deleted
+    """
+    before = (now or datetime.utcnow()) - timedelta(days=settings.PRODUCT_TOMBSTONE_RETENTION_DAYS)
+    purged = session.execute(delete(ProductTombstone).where(ProductTombstone.deleted_at < before)).rowcount
+    session.commit()
+    return purged
@@ -0,0 +1,164 @@
+"""
+Facet counts next to product search results.
+
+All requested facets are counted by one GROUPING SETS query over the
+listing read model: one grouping set per facet plus the empty set for the
+total. As usual for facets, a facet's counts ignore the filter on that
+facet itself, so a buyer who picked a seller still sees how many results
+every other seller has. This is done with one count column per facet,
+each with its own FILTER clause, rather than one query per facet.
+
+Responses are cached per normalized query (see normalized_query) and
+invalidated with the product lists.
+"""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import and_, func, true, tuple_
+from sqlalchemy.dialects.postgresql import array
+from sqlmodel import Session, select
+
+from app.apis.products.listing import listing_filters, naive_utc
+from app.apis.products.models import ProductListing
+from app.utils.config import settings
+
+FACET_FILTERS = ("owner_id", "price_min", "price_max")
+
+
+def _price_band() -> Any:
+    # 0 below the first bound, i from bounds[i - 1], len(bounds) from the last
+    return func.width_bucket(ProductListing.price, array(settings.PRODUCT_PRICE_BANDS))
+
+
+# Facet name -> (grouping key, the listing_filters() arguments it ignores)
+FACETS: dict[str, tuple[Any, tuple[str, ...]]] = {
+    "seller": (ProductListing.owner_id, ("owner_id",)),
+    "price_band": (_price_band(), ("price_min", "price_max")),
+}
+
+
+def parse_facets(facets: str) -> list[str]:
+    """
+    Validate a comma separated facet list.
+
+    Returns:
+        The facet names, sorted and without duplicates
+    Raises:
+        HTTPException: 400 for names outside FACETS
+    """
+    names = sorted({name.strip() for name in facets.split(",") if name.strip()})
+    unknown = [name for name in names if name not in FACETS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown facets: {', '.join(unknown)}, expected some of: {', '.join(FACETS)}",
+        )
+    return names
+
+
+def _normalized(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return naive_utc(value).isoformat()
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    if isinstance(value, str):
+        return value.lower()
+    return value
+
+
+def normalized_query(names: list[str], filters: dict[str, Any], size: int) -> str:
+    """
+    Canonical form of a facet query: requests that differ only in parameter
+    order, title prefix case, time zone or number spelling map to the
+    same string.
+    """
+    query = {"facets": names, "size": size}
+    query.update((name, _normalized(value)) for name, value in sorted(filters.items()) if value is not None)
+    return orjson.dumps(query, option=orjson.OPT_SORT_KEYS).decode()
+
+
+def price_band_label(band: int | None) -> str:
+    bounds = settings.PRODUCT_PRICE_BANDS
+    if band is None:
+        return "No price"
+    if band >= len(bounds):
+        return f"{bounds[-1]}+"
+    return f"{bounds[band - 1] if band else 0}-{bounds[band]}"
+
+
+def facet_counts(
+    session: Session,
+    names: list[str],
+    filters: dict[str, Any],
+    scope_owner_id: uuid.UUID | None = None,
+    size: int = 10,
+) -> dict[str, Any]:
+    """
+    Count the products matching filters (listing_filters() arguments), in
+    total and per value of each facet in names.
+
+    Args:
+        scope_owner_id: Owner non-superusers are restricted to; unlike the
+            owner_id filter, facets never ignore it
+        size: Values kept per facet, the most frequent first; price bands
+            are all kept, in price order
+
+    Returns:
+        {"count", "facets": {name: [{"value", "label", "count"}]}}
+    """
+    common = listing_filters(**{name: value for name, value in filters.items() if name not in FACET_FILTERS})
+    if scope_owner_id:
+        common.append(ProductListing.owner_id == scope_owner_id)
+    # Each facet's own filter, applied to every count but that facet's
+    own = {
+        name: and_(true(), *listing_filters(**{arg: filters.get(arg) for arg in ignored}))
+        for name, (_, ignored) in FACETS.items()
+    }
+
+    keys = [FACETS[name][0] for name in names]
+    columns = [
+        func.grouping(*keys).label("grouping"),
+        *(key.label(name) for name, key in zip(names, keys, strict=True)),
+        func.min(ProductListing.owner_name).label("owner_name"),
+        func.count().filter(and_(true(), *own.values())).label("total"),
+        *(
+            func.count().filter(and_(true(), *(own[other] for other in FACETS if other != name))).label(f"{name}_count")
+            for name in names
+        ),
+    ]
+    statement = (
+        select(*columns)
+        .where(*common)
+        .group_by(func.grouping_sets(*(tuple_(key) for key in keys), tuple_()))
+    )
+    rows = session.execute(statement).all()
+
+    everything = (1 << len(names)) - 1
+    total = 0
+    facets: dict[str, list[dict[str, Any]]] = {name: [] for name in names}
+    for row in rows:
+        if row.grouping == everything:
+            total = row.total
+            continue
+        for index, name in enumerate(names):
+            # The bit of a key is 0 in the grouping set of that key
+            if row.grouping == everything ^ (1 << (len(names) - 1 - index)):
+                count = getattr(row, f"{name}_count")
+                if not count:
+                    break
+                value = getattr(row, name)
+                label = row.owner_name if name == "seller" else price_band_label(value)
+                facets[name].append({"value": value, "label": label, "count": count})
+                break
+
+    for name, values in facets.items():
+        if name == "price_band":
+            values.sort(key=lambda value: (value["value"] is None, value["value"] or 0))
+        else:
+            values.sort(key=lambda value: (-value["count"], value["label"] or ""))
+            del values[size:]
+    return {"count": total, "facets": facets}
@@ -0,0 +1,192 @@
+"""
+Incremental supplier feed sync.
+
+Suppliers send their full catalog every night but only a few rows change.
+Each feed row gets a content hash which is diffed against the hashes stored
+on `product`; only new or changed rows are copied to a staging table and
+upserted, and SKUs missing from the feed are soft-deleted in batches.
+"""
+import hashlib
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import BinaryIO
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.apis.events.outbox import record_event
+from app.apis.products.importer import RowErrors, validate_batch
+from app.apis.products.models import Product
+from app.apis.products.schemas import ProductFeedRow, SyncReport
+from app.apis.products.utils import FileFormat, batched, copy_rows, iter_rows
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+
+STAGING_TABLE = "product_sync_staging"
+STAGING_COLUMNS = ("line", "sku", "title", "description", "price", "content_hash")
+
+_feed_batch = TypeAdapter(list[ProductFeedRow])
+
+_create_staging = text(f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        line integer NOT NULL,
+        sku varchar(64) NOT NULL,
+        title varchar(255) NOT NULL,
+        description varchar(255),
+        price numeric(12, 2),
+        content_hash varchar(32) NOT NULL
+    ) ON COMMIT DROP
+""")
+
+# Upserts the staged rows and counts inserts vs updates in the same statement
+# (xmax is 0 only for freshly inserted tuples). Products that were
+# soft-deleted and came back in the feed are restored.
+_upsert_staging = text(f"""
+    WITH upserted AS (
+        INSERT INTO product (id, owner_id, sku, title, description, price, content_hash, deleted_at)
+        SELECT gen_random_uuid(), :owner_id, sku, title, description, price, content_hash, NULL
+        FROM (
+            SELECT DISTINCT ON (sku) sku, title, description, price, content_hash
+            FROM {STAGING_TABLE}
+            ORDER BY sku, line DESC
+        ) AS s
+        ON CONFLICT (owner_id, sku) DO UPDATE SET
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            price = EXCLUDED.price,
+            content_hash = EXCLUDED.content_hash,
+            deleted_at = NULL
+        RETURNING xmax = 0 AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+    FROM upserted
+""")
+
+_soft_delete = text("""
+    UPDATE product SET deleted_at = :deleted_at
+    WHERE owner_id = :owner_id AND sku = ANY(:skus) AND deleted_at IS NULL
+""")
+
+
+def content_hash(row: ProductFeedRow) -> str:
+    """
+    Hash the synced fields of a feed row, 32 hex characters.
+    """
+    fields = [row.title, row.description]
+    # Only priced rows hash the price, so hashes stored before prices existed stay valid
+    if row.price is not None:
+        fields.append(f"{row.price:.2f}")
+    payload = json.dumps(fields, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def sync_feed(
+    session: Session,
+    owner_id: uuid.UUID,
+    stream: BinaryIO,
+    fmt: FileFormat,
+    batch_size: int = settings.PRODUCT_IMPORT_BATCH_SIZE,
+) -> SyncReport:
+    """
+    Sync an owner's products with a full supplier catalog feed.
+
+    Args:
+        session: Database session
+        owner_id: Owner of the synced products
+        stream: Binary file object to read feed rows from
+        fmt: "csv" or "ndjson"
+        batch_size: Number of rows validated and diffed at a time
+    Returns:
+        SyncReport with the number of unchanged, inserted, updated and deleted rows
+    """
+    started = time.perf_counter()
+    received = valid = unchanged = changed = 0
+    errors = RowErrors()
+
+    # (sku, hash) pairs of the live synced catalog, diffed with set operations
+    stored = set(
+        session.exec(
+            select(Product.sku, Product.content_hash).where(
+                Product.owner_id == owner_id,
+                Product.sku.is_not(None),
+                Product.deleted_at.is_(None),
+            )
+        ).all()
+    )
+    stored_skus = {sku for sku, _ in stored}
+    seen_skus: set[str] = set()
+
+    session.execute(_create_staging)
+    for batch in batched(iter_rows(stream, fmt), batch_size):
+        received += len(batch)
+        errors.add_parse_errors(batch)
+        raw = [(line, row) for line, row, _ in batch if row is not None]
+        # Rows that fail validation still count as present, so a bad row
+        # doesn't delete the product it belongs to
+        seen_skus.update(str(row["sku"]) for _, row in raw if row.get("sku") is not None)
+
+        rows, batch_errors = validate_batch(raw, _feed_batch)
+        errors.add(batch_errors)
+        valid += len(rows)
+
+        hashed = {(row.sku, content_hash(row)): (line, row) for line, row in rows}
+        batch_changed = hashed.keys() - stored
+        unchanged += len(hashed) - len(batch_changed)
+        changed += copy_rows(
+            session,
+            STAGING_TABLE,
+            STAGING_COLUMNS,
+            (
+                (line, sku, row.title, row.description, row.price, digest)
+                for (sku, digest), (line, row) in hashed.items()
+                if (sku, digest) in batch_changed
+            ),
+        )
+
+    inserted = updated = 0
+    if changed:
+        inserted, updated = session.execute(_upsert_staging, {"owner_id": owner_id}).one()
+
+    deleted = 0
+    deletions_skipped = False
+    missing = stored_skus - seen_skus
+    if len(missing) > settings.PRODUCT_SYNC_MAX_DELETE_RATIO * len(stored_skus):
+        deletions_skipped = True
+        logger.warning(
+            f"Feed sync for {owner_id} is missing {len(missing)} of {len(stored_skus)} "
+            "products, skipping deletions"
+        )
+    else:
+        deleted_at = datetime.utcnow()
+        for skus in batched(sorted(missing), batch_size):
+            deleted += session.execute(
+                _soft_delete, {"owner_id": owner_id, "skus": skus, "deleted_at": deleted_at}
+            ).rowcount
+    if inserted or updated or deleted:
+        record_event(
+            session, "product.synced", owner_id, {"inserted": inserted, "updated": updated, "deleted": deleted}
+        )
+    session.commit()
+
+    elapsed = time.perf_counter() - started
+    report = SyncReport(
+        received=received,
+        valid=valid,
+        failed=errors.count,
+        unchanged=unchanged,
+        inserted=inserted,
+        updated=updated,
+        deleted=deleted,
+        deletions_skipped=deletions_skipped,
+        errors=errors.report(),
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(received / elapsed, 1) if elapsed else 0.0,
+    )
+    logger.info(
+        f"Synced feed for {owner_id}: {received} rows, {unchanged} unchanged, {inserted} inserted, "
+        f"{updated} updated, {deleted} deleted, {report.rows_per_second} rows/s"
+    )
+    return report
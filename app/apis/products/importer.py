@@ -0,0 +1,174 @@
+"""
+Bulk product import.
+
+Rows are streamed from the upload, validated in batches with ProductCreate,
+copied into a temporary staging table and merged into `product` with a
+single MERGE statement, so the whole file lands in one transaction.
+"""
+import time
+import uuid
+from typing import Any, BinaryIO, TypeVar
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.apis.events.outbox import record_event
+from app.apis.products.models import ProductCreate
+from app.apis.products.schemas import ImportReport, ImportRowError
+from app.apis.products.utils import FileFormat, batched, copy_rows, iter_rows
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+
+STAGING_TABLE = "product_import_staging"
+STAGING_COLUMNS = ("line", "id", "title", "description", "price", "owner_id")
+
+T = TypeVar("T")
+
+_product_batch = TypeAdapter(list[ProductCreate])
+
+_create_staging = text(f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        line integer NOT NULL,
+        id uuid NOT NULL,
+        title varchar(255) NOT NULL,
+        description varchar(255),
+        price numeric(12, 2),
+        owner_id uuid NOT NULL
+    ) ON COMMIT DROP
+""")
+
+# Re-importing a file updates products with the same title for that owner
+# instead of duplicating them; the last occurrence in the file wins.
+# Soft-deleted products that are imported again are restored.
+_merge_staging = text(f"""
+    MERGE INTO product AS p
+    USING (
+        SELECT DISTINCT ON (owner_id, title) id, title, description, price, owner_id
+        FROM {STAGING_TABLE}
+        ORDER BY owner_id, title, line DESC
+    ) AS s
+    ON p.owner_id = s.owner_id AND p.title = s.title
+    WHEN MATCHED THEN
+        UPDATE SET description = s.description, price = s.price, deleted_at = NULL
+    WHEN NOT MATCHED THEN
+        INSERT (id, title, description, price, owner_id)
+        VALUES (s.id, s.title, s.description, s.price, s.owner_id)
+""")
+
+
+def validate_batch(
+    batch: list[tuple[int, dict[str, Any]]],
+    adapter: TypeAdapter[list[T]] = _product_batch,
+) -> tuple[list[tuple[int, T]], list[ImportRowError]]:
+    """
+    Validate a batch of raw rows against a row schema in one pass.
+
+    Args:
+        batch: (line number, raw row) pairs
+        adapter: List adapter of the row schema, ProductCreate by default
+    Returns:
+        The valid (line number, product) pairs and the per-row errors
+    """
+    lines = [line for line, _ in batch]
+    try:
+        return list(zip(lines, adapter.validate_python([row for _, row in batch]), strict=True)), []
+    except ValidationError as e:
+        failed: dict[int, list[str]] = {}
+        for error in e.errors():
+            index, *field = error["loc"]
+            message = error["msg"]
+            if field:
+                message = f"{'.'.join(str(part) for part in field)}: {message}"
+            failed.setdefault(int(index), []).append(message)
+
+    # Only the rows that failed are dropped, the rest are validated again
+    remaining = [item for index, item in enumerate(batch) if index not in failed]
+    products = adapter.validate_python([row for _, row in remaining])
+    errors = [ImportRowError(line=lines[index], errors=messages) for index, messages in failed.items()]
+    return [(line, product) for (line, _), product in zip(remaining, products, strict=True)], errors
+
+
+class RowErrors:
+    """
+    Counts rejected rows and keeps the first PRODUCT_IMPORT_MAX_ERRORS of them.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors: list[ImportRowError] = []
+
+    def add(self, errors: list[ImportRowError]) -> None:
+        self.count += len(errors)
+        room = settings.PRODUCT_IMPORT_MAX_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def add_parse_errors(self, batch: list[tuple[int, dict[str, Any] | None, str | None]]) -> None:
+        self.add([ImportRowError(line=line, errors=[error]) for line, row, error in batch if row is None])
+
+    def report(self) -> list[ImportRowError]:
+        return sorted(self.errors, key=lambda error: error.line)
+
+
+def import_products(
+    session: Session,
+    owner_id: uuid.UUID,
+    stream: BinaryIO,
+    fmt: FileFormat,
+    batch_size: int = settings.PRODUCT_IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    """
+    Bulk import products for an owner from a CSV or NDJSON stream.
+
+    Args:
+        session: Database session
+        owner_id: Owner of the imported products
+        stream: Binary file object to read rows from
+        fmt: "csv" or "ndjson"
+        batch_size: Number of rows validated and copied at a time
+    Returns:
+        ImportReport with per-row errors and throughput
+    """
+    started = time.perf_counter()
+    received = valid = 0
+    errors = RowErrors()
+
+    session.execute(_create_staging)
+    for batch in batched(iter_rows(stream, fmt), batch_size):
+        received += len(batch)
+        errors.add_parse_errors(batch)
+
+        products, batch_errors = validate_batch([(line, row) for line, row, _ in batch if row is not None])
+        errors.add(batch_errors)
+        valid += copy_rows(
+            session,
+            STAGING_TABLE,
+            STAGING_COLUMNS,
+            (
+                (line, uuid.uuid4(), product.title, product.description, product.price, owner_id)
+                for line, product in products
+            ),
+        )
+
+    imported = session.execute(_merge_staging).rowcount if valid else 0
+    # One event per import rather than per row; consumers reload the owner's catalog
+    if imported:
+        record_event(session, "product.imported", owner_id, {"imported": imported})
+    session.commit()
+
+    elapsed = time.perf_counter() - started
+    report = ImportReport(
+        received=received,
+        valid=valid,
+        failed=errors.count,
+        imported=imported,
+        errors=errors.report(),
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(received / elapsed, 1) if elapsed else 0.0,
+    )
+    logger.info(
+        f"Imported {imported} products for {owner_id}: {received} rows, {errors.count} failed, "
+        f"{report.rows_per_second} rows/s"
+    )
+    return report
@@ -0,0 +1,118 @@
+"""
+Product listing read model.
+
+Listings are served from productlisting, one denormalized card per live
+product: the product's own fields plus its owner's name and its stock. A
+page is one index-only scan of a covering index, so browsing costs the same
+however many sources a card draws from.
+
+The cards are maintained incrementally, never rebuilt:
+
+- Statement-level triggers on product upsert the cards of inserted and
+  updated rows and drop soft-deleted ones, in the writing transaction;
+  hard deletes cascade.
+- A trigger on user renames the owner on their cards.
+- Stock changes on every checkout, and a trigger there would make all
+  checkouts of a product queue on its card row again. The listings
+  consumer group refreshes the stock from inventory.changed events
+  instead, so it lags checkouts by the outbox relay's delay.
+
+The triggers are created by migration f2a8c4e6b1d3.
+
+Listings can only be filtered and sorted the ways LISTING_SORTS and
+listing_filters() allow, each backed by an index of productlisting, so no
+combination a client picks scans the whole table.
+"""
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.apis.products.models import ProductListing
+
+# Sort keys of product listings, "-<key>" for descending. Each is served by
+# an index on (key, id) and one on (owner_id, key, id); id breaks ties so
+# pages don't overlap
+LISTING_SORTS = {
+    "title": ProductListing.title_key,
+    "price": ProductListing.price,
+    "created_at": ProductListing.created_at,
+}
+
+
+def listing_order(sort: str) -> list[Any]:
+    """
+    Raises:
+        HTTPException: 400 for a key outside LISTING_SORTS
+    """
+    key = sort.removeprefix("-")
+    column = LISTING_SORTS.get(key)
+    if column is None:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown sort {key}, expected one of: {', '.join(LISTING_SORTS)}"
+        )
+    if sort.startswith("-"):
+        return [column.desc(), ProductListing.id.desc()]
+    return [column, ProductListing.id]
+
+
+def naive_utc(value: datetime) -> datetime:
+    # Listings store naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def listing_filters(
+    owner_id: uuid.UUID | None = None,
+    title_prefix: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    price_min: Decimal | None = None,
+    price_max: Decimal | None = None,
+) -> list[Any]:
+    """
+    Conditions on productlisting, each a range of one of its indexes: owner
+    (leading every index), the case-insensitive title prefix, the
+    half-open created_at range [created_from, created_to) and the price
+    range [price_min, price_max].
+    """
+    filters = []
+    if owner_id:
+        filters.append(ProductListing.owner_id == owner_id)
+    if title_prefix:
+        filters.append(ProductListing.title_key.startswith(title_prefix.lower(), autoescape=True))
+    if created_from:
+        filters.append(ProductListing.created_at >= naive_utc(created_from))
+    if created_to:
+        filters.append(ProductListing.created_at < naive_utc(created_to))
+    if price_min is not None:
+        filters.append(ProductListing.price >= price_min)
+    if price_max is not None:
+        filters.append(ProductListing.price <= price_max)
+    return filters
+
+
+_refresh_stock = text(
+    """
+    UPDATE productlisting l SET stock = s.available
+    FROM (
+        SELECT p.id, (SELECT sum(available)::int FROM inventoryshard WHERE product_id = p.id) AS available
+        FROM unnest(CAST(:product_ids AS uuid[])) AS p(id)
+    ) s
+    WHERE l.id = s.id AND l.stock IS DISTINCT FROM s.available
+    """
+)
+
+
+def refresh_stock(session: Session, product_ids: Sequence[uuid.UUID]) -> int:
+    """
+    Copy the current stock of products to their cards. Doesn't commit.
+
+    Returns:
+        Number of cards whose stock changed
+    """
+    return session.execute(_refresh_stock, {"product_ids": list(product_ids)}).rowcount
@@ -1,7 +1,11 @@
 import uuid
+from datetime import datetime
+from decimal import Decimal
 
 from pydantic import EmailStr
-from sqlmodel import Field, SQLModel
+from sqlalchemy import BigInteger, Column, Computed, FetchedValue, String, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Field, Index, SQLModel
 
 
 
@@ -10,6 +14,7 @@ from sqlmodel import Field, SQLModel
 class ProductBase(SQLModel):
     title: str = Field(min_length=1, max_length=255)
     description: str | None = Field(default=None, max_length=255)
+    price: Decimal | None = Field(default=None, ge=0, max_digits=12, decimal_places=2)
 
 
 # Properties to receive on Product creation
@@ -24,10 +29,96 @@ class ProductUpdate(ProductBase):
 
 # Database model, database table inferred from class name
 class Product(ProductBase, table=True):
+    __table_args__ = (
+        Index("ix_product_owner_id_sku", "owner_id", "sku", unique=True),
+        # Change feed, see app/apis/products/changes.py
+        Index("ix_product_change_xid_id", "change_xid", "id"),
+        Index("ix_product_owner_id_change_xid_id", "owner_id", "change_xid", "id"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
+    # Supplier feed sync: the seller's SKU and a hash of the last synced row
+    sku: str | None = Field(default=None, max_length=64)
+    content_hash: str | None = Field(default=None, max_length=32)
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        sa_column_kwargs={"server_default": text("(now() AT TIME ZONE 'utc')")},
+    )
+    # Active ingredient codes, checked against the interaction dataset, see
+    # app/apis/interactions/index.py
+    ingredients: list[str] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(String(32)), nullable=False, server_default=text("'{}'")),
+    )
+    # Soft delete, set when a product disappears from its supplier feed
+    deleted_at: datetime | None = Field(default=None, nullable=True)
+    # Id of the transaction that last wrote the row, set by a trigger on
+    # every insert and update
+    change_xid: int | None = Field(
+        default=None,
+        sa_type=BigInteger,
+        nullable=False,
+        sa_column_kwargs={"server_default": FetchedValue(), "server_onupdate": FetchedValue()},
+    )
+
+
+# A hard-deleted product, recorded by a trigger for the change feed
+class ProductTombstone(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_producttombstone_change_xid_product_id", "change_xid", "product_id"),
+        Index("ix_producttombstone_owner_id_change_xid_product_id", "owner_id", "change_xid", "product_id"),
+    )
+
+    product_id: uuid.UUID = Field(primary_key=True)
+    owner_id: uuid.UUID
+    change_xid: int = Field(sa_type=BigInteger)
+    deleted_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
+# Read model of product listings: one denormalized card per live product,
+# maintained incrementally, see app/apis/products/listing.py
+_LISTING_CARD = ["owner_id", "owner_name", "title", "description", "price", "stock", "created_at"]
+
+
+class ProductListing(SQLModel, table=True):
+    __table_args__ = (
+        # Covering indexes of the default title order: a page is an
+        # index-only scan
+        Index("ix_productlisting_title_key_id", "title_key", "id", postgresql_include=_LISTING_CARD),
+        Index(
+            "ix_productlisting_owner_id_title_key_id",
+            "owner_id",
+            "title_key",
+            "id",
+            postgresql_include=[name for name in _LISTING_CARD if name != "owner_id"],
+        ),
+        # The other sorts of LISTING_SORTS, see app/apis/products/listing.py
+        *(Index(f"ix_productlisting_{key}_id", key, "id") for key in ("price", "created_at")),
+        *(
+            Index(f"ix_productlisting_owner_id_{key}_id", "owner_id", key, "id")
+            for key in ("price", "created_at")
+        ),
+    )
+
+    id: uuid.UUID = Field(foreign_key="product.id", primary_key=True, ondelete="CASCADE")
+    owner_id: uuid.UUID
+    owner_name: str = Field(max_length=255)
+    title: str = Field(max_length=255)
+    # Case-insensitive title order and prefix search, compared bytewise so
+    # a prefix is one index range whatever the database collation
+    title_key: str | None = Field(
+        default=None,
+        sa_column=Column(String(255, collation="C"), Computed("lower(title)", persisted=True), nullable=False),
+    )
+    description: str | None = Field(default=None, max_length=255)
+    price: Decimal | None = Field(default=None, max_digits=12, decimal_places=2)
+    # Available over all inventory shards, None when stock isn't tracked
+    stock: int | None = None
+    created_at: datetime
 
 
 # Properties to return via API, id is always required
@@ -36,6 +127,13 @@ class ProductResponse(ProductBase):
     owner_id: uuid.UUID
 
 
+# A product card of the listing
+class ProductListingResponse(ProductResponse):
+    owner_name: str | None = None
+    stock: int | None = None
+    created_at: datetime | None = None
+
+
 class ProductsResponse(SQLModel):
-    data: list[ProductResponse]
+    data: list[ProductListingResponse]
     count: int
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Bulk repricing.
+
+A rule set (RepricingRules) is compiled into one SQL expression and evaluated
+for all of an owner's products in a single INSERT ... SELECT, so repricing
+hundreds of thousands of SKUs never loads them into Python. Supplier costs,
+when the rules price from cost, are copied into a staging table first.
+
+Only the prices that change land in a diff table. A dry run reports the diff
+and rolls back; otherwise the diff is written with batched UPDATE ... FROM
+statements, in one transaction, skipping products whose price moved since it
+was evaluated.
+"""
+import time
+import uuid
+from decimal import Decimal
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.apis.events.outbox import record_event
+from app.apis.products.importer import RowErrors, validate_batch
+from app.apis.products.schemas import (
+    CostFeedRow,
+    PriceChange,
+    RepricingReport,
+    RepricingRules,
+)
+from app.apis.products.utils import FileFormat, batched, copy_rows, iter_rows
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+
+COSTS_TABLE = "product_reprice_costs"
+COSTS_COLUMNS = ("line", "sku", "cost")
+DIFF_TABLE = "product_reprice_diff"
+
+_cost_batch = TypeAdapter(list[CostFeedRow])
+
+_create_costs = text(f"""
+    CREATE TEMP TABLE {COSTS_TABLE} (
+        line integer NOT NULL,
+        sku varchar(64) NOT NULL,
+        cost numeric(14, 4) NOT NULL
+    ) ON COMMIT DROP
+""")
+
+_create_diff = text(f"""
+    CREATE TEMP TABLE {DIFF_TABLE} (
+        id uuid PRIMARY KEY,
+        old_price numeric(12, 2),
+        new_price numeric(12, 2)
+    ) ON COMMIT DROP
+""")
+
+# The last occurrence of a SKU in the cost feed wins
+_costs_join = f"""
+    JOIN (
+        SELECT DISTINCT ON (sku) sku, cost FROM {COSTS_TABLE} ORDER BY sku, line DESC
+    ) AS c ON c.sku = p.sku
+"""
+
+# Prices are numeric(12, 2): a large cost times a large margin can exceed them
+PRICE_LIMIT = Decimal("1e10")
+
+# Evaluates the rules for every live product of the owner, keeps the changed
+# prices that fit a price column and counts them in the same statement
+_evaluate = f"""
+    WITH evaluated AS (
+        SELECT p.id, p.price AS old_price, {{expression}} AS new_price
+        FROM product p {{costs_join}}
+        WHERE p.owner_id = :owner_id AND p.deleted_at IS NULL
+    ), changed AS (
+        INSERT INTO {DIFF_TABLE} (id, old_price, new_price)
+        SELECT id, old_price, new_price FROM evaluated
+        WHERE new_price IS DISTINCT FROM old_price AND new_price < :price_limit
+        RETURNING old_price, new_price
+    )
+    SELECT
+        (SELECT count(*) FROM evaluated) AS matched,
+        (SELECT count(*) FROM evaluated WHERE new_price >= :price_limit) AS overflowed,
+        count(*) AS changed,
+        count(*) FILTER (WHERE new_price > old_price) AS increased,
+        count(*) FILTER (WHERE new_price < old_price) AS decreased
+    FROM changed
+"""
+
+# Temp tables have no statistics until analyzed; without them the batched
+# updates hash the whole product table instead of probing its primary key
+_analyze_diff = text(f"ANALYZE {DIFF_TABLE}")
+
+_largest_changes = text(f"""
+    SELECT d.id, p.sku, p.title, d.old_price, d.new_price
+    FROM {DIFF_TABLE} d JOIN product p ON p.id = d.id
+    ORDER BY abs(coalesce(d.new_price, 0) - coalesce(d.old_price, 0)) DESC, d.id
+    LIMIT :limit
+""")
+
+# Writes the next batch of the diff in id order. A product whose price
+# changed since it was evaluated keeps it.
+_apply_batch = text(f"""
+    WITH batch AS (
+        SELECT id, old_price, new_price FROM {DIFF_TABLE}
+        WHERE id > :after ORDER BY id LIMIT :limit
+    ), updated AS (
+        UPDATE product p SET price = b.new_price
+        FROM batch b
+        WHERE p.id = b.id AND p.price IS NOT DISTINCT FROM b.old_price AND p.deleted_at IS NULL
+        RETURNING p.id
+    )
+    SELECT (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last, (SELECT count(*) FROM updated) AS updated
+""")
+
+
+def check_rules(rules: RepricingRules, with_costs: bool) -> None:
+    """
+    Raises:
+        HTTPException: 400 when no rule is set, or when a margin comes
+        without a cost feed or a cost feed without a margin
+    """
+    if not rules.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="No repricing rule given")
+    if rules.margin is not None and not with_costs:
+        raise HTTPException(status_code=400, detail="A margin needs a supplier cost feed")
+    if rules.margin is None and with_costs:
+        raise HTTPException(status_code=400, detail="A supplier cost feed needs a margin")
+
+
+def price_expression(rules: RepricingRules) -> str:
+    """
+    SQL expression of the new price of product p (joined to its cost c when
+    the rules have a margin), with the rule values as bind parameters.
+    """
+    value = "c.cost * (1 + :margin)" if rules.margin is not None else "p.price"
+    if rules.adjustment is not None:
+        value = f"({value}) * (1 + :adjustment)"
+    if rules.round_to is not None:
+        value = f"round(({value}) / :round_to) * :round_to"
+    if rules.ending is not None:
+        value = f"ceil(({value}) - :ending) + :ending"
+    if rules.max_change is not None:
+        # No limit for products without a price yet: greatest and least skip NULLs
+        value = f"least(greatest({value}, p.price * (1 - :max_change)), p.price * (1 + :max_change))"
+    if rules.min_price is not None:
+        value = f"greatest({value}, :min_price)"
+    if rules.max_price is not None:
+        value = f"least({value}, :max_price)"
+    return f"round({value}, 2)"
+
+
+def reprice_products(
+    session: Session,
+    owner_id: uuid.UUID,
+    rules: RepricingRules,
+    costs: BinaryIO | None = None,
+    fmt: FileFormat | None = None,
+    dry_run: bool = True,
+    batch_size: int = settings.PRODUCT_REPRICE_BATCH_SIZE,
+    diff_size: int = settings.PRODUCT_REPRICE_DIFF_SIZE,
+) -> RepricingReport:
+    """
+    Reprice an owner's live products.
+
+    Args:
+        session: Database session
+        owner_id: Owner of the repriced products
+        rules: Rules to apply, see check_rules
+        costs: Binary CSV or NDJSON stream of (sku, cost) rows; only products
+            with a cost are repriced
+        fmt: Format of costs, "csv" or "ndjson"
+        dry_run: Only report the changes
+        batch_size: Cost rows validated and copied, and prices written, at a time
+        diff_size: Changes listed in the report
+    Returns:
+        RepricingReport with the largest changes
+    Raises:
+        HTTPException: 400 for invalid rules
+    """
+    check_rules(rules, costs is not None)
+    started = time.perf_counter()
+    received = 0
+    errors = RowErrors()
+
+    if costs is not None:
+        session.execute(_create_costs)
+        for batch in batched(iter_rows(costs, fmt), batch_size):
+            received += len(batch)
+            errors.add_parse_errors(batch)
+            rows, batch_errors = validate_batch(
+                [(line, row) for line, row, _ in batch if row is not None], _cost_batch
+            )
+            errors.add(batch_errors)
+            copy_rows(session, COSTS_TABLE, COSTS_COLUMNS, ((line, row.sku, row.cost) for line, row in rows))
+
+    session.execute(_create_diff)
+    evaluate = text(
+        _evaluate.format(expression=price_expression(rules), costs_join=_costs_join if costs is not None else "")
+    )
+    counts = session.execute(
+        evaluate, {"owner_id": owner_id, "price_limit": PRICE_LIMIT, **rules.model_dump(exclude_none=True)}
+    ).one()
+    session.execute(_analyze_diff)
+    changes = [
+        PriceChange.model_validate(row, from_attributes=True)
+        for row in session.execute(_largest_changes, {"limit": diff_size})
+    ]
+
+    updated = 0
+    if dry_run:
+        session.rollback()
+    else:
+        after = uuid.UUID(int=0)
+        while True:
+            last, batch_updated = session.execute(_apply_batch, {"after": after, "limit": batch_size}).one()
+            if last is None:
+                break
+            after = last
+            updated += batch_updated
+        if updated:
+            record_event(session, "product.repriced", owner_id, {"updated": updated})
+        session.commit()
+
+    report = RepricingReport(
+        dry_run=dry_run,
+        received=received,
+        failed=errors.count,
+        errors=errors.report(),
+        matched=counts.matched,
+        changed=counts.changed,
+        increased=counts.increased,
+        decreased=counts.decreased,
+        overflowed=counts.overflowed,
+        updated=updated,
+        changes=changes,
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+    )
+    logger.info(
+        f"Repriced products of {owner_id}{' (dry run)' if dry_run else ''}: {report.matched} matched, "
+        f"{report.changed} changed, {report.overflowed} over the price limit, {updated} updated "
+        f"in {report.elapsed_seconds}s"
+    )
+    return report
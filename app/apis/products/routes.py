@@ -1,12 +1,69 @@
 import uuid
-from typing import Any
+from datetime import datetime
+from decimal import Decimal
+from typing import Annotated, Any
 
-from app.apis.products.models import ProductsResponse,Product,ProductResponse,ProductCreate,ProductUpdate
-from fastapi import APIRouter, HTTPException
+from app.apis.products.models import (
+    Product,
+    ProductCreate,
+    ProductListing,
+    ProductListingResponse,
+    ProductResponse,
+    ProductsResponse,
+    ProductUpdate,
+)
+from app.apis.products.schemas import (
+    ImportReport,
+    ProductBatchCreateRequest,
+    ProductBatchDeleteRequest,
+    ProductBatchResponse,
+    ProductBatchUpdateRequest,
+    ProductChangesResponse,
+    ProductFacetsResponse,
+    ProductLookupRequest,
+    ProductLookupResponse,
+    ProductSuggestionsResponse,
+    RepricingReport,
+    RepricingRules,
+    SyncReport,
+)
+from app.apis.products.batch import (
+    batch_create_products,
+    batch_delete_products,
+    batch_update_products,
+    lookup_products,
+)
+from app.apis.events.outbox import record_event
+from app.apis.products.catalog import current_snapshot, normalize, normalized_sql
+from app.apis.products.changes import get_changes
+from app.apis.products.facets import facet_counts, normalized_query, parse_facets
+from app.apis.products.importer import import_products
+from app.apis.products.listing import listing_filters, listing_order
+from app.apis.products.feed_sync import sync_feed
+from app.apis.products.pricing import reprice_products
+from app.apis.products.utils import (
+    CATALOG_TAG,
+    PRODUCTS_TAG,
+    FileFormat,
+    can_access,
+    detect_format,
+    invalidate_products,
+    product_cache,
+    product_tag,
+    record_product_access,
+)
+from fastapi import APIRouter, Form, Header, HTTPException, Query, Request, UploadFile
+from pydantic import ValidationError
+from fastapi.responses import StreamingResponse
 from sqlmodel import func, select
 
+from app.utils import response_cache
+from app.utils.config import settings
 from app.utils.database import SessionDep
 from app.utils.security import CurrentUser
+from app.utils.streaming import ExportFormat, export_response
+from app.utils.fields import parse_fields, projection_response
+from app.utils.responses import CompressedJSONResponse, FastJSONResponse, page_response, response_columns
 from app.models import Message
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -14,46 +71,209 @@ router = APIRouter(prefix="/products", tags=["products"])
 
 @router.get("/", response_model=ProductsResponse)
 def read_products(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    request: Request,
+    session: SessionDep,
+    current_user: CurrentUser,
+    skip: int = 0,
+    limit: int = 100,
+    fields: str | None = None,
+    owner_id: uuid.UUID | None = None,
+    title_prefix: Annotated[str | None, Query(max_length=255)] = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    price_min: Annotated[Decimal | None, Query(ge=0)] = None,
+    price_max: Annotated[Decimal | None, Query(ge=0)] = None,
+    sort: str = "title",
 ) -> Any:
     """
-    Retrieve products.
+    Retrieve product cards from the listing read model.
+    Filter by owner_id, title_prefix (case-insensitive), the created_from /
+    created_to range and the price_min / price_max range; sort by title,
+    price or created_at, "-" first for descending.
+    Pass fields (e.g. fields=id,title) to only return those fields.
     """
+    field_names = parse_fields(fields, ProductListingResponse)
+    order = listing_order(sort)
+    cache_key = response_cache.build_key(
+        request, response_cache.user_scope(current_user), tags=(PRODUCTS_TAG,)
+    )
+    if cached := response_cache.get(request, cache_key):
+        return cached
+
+    if not current_user.is_verified:
+        owner_id = uuid.UUID(current_user.id)
+    filters = listing_filters(
+        owner_id=owner_id,
+        title_prefix=title_prefix,
+        created_from=created_from,
+        created_to=created_to,
+        price_min=price_min,
+        price_max=price_max,
+    )
 
-    if current_user.is_verified:
-        count_statement = select(func.count()).select_from(Product)
-        count = session.exec(count_statement).one()
-        statement = select(Product).offset(skip).limit(limit)
-        products = session.exec(statement).all()
+    count_statement = select(func.count()).select_from(ProductListing).where(*filters)
+    count = session.exec(count_statement).one()
+
+    columns = (
+        [getattr(ProductListing, name) for name in field_names]
+        if field_names
+        else response_columns(ProductListing, ProductListingResponse)
+    )
+    statement = (
+        select(*columns)
+        .where(*filters)
+        .order_by(*order)
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = session.execute(statement).all()
+    if field_names:
+        response = projection_response(ProductListingResponse, field_names, rows, count)
     else:
-        count_statement = (
-            select(func.count())
-            .select_from(Product)
-            .where(Product.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
+        response = page_response(rows, count)
+
+    return response_cache.put(request, cache_key, response, ttl=settings.PRODUCTS_LIST_CACHE_TTL)
+
+
+@router.get("/facets", response_model=ProductFacetsResponse)
+def read_product_facets(
+    request: Request,
+    session: SessionDep,
+    current_user: CurrentUser,
+    facets: str = "seller,price_band",
+    size: Annotated[int, Query(ge=1, le=100)] = 10,
+    owner_id: uuid.UUID | None = None,
+    title_prefix: Annotated[str | None, Query(max_length=255)] = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    price_min: Annotated[Decimal | None, Query(ge=0)] = None,
+    price_max: Annotated[Decimal | None, Query(ge=0)] = None,
+) -> Any:
+    """
+    Facet counts for the products GET /products returns with the same
+    filters: per seller (the size most frequent) and per price band.
+    A facet's counts ignore its own filter, e.g. seller counts ignore owner_id.
+    """
+    names = parse_facets(facets)
+    filters = {
+        "owner_id": owner_id if current_user.is_verified else None,
+        "title_prefix": title_prefix,
+        "created_from": created_from,
+        "created_to": created_to,
+        "price_min": price_min,
+        "price_max": price_max,
+    }
+    cache_key = response_cache.build_key(
+        request,
+        response_cache.user_scope(current_user),
+        tags=(PRODUCTS_TAG,),
+        query=normalized_query(names, filters, size),
+    )
+    if cached := response_cache.get(request, cache_key):
+        return cached
+
+    scope_owner_id = None if current_user.is_verified else uuid.UUID(current_user.id)
+    counts = facet_counts(session, names, filters, scope_owner_id=scope_owner_id, size=size)
+    return response_cache.put(
+        request, cache_key, FastJSONResponse(counts), ttl=settings.PRODUCT_FACETS_CACHE_TTL
+    )
+
+
+@router.get("/export")
+def export_products(
+    current_user: CurrentUser, format: ExportFormat = "ndjson", gzip: bool = False
+) -> StreamingResponse:
+    """
+    Export products as NDJSON or CSV in a single streamed response.
+    """
+    statement = select(
+        Product.id, Product.title, Product.description, Product.price, Product.owner_id, Product.sku
+    ).where(Product.deleted_at.is_(None))
+    if not current_user.is_verified:
+        statement = statement.where(Product.owner_id == current_user.id)
+    return export_response(statement, fmt=format, filename="products", gzip=gzip)
+
+
+@router.get("/changes", response_model=ProductChangesResponse)
+def read_product_changes(
+    session: SessionDep,
+    current_user: CurrentUser,
+    since: str | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=10_000)] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Products created, updated or deleted since a cursor, for clients that keep
+    a local copy of the catalog. Omit since for a full sync, then pass the
+    returned cursor; keep fetching while has_more is true.
+    Answers 410 when the cursor is too old, and the client must sync from scratch.
+    """
+    changes = get_changes(session, current_user, since=since, limit=limit)
+    return CompressedJSONResponse(changes, accept_encoding=accept_encoding)
+
+
+@router.get("/autocomplete", response_model=ProductSuggestionsResponse)
+def autocomplete_products(
+    session: SessionDep,
+    current_user: CurrentUser,
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> Any:
+    """
+    Products whose title starts with q, ignoring case, in title order.
+    Served from the catalog snapshot shared by the workers, so it may lag
+    recent changes by up to CATALOG_SNAPSHOT_INTERVAL seconds.
+    """
+    owner_id = None if current_user.is_verified else uuid.UUID(current_user.id)
+    snapshot = current_snapshot()
+    if snapshot:
+        rows = snapshot.autocomplete(q, limit, owner_id=owner_id)
+    else:
+        # Not built yet: same matches from Postgres, on the same keys
+        key = normalized_sql(Product.title)
         statement = (
-            select(Product)
-            .where(Product.owner_id == current_user.id)
-            .offset(skip)
+            select(Product.id, Product.title)
+            .where(Product.deleted_at.is_(None), key.startswith(normalize(q), autoescape=True))
+            .order_by(key.collate("C"))
             .limit(limit)
         )
-        products = session.exec(statement).all()
-
-    return ProductsResponse(data=products, count=count)
+        if owner_id:
+            statement = statement.where(Product.owner_id == owner_id)
+        rows = session.execute(statement).mappings().all()
+    return {"data": [{"id": row["id"], "title": row["title"]} for row in rows]}
 
 
 @router.get("/{id}", response_model=ProductResponse)
-def read_product(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_product(
+    request: Request, session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+) -> Any:
     """
     Get product by ID.
     """
-    product = session.get(Product, id)
-    if not product:
+    record_product_access(id)
+    cache_key = response_cache.build_key(
+        request, response_cache.user_scope(current_user), tags=(CATALOG_TAG, product_tag(id))
+    )
+    if cached := response_cache.get(request, cache_key):
+        return cached
+
+    product = product_cache.get(session, id)
+    if not product or product.deleted_at:
         raise HTTPException(status_code=404, detail="product not found")
-    if not current_user.is_verified and (Product.owner_id != current_user.id):
+    if not can_access(product.owner_id, current_user):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    return product
+    response = FastJSONResponse(ProductResponse.model_validate(product).model_dump())
+    return response_cache.put(request, cache_key, response, ttl=settings.PRODUCT_DETAIL_CACHE_TTL)
+
+
+@router.post("/lookup", response_model=ProductLookupResponse)
+def lookup_products_by_ids(
+    session: SessionDep, current_user: CurrentUser, lookup_in: ProductLookupRequest
+) -> Any:
+    """
+    Get many products by ID in one request. Missing ids map to null.
+    """
+    return lookup_products(session=session, current_user=current_user, ids=lookup_in.ids)
 
 
 @router.post("/", response_model=ProductResponse)
@@ -64,12 +284,145 @@ def create_product(
     Create new product.
     """
     product = Product.model_validate(product_in, update={"owner_id": current_user.id})
-    session.add(Product)
+    session.add(product)
+    record_event(session, "product.created", product.id, product.model_dump(mode="json", exclude={"id"}))
     session.commit()
-    session.refresh(Product)
+    session.refresh(product)
+    invalidate_products([product.id])
     return product
 
 
+@router.post("/batch", response_model=ProductBatchResponse)
+def create_products_batch(
+    *, session: SessionDep, current_user: CurrentUser, batch_in: ProductBatchCreateRequest
+) -> Any:
+    """
+    Create up to PRODUCT_BATCH_MAX_ITEMS products in one transaction.
+    """
+    result = batch_create_products(
+        session=session, owner_id=uuid.UUID(current_user.id), items=batch_in.items
+    )
+    invalidate_products(item.id for item in result.results)
+    return result
+
+
+@router.put("/batch", response_model=ProductBatchResponse)
+def update_products_batch(
+    *, session: SessionDep, current_user: CurrentUser, batch_in: ProductBatchUpdateRequest
+) -> Any:
+    """
+    Update up to PRODUCT_BATCH_MAX_ITEMS products in one transaction, with a result per item.
+    """
+    result = batch_update_products(
+        session=session, current_user=current_user, items=batch_in.items
+    )
+    invalidate_products(item.id for item in result.results if item.status < 400)
+    return result
+
+
+@router.post("/batch/delete", response_model=ProductBatchResponse)
+def delete_products_batch(
+    *, session: SessionDep, current_user: CurrentUser, batch_in: ProductBatchDeleteRequest
+) -> Any:
+    """
+    Delete up to PRODUCT_BATCH_MAX_ITEMS products in one transaction, with a result per item.
+    """
+    result = batch_delete_products(
+        session=session, current_user=current_user, ids=batch_in.ids
+    )
+    invalidate_products(item.id for item in result.results if item.status < 400)
+    return result
+
+
+@router.post("/import", response_model=ImportReport)
+def bulk_import_products(
+    session: SessionDep,
+    current_user: CurrentUser,
+    file: UploadFile,
+    format: FileFormat | None = None,
+) -> Any:
+    """
+    Bulk import products from a CSV or NDJSON upload.
+    """
+    fmt = format or detect_format(file.filename, file.content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=400, detail="Unknown file format, expected csv or ndjson"
+        )
+    report = import_products(
+        session=session,
+        owner_id=uuid.UUID(current_user.id),
+        stream=file.file,
+        fmt=fmt,
+    )
+    invalidate_products()
+    return report
+
+
+@router.post("/sync", response_model=SyncReport)
+def sync_product_feed(
+    session: SessionDep,
+    current_user: CurrentUser,
+    file: UploadFile,
+    format: FileFormat | None = None,
+) -> Any:
+    """
+    Sync own products with a full supplier catalog feed (CSV or NDJSON keyed by sku).
+    Only changed rows are written, products missing from the feed are soft-deleted.
+    """
+    fmt = format or detect_format(file.filename, file.content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=400, detail="Unknown file format, expected csv or ndjson"
+        )
+    report = sync_feed(
+        session=session,
+        owner_id=uuid.UUID(current_user.id),
+        stream=file.file,
+        fmt=fmt,
+    )
+    invalidate_products()
+    return report
+
+
+@router.post("/reprice", response_model=RepricingReport)
+def reprice_own_products(
+    session: SessionDep,
+    current_user: CurrentUser,
+    rules: Annotated[str, Form(description="RepricingRules as JSON")],
+    file: UploadFile | None = None,
+    format: FileFormat | None = None,
+    dry_run: bool = True,
+) -> Any:
+    """
+    Reprice own products with margin, adjustment, rounding and cap rules.
+    Margins apply to supplier costs from a CSV or NDJSON upload of (sku, cost) rows.
+    Dry runs (the default) only report the changes.
+    """
+    try:
+        rules_in = RepricingRules.model_validate_json(rules)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    fmt = None
+    if file:
+        fmt = format or detect_format(file.filename, file.content_type)
+        if not fmt:
+            raise HTTPException(
+                status_code=400, detail="Unknown file format, expected csv or ndjson"
+            )
+    report = reprice_products(
+        session=session,
+        owner_id=uuid.UUID(current_user.id),
+        rules=rules_in,
+        costs=file.file if file else None,
+        fmt=fmt,
+        dry_run=dry_run,
+    )
+    if report.updated:
+        invalidate_products()
+    return report
+
+
 @router.put("/{id}", response_model=ProductResponse)
 def update_product(
     *,
@@ -82,15 +435,19 @@ def update_product(
     Update an product.
     """
     product = session.get(Product, id)
-    if not product:
+    if not product or product.deleted_at:
         raise HTTPException(status_code=404, detail="product not found")
-    if not current_user.is_verified and (product.owner_id != current_user.id):
+    if not can_access(product.owner_id, current_user):
         raise HTTPException(status_code=400, detail="Not enough permissions")
     update_dict = product_in.model_dump(exclude_unset=True)
     product.sqlmodel_update(update_dict)
     session.add(product)
+    record_event(
+        session, "product.updated", id, {"owner_id": str(product.owner_id), "fields": sorted(update_dict)}
+    )
     session.commit()
     session.refresh(product)
+    invalidate_products([id])
     return product
 
 
@@ -102,10 +459,12 @@ def delete_product(
     Delete an product.
     """
     product = session.get(Product, id)
-    if not product:
+    if not product or product.deleted_at:
         raise HTTPException(status_code=404, detail="product not found")
-    if not current_user.is_verified and (product.owner_id != current_user.id):
+    if not can_access(product.owner_id, current_user):
         raise HTTPException(status_code=400, detail="Not enough permissions")
     session.delete(product)
+    record_event(session, "product.deleted", id, {"owner_id": str(product.owner_id)})
     session.commit()
+    invalidate_products([id])
     return Message(message="product deleted successfully")
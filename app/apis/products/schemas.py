@@ -0,0 +1,197 @@
+import uuid
+from decimal import Decimal
+from typing import Any
+
+from sqlmodel import Field, SQLModel
+
+from app.apis.products.models import ProductCreate, ProductResponse, ProductUpdate
+from app.utils.config import settings
+
+# ---------- Bulk Import Schemas ----------
+
+
+# A row that was rejected, with the line it came from
+class ImportRowError(SQLModel):
+    line: int
+    errors: list[str]
+
+
+class ImportReport(SQLModel):
+    received: int
+    valid: int
+    failed: int
+    imported: int
+    errors: list[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+# ---------- Supplier Feed Sync Schemas ----------
+
+
+# A row of a supplier catalog feed, keyed by the seller's SKU
+class ProductFeedRow(ProductCreate):
+    sku: str = Field(min_length=1, max_length=64)
+
+
+class SyncReport(SQLModel):
+    received: int
+    valid: int
+    failed: int
+    unchanged: int
+    inserted: int
+    updated: int
+    deleted: int
+    # Set when too many products were missing from the feed to delete them
+    deletions_skipped: bool = False
+    errors: list[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+# ---------- Batch Schemas ----------
+
+
+class ProductBatchCreateRequest(SQLModel):
+    items: list[ProductCreate] = Field(
+        min_length=1, max_length=settings.PRODUCT_BATCH_MAX_ITEMS
+    )
+
+
+class ProductBatchUpdateItem(ProductUpdate):
+    id: uuid.UUID
+
+
+class ProductBatchUpdateRequest(SQLModel):
+    items: list[ProductBatchUpdateItem] = Field(
+        min_length=1, max_length=settings.PRODUCT_BATCH_MAX_ITEMS
+    )
+
+
+class ProductBatchDeleteRequest(SQLModel):
+    ids: list[uuid.UUID] = Field(
+        min_length=1, max_length=settings.PRODUCT_BATCH_MAX_ITEMS
+    )
+
+
+# Outcome of one item, status mirrors the single item endpoints
+class ProductBatchItemResult(SQLModel):
+    index: int
+    id: uuid.UUID | None = None
+    status: int
+    detail: str | None = None
+    data: ProductResponse | None = None
+
+
+class ProductBatchResponse(SQLModel):
+    results: list[ProductBatchItemResult]
+    succeeded: int
+    failed: int
+
+
+# ---------- Lookup Schemas ----------
+
+
+class ProductLookupRequest(SQLModel):
+    ids: list[uuid.UUID] = Field(
+        min_length=1, max_length=settings.PRODUCT_LOOKUP_MAX_IDS
+    )
+
+
+# Every requested id is a key of data, missing ids map to null
+class ProductLookupResponse(SQLModel):
+    data: dict[uuid.UUID, ProductResponse | None]
+    missing: list[uuid.UUID]
+
+
+# ---------- Change Feed Schemas ----------
+
+
+# Upserts are rows of values in the order of fields, to keep payloads small
+class ProductChangesResponse(SQLModel):
+    cursor: str
+    has_more: bool
+    fields: list[str]
+    upserts: list[list[Any]]
+    deleted: list[uuid.UUID]
+
+
+# ---------- Autocomplete Schemas ----------
+
+
+class ProductSuggestion(SQLModel):
+    id: uuid.UUID
+    title: str
+
+
+class ProductSuggestionsResponse(SQLModel):
+    data: list[ProductSuggestion]
+
+
+# ---------- Facet Schemas ----------
+
+
+class FacetValue(SQLModel):
+    value: Any
+    label: str | None
+    count: int
+
+
+# Total matching products, and counts per value of each requested facet
+class ProductFacetsResponse(SQLModel):
+    count: int
+    facets: dict[str, list[FacetValue]]
+
+
+# ---------- Repricing Schemas ----------
+
+
+# Applied in field order: base price (cost plus margin, or the current
+# price), adjustment, rounding, price ending, change limit, then the caps
+class RepricingRules(SQLModel):
+    # Price = cost * (1 + margin), from a supplier cost feed
+    margin: Decimal | None = Field(default=None, ge=0, le=100)
+    # Relative change, e.g. -0.15 for a 15% promotion
+    adjustment: Decimal | None = Field(default=None, gt=-1, le=100)
+    # Round to the nearest multiple, e.g. 0.05
+    round_to: Decimal | None = Field(default=None, gt=0, le=1000)
+    # Round up to the next price with these cents, e.g. 0.99
+    ending: Decimal | None = Field(default=None, ge=0, lt=1, decimal_places=2)
+    # Largest relative change from the current price, e.g. 0.2
+    max_change: Decimal | None = Field(default=None, gt=0, le=100)
+    min_price: Decimal | None = Field(default=None, ge=0, max_digits=12, decimal_places=2)
+    max_price: Decimal | None = Field(default=None, ge=0, max_digits=12, decimal_places=2)
+
+
+# A row of a supplier cost feed
+class CostFeedRow(SQLModel):
+    sku: str = Field(min_length=1, max_length=64)
+    cost: Decimal = Field(ge=0, max_digits=14, decimal_places=4)
+
+
+class PriceChange(SQLModel):
+    id: uuid.UUID
+    sku: str | None
+    title: str
+    old_price: Decimal | None
+    new_price: Decimal | None
+
+
+class RepricingReport(SQLModel):
+    dry_run: bool
+    # Cost feed rows
+    received: int
+    failed: int
+    errors: list[ImportRowError]
+    # Products the rules were evaluated for, and those whose price changes
+    matched: int
+    changed: int
+    increased: int
+    decreased: int
+    # Products left unchanged because their new price exceeds a price column
+    overflowed: int
+    # Prices written; fewer than changed when some moved during the run
+    updated: int
+    # The largest changes first, up to PRODUCT_REPRICE_DIFF_SIZE
+    changes: list[PriceChange]
+    elapsed_seconds: float
@@ -0,0 +1,192 @@
+"""
+products utils
+"""
+import csv
+import io
+import json
+import random
+import time
+import uuid
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from typing import Any, BinaryIO, Literal, TypeVar
+
+from redis.exceptions import RedisError
+from sqlmodel import Session, select
+
+from app.apis.products.models import Product
+from app.models import AuthUser
+from app.utils import response_cache
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+from app.utils.object_cache import ObjectCache
+from app.utils.redis_db import redis_client
+
+T = TypeVar("T")
+
+FileFormat = Literal["csv", "ndjson"]
+
+
+def can_access(owner_id: uuid.UUID, current_user: AuthUser) -> bool:
+    """
+    Verified users can manage every product, others only their own.
+    """
+    return current_user.is_verified or str(owner_id) == current_user.id
+
+
+# Response cache tags: product lists, single products, and bulk writes that
+# may touch any product
+PRODUCTS_TAG = "products"
+CATALOG_TAG = "catalog"
+
+product_cache = ObjectCache("product", Product)
+
+
+def product_tag(id: uuid.UUID) -> str:
+    return f"product:{id}"
+
+
+def invalidate_products(ids: Iterable[uuid.UUID] | None = None) -> None:
+    """
+    Drop cached products and product responses after a committed write.
+    Without ids every cached product is invalidated (bulk imports and syncs).
+    """
+    if ids is None:
+        product_cache.clear()
+        response_cache.invalidate(PRODUCTS_TAG, CATALOG_TAG)
+    else:
+        ids = list(ids)
+        product_cache.invalidate(*ids)
+        response_cache.invalidate(PRODUCTS_TAG, *(product_tag(id) for id in ids))
+
+
+# Product reads are counted in hourly sorted sets, so warm-up can preload the
+# products accessed most over the last PRODUCT_ACCESS_WINDOW_HOURS. Only a
+# sample of reads is counted, so most reads make no Redis call for it.
+def _access_key(hour: int) -> str:
+    return f"products:access:{hour}"
+
+
+def record_product_access(id: uuid.UUID, sample_rate: float | None = None) -> None:
+    rate = settings.PRODUCT_ACCESS_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or random.random() >= rate:
+        return
+    key = _access_key(int(time.time() // 3600))
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.zincrby(key, 1 / rate, str(id))
+        pipeline.expire(key, (settings.PRODUCT_ACCESS_WINDOW_HOURS + 1) * 3600)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning(f"Product access not recorded: {e}")
+
+
+def hot_product_ids(limit: int) -> list[uuid.UUID]:
+    """
+    Ids of the most read products over the access window.
+    """
+    hour = int(time.time() // 3600)
+    keys = [_access_key(hour - offset) for offset in range(settings.PRODUCT_ACCESS_WINDOW_HOURS)]
+    pipeline = redis_client.pipeline()
+    pipeline.zunionstore("products:access:window", keys)
+    pipeline.zrevrange("products:access:window", 0, limit - 1)
+    pipeline.delete("products:access:window")
+    _, ids, _ = pipeline.execute()
+    return [uuid.UUID(id) for id in ids]
+
+
+def warm_product_cache(session: Session, deadline: float) -> int:
+    """
+    Preload the hottest WARMUP_TOP_PRODUCTS products into the object cache,
+    stopping at the deadline (time.monotonic()).
+    """
+    count = 0
+    for ids in batched(hot_product_ids(settings.WARMUP_TOP_PRODUCTS), 500):
+        if time.monotonic() >= deadline:
+            break
+        products = session.exec(select(Product).where(Product.id.in_(ids))).all()
+        count += product_cache.prime(products)
+    return count
+
+
+def detect_format(filename: str | None, content_type: str | None = None) -> FileFormat | None:
+    """
+    Guess the upload format from the file name or content type.
+    """
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type in (
+        "application/x-ndjson",
+        "application/jsonl",
+    ):
+        return "ndjson"
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    return None
+
+
+def iter_rows(
+    stream: BinaryIO, fmt: FileFormat
+) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """
+    Stream rows out of a CSV or NDJSON file without loading it in memory.
+
+    Args:
+        stream: Binary file object (e.g. UploadFile.file or open(path, "rb"))
+        fmt: "csv" or "ndjson"
+    Yields:
+        (line number, parsed row or None, parse error or None)
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Empty cells are missing values, CSV can't tell them apart
+                parsed = {k: (v if v != "" else None) for k, v in row.items() if k}
+                yield reader.line_num, parsed, None
+        else:
+            for line_num, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_num, None, f"invalid JSON: {e.msg}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line_num, None, "expected a JSON object"
+                    continue
+                yield line_num, row, None
+    finally:
+        # Don't let the wrapper close the caller's stream
+        text.detach()
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """
+    Split an iterable into lists of at most `size` items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def copy_rows(
+    session: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> int:
+    """
+    Load rows into a table with COPY ... FROM STDIN on the session's connection.
+
+    Runs inside the session's current transaction so the rows are visible to
+    the statements that follow.
+    Returns:
+        Number of rows written
+    """
+    connection = session.connection().connection.driver_connection
+    count = 0
+    with connection.cursor() as cursor:
+        with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+    return count
@@ -0,0 +1,48 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+
+# Registers the built-in consumer groups reported by consumer_lag
+from app.apis.events import handlers  # noqa: F401
+from app.apis.events.consumers import consumer_lag
+from app.apis.events.outbox import outbox_backlog
+from app.utils.database import SessionDep
+from app.utils.object_cache import cache_stats
+from app.utils.security import get_current_active_superuser
+from app.utils.warmup import warmup
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+@router.get("/cache-stats", dependencies=[Depends(get_current_active_superuser)])
+def read_cache_stats() -> Any:
+    """
+    Hit/miss/eviction counters of this worker's object caches.
+    """
+    return cache_stats()
+
+
+@router.get("/events", dependencies=[Depends(get_current_active_superuser)])
+def read_event_stats(session: SessionDep) -> Any:
+    """
+    Outbox backlog, and lag and pending messages of each event consumer group.
+    """
+    return {"outbox": outbox_backlog(session), "consumers": consumer_lag()}
+
+
+@router.get("/health/live")
+def liveness() -> Any:
+    """
+    The worker is up.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+def readiness() -> Any:
+    """
+    The worker has finished its cache warm-up and can take traffic (503 until then).
+    """
+    report = warmup.report()
+    return ORJSONResponse(report, status_code=200 if report["ready"] else 503)
@@ -0,0 +1,80 @@
+"""
+Cached user and role lookups, see app.utils.object_cache.
+
+Email lookups are guarded by a Bloom filter of registered emails and a
+negative cache, so logins and signups for unknown emails (credential
+stuffing, typos) are answered without querying the user table.
+"""
+from collections.abc import Callable
+
+from sqlmodel import Session, select
+
+from app.apis.users.models import CachedUser, Role, User
+from app.utils.bloom import BloomFilter
+from app.utils.config import settings
+from app.utils.object_cache import NegativeCache, ObjectCache
+
+# Password hashes stay out of Redis: authentication loads the row itself
+user_cache = ObjectCache("user", User, view=CachedUser)
+role_cache = ObjectCache("role", Role)
+
+email_filter = BloomFilter(
+    "user_email", bits=settings.EMAIL_FILTER_BITS, hashes=settings.EMAIL_FILTER_HASHES
+)
+missing_emails = NegativeCache("user_email")
+
+
+def lookup_by_email(email: str, load: Callable[[], User | None]) -> User | None:
+    """
+    Run load() unless email is known not to belong to any user.
+    """
+    if not email_filter.might_contain(email) or missing_emails.contains(email):
+        return None
+    user = load()
+    if user is None:
+        missing_emails.add(email)
+    return user
+
+
+def email_registered(email: str) -> None:
+    """
+    Make a new or changed email visible to lookups. Call after the commit.
+    """
+    email_filter.add(email)
+    missing_emails.discard(email)
+
+
+def refresh_email_filter(session: Session) -> int | None:
+    """
+    Rebuild the email Bloom filter from the user table. Only one worker
+    rebuilds at a time, the others skip.
+
+    Returns:
+        Number of emails in the filter, None when another rebuild is running
+    """
+    lock = email_filter.start_rebuild()
+    if lock is None:
+        return None
+    try:
+        emails = session.execute(select(User.email).execution_options(yield_per=10_000)).scalars()
+        return email_filter.finish_rebuild(lock, emails)
+    finally:
+        lock.release()
+
+
+def warm_role_cache(session: Session) -> int:
+    """
+    Preload every role, and with them all permission sets, into the object cache.
+    """
+    return role_cache.prime(session.exec(select(Role)).all())
+
+
+def warm_email_filter(session: Session) -> int:
+    """
+    Build the email filter unless it was built already or another worker is
+    building it. A partial filter would reject real users, so the build isn't
+    bounded by the warm-up deadline.
+    """
+    if email_filter.built():
+        return 0
+    return refresh_email_filter(session) or 0
@@ -67,6 +67,15 @@ class User(UserBase, table=True):
     last_login: Optional[datetime] = Field(default=None, nullable=True)
     role_ids: List[str] = Field(default_factory=lambda: [], sa_column=Column(JSON))  # Stores role UUIDs
 
+# Cached Model: the user without credentials, see app.apis.users.cache
+class CachedUser(UserBase):
+    id: uuid.UUID
+    is_verified: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+    last_login: Optional[datetime]
+    role_ids: List[str] = Field(default_factory=lambda: [])
+
 # Output Model (Response)
 class UserResponsePublic(SQLModel):
     id: uuid.UUID
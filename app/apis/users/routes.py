@@ -3,9 +3,12 @@ from typing import Annotated, Any
 
 from app.utils.email_util import generate_new_account_email,send_email
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 
 from app.apis.users  import services as crud
+from app.apis.events.outbox import record_event
+from app.apis.users.cache import user_cache
 from app.apis.users.models import (
     User,
     UserCreateRequest,
@@ -23,6 +26,9 @@ from app.utils.security import (
     get_current_active_superuser,
 )
 from app.utils.database import SessionDep
+from app.utils.streaming import ExportFormat, export_response
+from app.utils.fields import parse_fields, projection_response
+from app.utils.responses import page_response
 
 from app.utils.config import settings
 from app.utils.security import get_password_hash, verify_password
@@ -41,21 +47,45 @@ userService = Annotated[SessionDep, Depends(SessionDep)]
     # dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersResponsePublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep, skip: int = 0, limit: int = 100, fields: str | None = None
+) -> Any:
     """
     Retrieve users.
+    Pass fields (e.g. fields=id,user_name) to only return those fields.
     """
 
-    users = crud.get_paginated_users(session=session, skip=skip, limit=limit)
-    count = len(users)
-    if not count:
-        raise HTTPException(status_code=404, detail="No users found")
-    if not users:
-        raise HTTPException(status_code=404, detail="No users found")
-    if len(users) == 0:
+    field_names = parse_fields(fields, UserResponsePublic)
+    rows = crud.get_paginated_user_fields(
+        session=session,
+        fields=field_names or tuple(UserResponsePublic.model_fields),
+        skip=skip,
+        limit=limit,
+    )
+    if not rows:
         raise HTTPException(status_code=404, detail="No users found")
+    if field_names:
+        return projection_response(UserResponsePublic, field_names, rows, len(rows))
+
+    return page_response(rows, len(rows))
 
-    return UsersResponsePublic(data=users, count=count)
+
+@router.get("/export", dependencies=[Depends(get_current_active_superuser)])
+def export_users(format: ExportFormat = "ndjson", gzip: bool = False) -> StreamingResponse:
+    """
+    Export users as NDJSON or CSV in a single streamed response.
+    """
+    statement = select(
+        User.id,
+        User.email,
+        User.user_name,
+        User.phone,
+        User.is_verified,
+        User.created_at,
+        User.updated_at,
+        User.last_login,
+    )
+    return export_response(statement, fmt=format, filename="users", gzip=gzip)
 
 
 @router.get("/profile", response_model=AuthUser)
@@ -72,7 +102,7 @@ def read_user_by_id(
     """
     Get a specific user by id.
     """
-    user = session.get(User, user_id)
+    user = user_cache.get(session, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not current_user.is_active:
@@ -101,8 +131,10 @@ def update_user_me(
     user_data = user_in.model_dump(exclude_unset=True)
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
+    record_event(session, "user.updated", current_user.id, {"fields": sorted(user_data)})
     session.commit()
     session.refresh(current_user)
+    user_cache.invalidate(current_user.id)
     return current_user
 
 
@@ -113,16 +145,21 @@ def update_password_me(
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    # The cached user has no password hash: check against the row itself
+    db_user = session.get(User, current_user.id)
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not verify_password(body.current_password, db_user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
     hashed_password = get_password_hash(body.new_password)
-    current_user.hashed_password = hashed_password
-    session.add(current_user)
+    db_user.hashed_password = hashed_password
+    session.add(db_user)
     session.commit()
+    user_cache.invalidate(current_user.id)
     return Message(message="Password updated successfully")
 
 
@@ -135,8 +172,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    session.delete(current_user)
-    session.commit()
+    crud.delete_user(uuid.UUID(current_user.id), session)
     return Message(message="User deleted successfully")
 
 
@@ -203,8 +239,5 @@ def delete_user(
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(User).where(col(User.id) == user_id)
-    session.exec(statement)  # type: ignore
-    session.delete(user)
-    session.commit()
+    crud.delete_user(user_id, session)
     return Message(message="User deleted successfully")
@@ -1,13 +1,18 @@
 """
 users services
 """
-from http.client import HTTPException
+from fastapi import HTTPException
 from typing import Optional, List
 import uuid
 from app.utils.database  import SessionDep
+from sqlalchemy import Row
 from sqlmodel import  select
-from app.apis.users.models import User, Role,UserCreateRequest,UserResponse,UserResponsePublic
+from app.apis.users.models import User, Role,RoleCreateRequest,UserCreateRequest,UserResponse,UserResponsePublic
+from app.apis.users.cache import email_registered, lookup_by_email, role_cache, user_cache
 from app.apis.users.schemas import   UserUpdateRequest
+from app.apis.events.outbox import record_event
+from app.apis.products.models import Product
+from app.apis.products.utils import invalidate_products
 from app.utils.security import  get_password_hash
 from app.utils.logging_utitl import logger
 # ---------- User Services ----------
@@ -33,8 +38,10 @@ def register_user(
     hashed_password=get_password_hash(user_create.password),
 )
     session.add(user)
+    record_event(session, "user.registered", user.id, {"email": user.email, "user_name": user.user_name})
     session.commit()
     session.refresh(user)
+    email_registered(user.email)
     return user
 
 def get_user_by_id(
@@ -45,7 +52,7 @@ def get_user_by_id(
     Get a user by id
     """
     
-    user = session.get(User, user_id)
+    user = user_cache.get(session, user_id)
     if not user:
         return None
     return user
@@ -59,7 +66,7 @@ def get_user_by_email(
     Get a user by email
     """
     statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = lookup_by_email(email, lambda: session.exec(statement).first())
     if not user:
         return None
     return user
@@ -96,6 +103,20 @@ def get_paginated_users(
     return users
 
 
+def get_paginated_user_fields(
+    session: SessionDep,
+    fields: tuple[str, ...],
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Row]:
+    """
+    Get a paginated list of users with only the given columns
+    """
+
+    statement = select(*[getattr(User, name) for name in fields]).offset(skip).limit(limit)
+    return session.execute(statement).all()
+
+
 def update_user(user_id: uuid.UUID, user_update: UserUpdateRequest, session: SessionDep) -> UserResponse:
     """
     Update a user
@@ -108,20 +129,28 @@ def update_user(user_id: uuid.UUID, user_update: UserUpdateRequest, session: Ses
     for key, value in user_data.items():
         setattr(user, key, value)
     session.add(user)
+    record_event(session, "user.updated", user.id, {"fields": sorted(user_data)})
     session.commit()
     session.refresh(user)
+    user_cache.invalidate(user.id)
+    if "email" in user_data:
+        email_registered(user.email)
     return user
 
 
 def delete_user(user_id: uuid.UUID, session: SessionDep) -> bool:
     """
-    Delete a user
+    Delete a user, and with them the products they own
     """
     user = session.get(User, user_id)
     if not user:
         return False
+    product_ids = session.exec(select(Product.id).where(Product.owner_id == user_id)).all()
     session.delete(user)
+    record_event(session, "user.deleted", user_id)
     session.commit()
+    user_cache.invalidate(user_id)
+    invalidate_products(product_ids)
     return True
 
 def get_user_role(user: User, session: SessionDep) -> Optional[Role]:
@@ -150,9 +179,31 @@ def assign_role_to_user(
     role = session.get(Role, role_id)
     if not role:
         return None
-    user.role = role
+    # Permissions are resolved from role_ids, through the user cache
+    if str(role.id) not in user.role_ids:
+        user.role_ids = [*user.role_ids, str(role.id)]
     session.add(user)
     session.commit()
     session.refresh(user)
+    user_cache.invalidate(user.id)
     return user
 
+
+def update_role(
+    role_id: uuid.UUID,
+    role_update: RoleCreateRequest,
+    session: SessionDep,
+) -> Optional[Role]:
+    """
+    Rename a role or replace its permissions
+    """
+    role = session.get(Role, role_id)
+    if not role:
+        return None
+    role.sqlmodel_update(role_update.model_dump(exclude_unset=True))
+    session.add(role)
+    session.commit()
+    session.refresh(role)
+    role_cache.invalidate(role.id)
+    return role
+
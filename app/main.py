@@ -1,10 +1,24 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
+from app.apis.interactions.index import start_interaction_reloader
+from app.apis.inventory.reservations import start_reservation_reaper
 from app.apis.main import api_router
+from app.apis.messaging.services import gateway
+from app.apis.orders.partitions import maintain_partitions
+from app.apis.products.catalog import start_catalog_refresher
+from app.apis.products.utils import warm_product_cache
+from app.apis.users.cache import warm_email_filter, warm_role_cache
 from app.utils.config import settings
+from app.utils.email_util import compile_email_templates
+from app.utils.object_cache import start_invalidation_listener
+from app.utils.warmup import WarmupStep, warmup
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,10 +28,42 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+WARMUP_STEPS: dict[str, WarmupStep] = {
+    # Only creates partitions: detaching is left to the scheduled maintenance
+    # script, so restarts never take ALTER TABLE locks on the order tables
+    "order_partitions": lambda session, deadline: len(maintain_partitions(session, retention=0)[0]),
+    "roles": lambda session, deadline: warm_role_cache(session),
+    "email_filter": lambda session, deadline: warm_email_filter(session),
+    "templates": lambda session, deadline: compile_email_templates(),
+    "products": warm_product_cache,
+}
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    cache_listener = start_invalidation_listener()
+    start_reservation_reaper()
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        start_catalog_refresher(follows_invalidations=cache_listener is not None)
+    if settings.INTERACTIONS_DATASET_PATH:
+        start_interaction_reloader()
+    if settings.WARMUP_ENABLED:
+        warmup.start(WARMUP_STEPS, budget=settings.WARMUP_TIME_BUDGET)
+    else:
+        warmup.done.set()
+    yield
+    await gateway.stop()
+    if cache_listener:
+        cache_listener.stop()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -0,0 +1,111 @@
+"""
+Concurrency benchmark of checkouts on a single hot product.
+
+Creates a throwaway priced product with plenty of stock, then runs full
+checkouts (stock decrement plus order insert, one transaction each) from
+many threads for a fixed time, once per shard count. Reports checkouts per
+second and checks that no stock was oversold. Needs the database; the
+product and its orders are deleted afterwards.
+
+    python -m app.scripts.bench_inventory --threads 32 --seconds 10 --shards 1 4 16
+"""
+import argparse
+import logging
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import Engine
+from sqlmodel import Session, create_engine, delete, select
+
+from app.apis.inventory.services import get_stock, set_stock
+from app.apis.orders.models import Order
+from app.apis.orders.schemas import CheckoutItem
+from app.apis.orders.services import create_order
+from app.apis.products.models import Product
+from app.apis.users.models import User
+from app.utils.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run(
+    engine: Engine, product_id: uuid.UUID, user_id: uuid.UUID, threads: int, seconds: float, run_id: str
+) -> tuple[int, int]:
+    """
+    Check out one unit per transaction from every thread until time is up.
+
+    Returns:
+        Successful checkouts and checkouts rejected for lack of stock
+    """
+    stop = threading.Event()
+    counts = {"ok": 0, "short": 0}
+    lock = threading.Lock()
+    cart = [CheckoutItem(product_id=product_id, quantity=1)]
+
+    def worker() -> None:
+        ok = short = 0
+        with Session(engine) as session:
+            while not stop.is_set():
+                try:
+                    create_order(session, user_id, cart, idempotency_key=f"{run_id}:{uuid.uuid4()}")
+                    ok += 1
+                except HTTPException:
+                    session.rollback()
+                    short += 1
+        with lock:
+            counts["ok"] += ok
+            counts["short"] += short
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    return counts["ok"], counts["short"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--stock", type=int, default=1_000_000)
+    parser.add_argument("--email", default=settings.FIRST_SUPERUSER, help="user placing the orders")
+    args = parser.parse_args()
+
+    engine = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI), pool_size=args.threads, max_overflow=0
+    )
+    run_id = f"bench-{uuid.uuid4()}"
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == args.email)).one()
+        product = Product(title="Inventory benchmark", owner_id=user.id, price=Decimal("1.00"))
+        session.add(product)
+        session.commit()
+        product_id, user_id = product.id, user.id
+
+    try:
+        logger.info(f"{'shards':>6} {'threads':>7} {'checkouts/s':>11} {'rejected':>8}")
+        for shards in args.shards:
+            with Session(engine) as session:
+                set_stock(session, product_id, available=args.stock, shards=shards)
+            ok, short = run(engine, product_id, user_id, args.threads, args.seconds, run_id)
+            with Session(engine) as session:
+                left = get_stock(session, product_id).available
+            assert left == args.stock - ok, f"stock is {left}, expected {args.stock - ok}"
+            logger.info(f"{shards:>6} {args.threads:>7} {ok / args.seconds:>11.0f} {short:>8}")
+    finally:
+        with Session(engine) as session:
+            session.exec(delete(Order).where(Order.idempotency_key.startswith(run_id)))
+            session.exec(delete(Product).where(Product.id == product_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark of list endpoint serialization.
+
+Compares the ORM path (SQLModel instances validated through response_model
+and encoded with stdlib json) with the fast path (result tuples to dicts,
+encoded by FastJSONResponse) through a real FastAPI app, so both include
+routing and response rendering. Needs no database.
+
+    python -m app.scripts.bench_serialization --rows 100 1000 10000
+"""
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+import uuid
+from collections import namedtuple
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.apis.products.models import Product, ProductResponse, ProductsResponse
+from app.utils.responses import page_response
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIELDS = tuple(ProductResponse.model_fields)
+# Stands in for the result rows of select(*columns): a tuple with _asdict()
+ResultRow = namedtuple("ResultRow", FIELDS)
+
+
+def make_tuples(count: int) -> list[tuple[Any, ...]]:
+    owner_id = uuid.uuid4()
+    rows = (
+        {
+            "title": f"Product {i}",
+            "description": f"Description of product {i}",
+            "price": Decimal(i % 1000) + Decimal("0.99"),
+            "id": uuid.uuid4(),
+            "owner_id": owner_id,
+        }
+        for i in range(count)
+    )
+    return [tuple(row[name] for name in FIELDS) for row in rows]
+
+
+def build_app(data: list[tuple[Any, ...]]) -> FastAPI:
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/orm", response_model=ProductsResponse)
+    def orm_path() -> Any:
+        # What select(Product) hands back: one model instance per row
+        products = [Product(**dict(zip(FIELDS, values, strict=True))) for values in data]
+        return ProductsResponse(data=products, count=len(products))
+
+    @app.get("/fast", response_model=ProductsResponse)
+    def fast_path() -> Any:
+        rows = [ResultRow(*values) for values in data]
+        return page_response(rows, len(rows))
+
+    return app
+
+
+def measure(call: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    """
+    Return the best CPU time in ms and the peak traced allocation in bytes.
+    """
+    call()  # warm up caches and schema builds
+    best = float("inf")
+    peak = 0
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        started = time.process_time()
+        call()
+        elapsed = time.process_time() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = min(best, elapsed)
+    return best * 1000, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logger.info(f"{'rows':>7} {'path':>5} {'cpu ms':>9} {'peak KiB':>10}")
+    for count in args.rows:
+        client = TestClient(build_app(make_tuples(count)))
+        results = {}
+        for path in ("orm", "fast"):
+            def call(path: str = path, client: TestClient = client) -> Any:
+                response = client.get(f"/{path}")
+                assert response.status_code == 200
+                return response
+
+            results[path] = measure(call, args.repeat)
+            cpu, peak = results[path]
+            logger.info(f"{count:>7} {path:>5} {cpu:>9.2f} {peak / 1024:>10.0f}")
+        speedup = results["orm"][0] / results["fast"][0]
+        logger.info(f"{count:>7} fast path is {speedup:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
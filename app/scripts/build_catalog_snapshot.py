@@ -0,0 +1,41 @@
+"""
+Build the memory-mapped catalog snapshot the API workers of this host share.
+
+Workers rebuild it on their own every CATALOG_SNAPSHOT_INTERVAL; run this
+before starting them so they begin with one, or to force a rebuild:
+
+    python -m app.scripts.build_catalog_snapshot --path /tmp/drughub/catalog.snapshot
+"""
+import argparse
+import logging
+import os
+import time
+
+from sqlmodel import Session
+
+from app.apis.products.catalog import CatalogSnapshot, build_snapshot
+from app.utils.config import settings
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--path", default=settings.CATALOG_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = build_snapshot(session, args.path)
+    elapsed = time.perf_counter() - started
+    snapshot = CatalogSnapshot(args.path)
+    logger.info(
+        f"Wrote {count} products to {args.path} ({os.path.getsize(args.path) / 1e6:.1f} MB) in {elapsed:.2f}s, "
+        f"horizon {snapshot.horizon}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Consume domain events from Redis Streams as one member of a consumer group.
+
+Run as many workers per group as its load needs, each with its own name:
+
+    python -m app.scripts.event_worker analytics --consumer analytics-1
+
+The name defaults to the host name, which a container keeps across restarts,
+so a restarted worker resumes the messages it left pending.
+"""
+import argparse
+import logging
+import socket
+
+from app.apis.events.handlers import consumer_groups
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("group", choices=sorted(consumer_groups), help="consumer group to join")
+    parser.add_argument(
+        "--consumer",
+        default=socket.gethostname(),
+        help="name of this worker within the group, stable across restarts to resume its pending messages",
+    )
+    args = parser.parse_args()
+
+    group = consumer_groups[args.group]
+    logger.info(f"Consuming {group.streams} as {args.consumer} in group {group.name}")
+    group.run(args.consumer)
+
+
+if __name__ == "__main__":
+    main()
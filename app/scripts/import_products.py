@@ -0,0 +1,57 @@
+import argparse
+import logging
+
+from sqlmodel import Session, select
+
+from app.apis.products.importer import import_products
+from app.apis.products.utils import detect_format, invalidate_products
+from app.apis.users.models import User
+from app.utils.config import settings
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bulk import products from a CSV or NDJSON file."
+    )
+    parser.add_argument("path", help="CSV or NDJSON file to import")
+    parser.add_argument("--owner-email", required=True, help="Email of the owning user")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.PRODUCT_IMPORT_BATCH_SIZE
+    )
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if not fmt:
+        parser.error("could not detect the file format, pass --format")
+
+    with Session(engine) as session:
+        owner = session.exec(select(User).where(User.email == args.owner_email)).first()
+        if not owner:
+            parser.error(f"no user with email {args.owner_email}")
+        with open(args.path, "rb") as stream:
+            report = import_products(
+                session=session,
+                owner_id=owner.id,
+                stream=stream,
+                fmt=fmt,
+                batch_size=args.batch_size,
+            )
+    # Evicts every worker's cached products and catalog snapshot lookups
+    invalidate_products()
+
+    for error in report.errors:
+        logger.warning(f"line {error.line}: {'; '.join(error.errors)}")
+    logger.info(
+        f"Imported {report.imported} products from {report.received} rows "
+        f"({report.failed} failed) in {report.elapsed_seconds}s, "
+        f"{report.rows_per_second} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Load test the WebSocket gateway: concurrent connections and fan-out throughput.
+
+Opens --connections sockets as the given user, subscribes them all to one
+topic, publishes --messages notifications to it through Redis at --rate per
+second, and reports connect time, delivery throughput, end-to-end latency
+and connections dropped for falling behind. Point it at a single worker
+(uvicorn app.main:app --workers 1) to measure per-worker capacity:
+
+    python -m app.scripts.load_test_ws --url ws://localhost:8080/api/v1/messaging/ws --connections 2000 --messages 200 --email seller@example.com
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+import websockets
+from sqlmodel import Session, select
+
+from app.apis.messaging.services import TOKEN_SUBPROTOCOL, publish_to_topic
+from app.apis.users.models import User
+from app.utils.database import engine
+from app.utils.security import create_access_token
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Results:
+    def __init__(self) -> None:
+        self.connected = 0
+        self.failed = 0
+        self.received = 0
+        self.dropped = 0
+        self.latencies: list[float] = []
+
+
+async def client(url: str, token: str, topic: str, expected: int, results: Results, go: asyncio.Event) -> None:
+    try:
+        async with websockets.connect(
+            url, subprotocols=[TOKEN_SUBPROTOCOL, token], max_queue=None, open_timeout=60
+        ) as socket:
+            await socket.send(orjson.dumps({"action": "subscribe", "topic": topic}).decode())
+            await socket.recv()
+            results.connected += 1
+            await go.wait()
+            received = 0
+            while received < expected:
+                message = orjson.loads(await socket.recv())
+                received += 1
+                results.received += 1
+                sent_at = datetime.fromisoformat(message["sent_at"])
+                results.latencies.append((datetime.utcnow() - sent_at).total_seconds())
+    except websockets.ConnectionClosed as e:
+        if e.rcvd and e.rcvd.code == 1013:
+            results.dropped += 1
+        else:
+            results.failed += 1
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake):
+        results.failed += 1
+
+
+async def run(url: str, token: str, connections: int, messages: int, rate: float, timeout: float) -> Results:
+    topic = f"loadtest:{uuid.uuid4().hex[:12]}"
+    results = Results()
+    go = asyncio.Event()
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(client(url, token, topic, messages, results, go)) for _ in range(connections)]
+    # Wait for every client to subscribe (or fail)
+    while results.connected + results.failed < connections:
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - started
+    logger.info(f"{results.connected} connected, {results.failed} failed in {connect_seconds:.2f}s")
+
+    go.set()
+    started = time.perf_counter()
+    for index in range(messages):
+        await asyncio.to_thread(publish_to_topic, topic, "loadtest", {"seq": index})
+        if rate:
+            await asyncio.sleep(max(0.0, started + (index + 1) / rate - time.perf_counter()))
+    await asyncio.wait(tasks, timeout=timeout)
+    elapsed = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+
+    latencies = sorted(results.latencies) or [0.0]
+    logger.info(
+        f"Delivered {results.received} of {results.connected * messages} messages in {elapsed:.2f}s: "
+        f"{results.received / elapsed:.0f} msg/s, latency p50 {statistics.median(latencies) * 1000:.1f}ms "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms, "
+        f"{results.dropped} dropped as slow consumers"
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="ws://localhost:8080/api/v1/messaging/ws")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=100, help="messages published to the topic")
+    parser.add_argument("--rate", type=float, default=0, help="messages published per second, 0 for as fast as possible")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for deliveries")
+    parser.add_argument("--email", required=True, help="user the connections sign in as")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == args.email)).first()
+    if not user:
+        parser.error(f"no user {args.email}")
+    token = create_access_token(user.id, timedelta(hours=1), [])
+    asyncio.run(run(args.url, token, args.connections, args.messages, args.rate, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Create upcoming monthly order partitions and detach expired ones.
+
+Run once, e.g. from cron, or keep it running with --every (docker-compose
+runs it daily that way). Workers also create partitions at startup, but
+only this script detaches old ones:
+
+    python -m app.scripts.maintain_order_partitions --ahead 3 --retention 36 --every 86400
+"""
+import argparse
+import logging
+import time
+
+from sqlmodel import Session
+
+from app.apis.orders.partitions import maintain_partitions
+from app.utils.config import settings
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--ahead", type=int, default=settings.ORDER_PARTITIONS_AHEAD, help="months to create in advance"
+    )
+    parser.add_argument(
+        "--retention",
+        type=int,
+        default=settings.ORDER_PARTITION_RETENTION_MONTHS,
+        help="months to keep attached, 0 keeps all",
+    )
+    parser.add_argument(
+        "--every", type=float, default=0, help="seconds between runs, 0 runs once and exits"
+    )
+    args = parser.parse_args()
+
+    while True:
+        try:
+            with Session(engine) as session:
+                created, detached = maintain_partitions(session, ahead=args.ahead, retention=args.retention)
+            logger.info(f"Created {len(created)} partitions {created}, detached {len(detached)} {detached}")
+        except Exception as e:
+            if not args.every:
+                raise
+            # Retried at the next run; ORDER_PARTITIONS_AHEAD months leave time
+            logger.error(f"Order partition maintenance failed: {e}")
+        if not args.every:
+            return
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
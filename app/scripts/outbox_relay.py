@@ -0,0 +1,33 @@
+"""
+Publish committed domain events from the outbox table to Redis Streams.
+
+Run one or more next to the API; parallel relays take different rows:
+
+    python -m app.scripts.outbox_relay --interval 0.5
+"""
+import argparse
+import logging
+
+from app.apis.events.outbox import run_relay
+from app.utils.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=settings.EVENT_RELAY_INTERVAL,
+        help="seconds between polls once the outbox is drained",
+    )
+    args = parser.parse_args()
+
+    logger.info("Outbox relay started")
+    run_relay(args.interval)
+
+
+if __name__ == "__main__":
+    main()
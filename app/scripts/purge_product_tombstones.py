@@ -0,0 +1,46 @@
+"""
+Delete product tombstones past PRODUCT_TOMBSTONE_RETENTION_DAYS.
+
+Run once, e.g. from cron, or keep it running with --every (docker-compose
+runs it daily that way). Change feed cursors older than the retention get
+a 410 anyway, so the tombstones they would need can go:
+
+    python -m app.scripts.purge_product_tombstones --every 86400
+"""
+import argparse
+import logging
+import time
+
+from sqlmodel import Session
+
+from app.apis.products.changes import purge_tombstones
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--every", type=float, default=0, help="seconds between runs, 0 runs once and exits"
+    )
+    args = parser.parse_args()
+
+    while True:
+        try:
+            with Session(engine) as session:
+                purged = purge_tombstones(session)
+            logger.info(f"Purged {purged} product tombstones")
+        except Exception as e:
+            if not args.every:
+                raise
+            # Retried at the next run; tombstones only pile up meanwhile
+            logger.error(f"Product tombstone purge failed: {e}")
+        if not args.every:
+            return
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
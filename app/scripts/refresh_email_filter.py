@@ -0,0 +1,29 @@
+"""
+Rebuild the Bloom filter of registered emails from the user table.
+
+Run from cron to drop emails of deleted users, which the filter otherwise
+keeps reporting as possibly registered:
+
+    python -m app.scripts.refresh_email_filter
+"""
+import logging
+import time
+
+from sqlmodel import Session
+
+from app.apis.users.cache import refresh_email_filter
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = refresh_email_filter(session)
+    logger.info(f"Email filter rebuilt with {count} emails in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
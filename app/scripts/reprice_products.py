@@ -0,0 +1,80 @@
+import argparse
+import logging
+
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.apis.products.pricing import reprice_products
+from app.apis.products.schemas import RepricingRules
+from app.apis.products.utils import detect_format, invalidate_products
+from app.apis.users.models import User
+from app.utils.config import settings
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Reprice a seller's products with margin, adjustment, rounding and cap rules."
+    )
+    parser.add_argument("rules", help="JSON file of repricing rules")
+    parser.add_argument("--owner-email", required=True, help="Email of the owning user")
+    parser.add_argument("--costs", help="CSV or NDJSON supplier cost file, rows of sku and cost")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--apply", action="store_true", help="Write the prices, dry run otherwise")
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.PRODUCT_REPRICE_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--diff-size", type=int, default=settings.PRODUCT_REPRICE_DIFF_SIZE, help="Changes to list"
+    )
+    args = parser.parse_args()
+
+    with open(args.rules, "rb") as file:
+        rules = RepricingRules.model_validate_json(file.read())
+    fmt = None
+    if args.costs:
+        fmt = args.format or detect_format(args.costs)
+        if not fmt:
+            parser.error("could not detect the cost file format, pass --format")
+
+    with Session(engine) as session:
+        owner = session.exec(select(User).where(User.email == args.owner_email)).first()
+        if not owner:
+            parser.error(f"no user with email {args.owner_email}")
+        costs = open(args.costs, "rb") if args.costs else None
+        try:
+            report = reprice_products(
+                session=session,
+                owner_id=owner.id,
+                rules=rules,
+                costs=costs,
+                fmt=fmt,
+                dry_run=not args.apply,
+                batch_size=args.batch_size,
+                diff_size=args.diff_size,
+            )
+        except HTTPException as e:
+            parser.error(e.detail)
+        finally:
+            if costs:
+                costs.close()
+    if report.updated:
+        # Evicts every worker's cached products and catalog snapshot lookups
+        invalidate_products()
+
+    for error in report.errors:
+        logger.warning(f"line {error.line}: {'; '.join(error.errors)}")
+    for change in report.changes:
+        logger.info(f"{change.sku or change.id} {change.title}: {change.old_price} -> {change.new_price}")
+    logger.info(
+        f"{'Repriced' if args.apply else 'Dry run'}: {report.matched} products matched, "
+        f"{report.changed} changed ({report.increased} up, {report.decreased} down), "
+        f"{report.updated} updated in {report.elapsed_seconds}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
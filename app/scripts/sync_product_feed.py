@@ -0,0 +1,59 @@
+import argparse
+import logging
+
+from sqlmodel import Session, select
+
+from app.apis.products.feed_sync import sync_feed
+from app.apis.products.utils import detect_format, invalidate_products
+from app.apis.users.models import User
+from app.utils.config import settings
+from app.utils.database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Sync a seller's products with a full supplier catalog feed."
+    )
+    parser.add_argument("path", help="CSV or NDJSON feed file, rows keyed by sku")
+    parser.add_argument("--owner-email", required=True, help="Email of the owning user")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.PRODUCT_IMPORT_BATCH_SIZE
+    )
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if not fmt:
+        parser.error("could not detect the file format, pass --format")
+
+    with Session(engine) as session:
+        owner = session.exec(select(User).where(User.email == args.owner_email)).first()
+        if not owner:
+            parser.error(f"no user with email {args.owner_email}")
+        with open(args.path, "rb") as stream:
+            report = sync_feed(
+                session=session,
+                owner_id=owner.id,
+                stream=stream,
+                fmt=fmt,
+                batch_size=args.batch_size,
+            )
+    # Evicts every worker's cached products and catalog snapshot lookups
+    invalidate_products()
+
+    for error in report.errors:
+        logger.warning(f"line {error.line}: {'; '.join(error.errors)}")
+    if report.deletions_skipped:
+        logger.warning("Too many products missing from the feed, deletions were skipped")
+    logger.info(
+        f"Synced {report.received} rows: {report.unchanged} unchanged, "
+        f"{report.inserted} inserted, {report.updated} updated, {report.deleted} deleted, "
+        f"{report.failed} failed in {report.elapsed_seconds}s, {report.rows_per_second} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import uuid
+
+from app.utils.bloom import BloomFilter
+from app.utils.redis_db import redis_client
+
+
+def test_offsets_are_stable_and_in_range() -> None:
+    bloom = BloomFilter("test", bits=1024, hashes=7)
+    offsets = bloom._offsets("user@example.com")
+    assert offsets == bloom._offsets("user@example.com")
+    assert len(offsets) == 7
+    assert all(0 <= offset < 1024 for offset in offsets)
+    assert offsets != bloom._offsets("other@example.com")
+
+
+def test_add_does_not_create_an_unbuilt_filter() -> None:
+    bloom = BloomFilter(f"test_{uuid.uuid4().hex}", bits=1024, hashes=7)
+    bloom.add("new@example.com")
+    assert not bloom.built()
+    assert bloom.might_contain("old@example.com")
+
+
+def test_rebuild_keeps_values_added_meanwhile() -> None:
+    bloom = BloomFilter(f"test_{uuid.uuid4().hex}", bits=1024, hashes=7)
+    lock = bloom.start_rebuild()
+    assert lock is not None
+    assert bloom.start_rebuild() is None
+    bloom.add("new@example.com")
+    assert bloom.finish_rebuild(lock, ["old@example.com"]) == 1
+    assert bloom.built()
+    assert bloom.might_contain("old@example.com") and bloom.might_contain("new@example.com")
+    assert not bloom.might_contain("other@example.com")
+    # The lock was released with the swap
+    assert bloom.start_rebuild() is not None
+
+
+def test_rebuild_that_lost_its_lock_is_discarded() -> None:
+    bloom = BloomFilter(f"test_{uuid.uuid4().hex}", bits=1024, hashes=7)
+    lock = bloom.start_rebuild()
+    assert lock is not None
+    lock.release()
+    assert bloom.finish_rebuild(lock, ["old@example.com"]) is None
+    assert not bloom.built()
+
+
+def test_filter_without_a_rebuild_is_not_built() -> None:
+    bloom = BloomFilter(f"test_{uuid.uuid4().hex}", bits=1024, hashes=7)
+    # Left by add() before it checked that the filter exists
+    redis_client.setbit(bloom.key, bloom._offsets("new@example.com")[0], 1)
+    assert not bloom.built()
+    redis_client.delete(bloom.key)
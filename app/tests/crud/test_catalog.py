@@ -0,0 +1,80 @@
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from app.apis.products import catalog
+from app.apis.products.catalog import CatalogSnapshot, write_snapshot
+
+OWNER = uuid.uuid4()
+OTHER = uuid.uuid4()
+ROWS = [
+    (uuid.uuid4(), OWNER, "Paracetamol 500mg", "Tablets", Decimal("4.50")),
+    (uuid.uuid4(), OTHER, "paracetamol  syrup", None, None),
+    (uuid.uuid4(), OWNER, "Ibuprofen", "", Decimal("12.00")),
+    (uuid.uuid4(), OWNER, "Pansement", "Pack of 20", Decimal("0.99")),
+]
+
+
+def _row(row: tuple) -> dict:
+    return dict(zip(("id", "owner_id", "title", "description", "price"), row, strict=True))
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> str:
+    path = str(tmp_path / "catalog.snapshot")
+    write_snapshot(path, ROWS, built_at=time.time(), horizon=42)
+    return path
+
+
+def test_lookup_by_id(path: str) -> None:
+    snapshot = CatalogSnapshot(path)
+    assert len(snapshot) == 4 and snapshot.horizon == 42
+    for row in ROWS:
+        assert snapshot.get(row[0]) == _row(row)
+    assert snapshot.get(uuid.uuid4()) is None
+
+
+def test_autocomplete_matches_normalized_prefix(path: str) -> None:
+    snapshot = CatalogSnapshot(path)
+    titles = [row["title"] for row in snapshot.autocomplete("PARA", 10)]
+    assert titles == ["Paracetamol 500mg", "paracetamol  syrup"]
+    assert [row["title"] for row in snapshot.autocomplete("pa", 10)] == [
+        "Pansement", "Paracetamol 500mg", "paracetamol  syrup"
+    ]
+    assert len(snapshot.autocomplete("pa", 2)) == 2
+    assert snapshot.autocomplete("x", 10) == []
+
+    own = [row["title"] for row in snapshot.autocomplete("para", 10, owner_id=OWNER)]
+    assert own == ["Paracetamol 500mg"]
+    assert snapshot.autocomplete("ibu", 10, owner_id=OTHER) == []
+
+
+def test_replaced_snapshot_stays_readable(path: str) -> None:
+    old = CatalogSnapshot(path)
+    write_snapshot(path, ROWS[:1], built_at=time.time(), horizon=43)
+    new = CatalogSnapshot(path)
+    assert new.inode != old.inode and len(new) == 1
+    assert old.get(ROWS[3][0]) == _row(ROWS[3])
+
+
+def test_fresh_rows_skip_changed_and_untrusted(path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    snapshot = CatalogSnapshot(path)
+    monkeypatch.setattr(catalog, "_snapshot", snapshot)
+    monkeypatch.setattr(catalog, "_changed", {})
+    monkeypatch.setattr(catalog, "_lookups_from", snapshot.built_at - 10)
+    ids = [row[0] for row in ROWS[:2]]
+    new = uuid.uuid4()
+
+    found, missing = catalog.fresh_rows([*ids, new])
+    assert found == {row[0]: _row(row) for row in ROWS[:2]} and missing == [new]
+
+    catalog._on_product_eviction([ids[0]])
+    found, missing = catalog.fresh_rows(ids)
+    assert list(found) == [ids[1]] and missing == [ids[0]]
+
+    # A catalog-wide write: nothing is served until a newer snapshot
+    catalog._on_product_eviction(None)
+    assert catalog.fresh_rows(ids) == ({}, ids)
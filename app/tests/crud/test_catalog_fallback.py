@@ -0,0 +1,12 @@
+from sqlalchemy import literal, select
+from sqlmodel import Session
+
+from app.apis.products.catalog import normalize, normalized_sql
+from app.utils.database import engine
+
+
+def test_sql_keys_match_snapshot_keys() -> None:
+    titles = ["Aspirin   Extra  Strength", "  Para\tcetamol 500MG ", "ibuprofen\n gel", "Zinc"]
+    with Session(engine) as session:
+        keys = [session.execute(select(normalized_sql(literal(title)))).scalar_one() for title in titles]
+    assert keys == [normalize(title) for title in titles]
@@ -0,0 +1,35 @@
+import uuid
+
+from sqlmodel import Session
+
+from app.apis.events.consumers import ConsumerGroup, consumer_groups
+from app.apis.events.models import StreamEvent
+from app.apis.events.outbox import record_event, relay_batch, stream_for
+from app.utils.config import settings
+from app.utils.database import engine
+from app.utils.redis_db import redis_client
+
+
+def test_relayed_event_reaches_a_consumer() -> None:
+    aggregate_id = uuid.uuid4()
+    received: list[StreamEvent] = []
+    group = ConsumerGroup(f"test-{uuid.uuid4().hex}", [stream_for("relaytest.done")], received.append)
+    group.ensure()
+    try:
+        with Session(engine) as session:
+            record_event(session, "relaytest.done", aggregate_id, {"step": 1})
+            session.commit()
+            # The outbox may hold other events too
+            while relay_batch(session) == settings.EVENT_RELAY_BATCH_SIZE:
+                pass
+
+        while group.poll("test", block_ms=100):
+            pass
+        events = [event for event in received if event.aggregate_id == aggregate_id]
+        assert len(events) == 1
+        assert (events[0].type, events[0].payload, events[0].stream) == ("relaytest.done", {"step": 1}, "events:relaytest")
+        # Acknowledged once handled
+        assert redis_client.xpending(events[0].stream, group.name)["pending"] == 0
+    finally:
+        redis_client.xgroup_destroy(group.streams[0], group.name)
+        consumer_groups.pop(group.name)
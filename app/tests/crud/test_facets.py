@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.apis.products.facets import normalized_query, parse_facets, price_band_label
+
+
+def test_parse_facets_sorts_and_rejects_unknown() -> None:
+    assert parse_facets(" seller,price_band,seller") == ["price_band", "seller"]
+    for facets in ("category", ","):
+        with pytest.raises(HTTPException) as error:
+            parse_facets(facets)
+        assert error.value.status_code == 400
+
+
+def test_equivalent_queries_normalize_alike() -> None:
+    utc = datetime(2026, 1, 1, 12)
+    one = normalized_query(
+        ["seller"], {"title_prefix": "Para", "price_min": Decimal("5.00"), "created_from": utc}, 10
+    )
+    other = normalized_query(
+        ["seller"],
+        {
+            "created_from": utc.replace(hour=14, tzinfo=timezone(timedelta(hours=2))),
+            "price_min": Decimal("5"),
+            "title_prefix": "PARA",
+            "owner_id": None,
+        },
+        10,
+    )
+    assert one == other
+    assert one != normalized_query(["seller"], {"title_prefix": "para"}, 20)
+
+
+def test_price_band_labels() -> None:
+    assert [price_band_label(band) for band in (0, 1, 6, None)] == ["0-5", "5-10", "200+", "No price"]
@@ -0,0 +1,29 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.apis.products.models import ProductResponse
+from app.utils.fields import parse_fields, projection_adapter
+
+
+def test_parse_fields_uses_model_order() -> None:
+    assert parse_fields(None, ProductResponse) is None
+    assert parse_fields("id, title", ProductResponse) == ("title", "id")
+    assert parse_fields("id,title", ProductResponse) == parse_fields("title,id", ProductResponse)
+
+
+def test_parse_fields_rejects_unknown_fields() -> None:
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("title,hashed_password", ProductResponse)
+    assert exc.value.status_code == 400
+
+
+def test_projection_adapter_is_cached_and_only_dumps_fields() -> None:
+    adapter = projection_adapter(ProductResponse, ("title", "id"))
+    assert projection_adapter(ProductResponse, ("title", "id")) is adapter
+    id = uuid.uuid4()
+    page = adapter.dump_python(
+        {"data": [{"title": "Aspirin", "id": id}], "count": 1}, mode="json"
+    )
+    assert page == {"data": [{"title": "Aspirin", "id": str(id)}], "count": 1}
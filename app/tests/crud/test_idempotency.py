@@ -0,0 +1,44 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.apis.orders.schemas import CheckoutItem, CheckoutRequest
+from app.apis.orders.services import merge_lines
+from app.utils import idempotency
+
+PRODUCT_A = uuid.UUID(int=1)
+PRODUCT_B = uuid.UUID(int=2)
+
+
+def _cart(*items: tuple[uuid.UUID, int]) -> CheckoutRequest:
+    return CheckoutRequest(items=[CheckoutItem(product_id=id, quantity=qty) for id, qty in items])
+
+
+def test_fingerprint_depends_on_body() -> None:
+    cart = _cart((PRODUCT_A, 1))
+    assert idempotency.request_fingerprint(cart) == idempotency.request_fingerprint(_cart((PRODUCT_A, 1)))
+    assert idempotency.request_fingerprint(cart) != idempotency.request_fingerprint(_cart((PRODUCT_A, 2)))
+
+
+def test_replay_returns_stored_response() -> None:
+    stored = {"state": "done", "fingerprint": "f", "status_code": 201, "body": '{"id":"1"}'}
+    response = idempotency._replay(stored, "f")
+    assert response.status_code == 201
+    assert response.body == b'{"id":"1"}'
+    assert response.headers["idempotent-replayed"] == "true"
+
+
+@pytest.mark.parametrize(
+    ("stored", "status_code"),
+    [({"state": "processing"}, 409), ({"state": "done", "fingerprint": "other"}, 422)],
+)
+def test_replay_rejects_in_flight_and_reused_keys(stored: dict, status_code: int) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        idempotency._replay(stored, "f")
+    assert exc_info.value.status_code == status_code
+
+
+def test_merge_lines_adds_up_repeated_products_in_cart_order() -> None:
+    cart = _cart((PRODUCT_B, 1), (PRODUCT_A, 2), (PRODUCT_B, 3))
+    assert list(merge_lines(cart.items).items()) == [(PRODUCT_B, 4), (PRODUCT_A, 2)]
@@ -0,0 +1,62 @@
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from app.apis.interactions import index as interactions
+from app.apis.interactions.index import SEVERITIES, InteractionIndex, parse_dataset
+
+DATASET = b"""ingredient_a,ingredient_b,severity,description
+warfarin,aspirin,major,Bleeding risk
+ASPIRIN,IBUPROFEN,moderate,Reduced cardioprotection
+Aspirin,Warfarin,moderate,Listed twice
+sildenafil,nitroglycerin,contraindicated,Severe hypotension
+aspirin,aspirin,minor,Same ingredient
+paracetamol,,minor,Missing pair
+ibuprofen,lithium,unknown,Bad severity
+"""
+
+
+def _index() -> InteractionIndex:
+    pairs, skipped = parse_dataset(io.BytesIO(DATASET), "csv")
+    assert skipped == 3
+    return InteractionIndex(pairs, "test")
+
+
+def test_parse_keeps_the_most_severe_duplicate() -> None:
+    pairs, _ = parse_dataset(io.BytesIO(DATASET), "csv")
+    assert pairs[("ASPIRIN", "WARFARIN")] == (SEVERITIES.index("major"), "Bleeding risk")
+    assert len(pairs) == 3
+
+
+def test_check_finds_every_interacting_pair() -> None:
+    index = _index()
+    found = index.check(["WARFARIN", "IBUPROFEN", "ASPIRIN", "UNKNOWN"])
+    assert sorted((a, b, SEVERITIES[severity]) for a, b, severity, _ in found) == [
+        ("ASPIRIN", "IBUPROFEN", "moderate"),
+        ("ASPIRIN", "WARFARIN", "major"),
+    ]
+    assert index.check(["WARFARIN", "IBUPROFEN", "SILDENAFIL"]) == []
+    assert index.check([]) == []
+    assert "NITROGLYCERIN" in index and "LITHIUM" not in index
+    assert index.stats() == {"version": "test", "ingredients": 5, "interactions": 3}
+
+
+def test_reload_swaps_the_index_when_the_file_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(interactions, "_index", None)
+    monkeypatch.setattr(interactions, "_loaded_stat", None)
+    path = tmp_path / "interactions.csv"
+    path.write_bytes(DATASET)
+    first = interactions.reload_index(str(path))
+    assert first is interactions.current_index()
+    assert interactions.reload_index(str(path)) is first
+
+    replacement = tmp_path / "interactions.csv.new"
+    replacement.write_bytes(b"ingredient_a,ingredient_b,severity,description\na,b,minor,\n")
+    os.replace(replacement, path)
+    second = interactions.reload_index(str(path))
+    assert second is not first and second.version != first.version
+    assert second.check(["A", "B"]) == [("A", "B", 0, "")]
+    # Requests still holding the old index keep a consistent view
+    assert first.check(["A", "B"]) == []
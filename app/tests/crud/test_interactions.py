@@ -0,0 +1,73 @@
+import io
+import uuid
+from collections.abc import Generator
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, delete
+
+from app.apis.interactions import index as interactions
+from app.apis.interactions.index import InteractionIndex, parse_dataset
+from app.apis.interactions.services import check_interactions
+from app.apis.products.models import Product
+from app.apis.users.models import User
+from app.utils.database import engine
+
+DATASET = b"""ingredient_a,ingredient_b,severity,description
+warfarin,aspirin,major,Bleeding risk
+aspirin,ibuprofen,moderate,Reduced cardioprotection
+"""
+
+INGREDIENTS = [["WARFARIN", "ASPIRIN"], ["ASPIRIN", "WARFARIN"], ["IBUPROFEN", "XYZ123"], []]
+
+
+@pytest.fixture
+def cart(monkeypatch: pytest.MonkeyPatch) -> Generator[list[uuid.UUID], None, None]:
+    pairs, _ = parse_dataset(io.BytesIO(DATASET), "csv")
+    monkeypatch.setattr(interactions, "_index", InteractionIndex(pairs, "test"))
+    with Session(engine) as session:
+        user = User(
+            email=f"{uuid.uuid4().hex}@interactions.test", user_name="Interactions", phone="0000000000",
+            hashed_password="x",
+        )
+        session.add(user)
+        session.flush()
+        products = [
+            Product(owner_id=user.id, title=f"Product {n}", ingredients=codes) for n, codes in enumerate(INGREDIENTS)
+        ]
+        session.add_all(products)
+        session.commit()
+        yield [product.id for product in products]
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def test_each_pair_of_products_is_reported_once(cart: list[uuid.UUID]) -> None:
+    first, second, third, fourth = cart
+    with Session(engine) as session:
+        result = check_interactions(session, cart)
+    assert [(found.product_ids, found.ingredients, found.severity) for found in result.interactions] == [
+        ([first, second], ["ASPIRIN", "WARFARIN"], "major"),
+        ([first, third], ["ASPIRIN", "IBUPROFEN"], "moderate"),
+        ([second, third], ["ASPIRIN", "IBUPROFEN"], "moderate"),
+    ]
+    assert result.unknown_ingredients == ["XYZ123"]
+    assert result.unlinked_product_ids == [fourth]
+    assert result.dataset_version == "test"
+
+    with Session(engine) as session:
+        result = check_interactions(session, [third, second], min_severity="major")
+    assert result.interactions == []
+
+
+def test_missing_products_and_dataset_are_rejected(cart: list[uuid.UUID], monkeypatch: pytest.MonkeyPatch) -> None:
+    with Session(engine) as session:
+        with pytest.raises(HTTPException) as e:
+            check_interactions(session, [cart[0], uuid.uuid4()])
+        assert e.value.status_code == 400
+
+        monkeypatch.setattr(interactions, "_index", None)
+        with pytest.raises(HTTPException) as e:
+            check_interactions(session, cart)
+        assert e.value.status_code == 503
@@ -0,0 +1,132 @@
+import time
+import uuid
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, delete, select
+
+from app.apis.inventory import reservations
+from app.apis.inventory.models import InventoryShard
+from app.apis.inventory.services import get_stock, set_stock, take_stock
+from app.apis.products.models import Product
+from app.apis.users.models import User
+from app.utils.config import settings
+from app.utils.database import engine
+
+
+@pytest.fixture
+def products() -> Generator[tuple[uuid.UUID, uuid.UUID, uuid.UUID], None, None]:
+    """
+    An owner and two of their products, neither stock-tracked yet.
+    """
+    with Session(engine) as session:
+        user = User(
+            email=f"{uuid.uuid4().hex}@inventory.test", user_name="Inventory", phone="0000000000", hashed_password="x"
+        )
+        session.add(user)
+        session.flush()
+        first, second = Product(owner_id=user.id, title="First"), Product(owner_id=user.id, title="Second")
+        session.add_all([first, second])
+        session.commit()
+        yield user.id, first.id, second.id
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def _shards(session: Session, product_id: uuid.UUID) -> list[int]:
+    return list(
+        session.exec(
+            select(InventoryShard.available)
+            .where(InventoryShard.product_id == product_id)
+            .order_by(InventoryShard.shard)
+        )
+    )
+
+
+def test_set_stock_spreads_over_shards(products: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    _, product_id, _ = products
+    with Session(engine) as session:
+        set_stock(session, product_id, available=10, shards=3)
+        assert _shards(session, product_id) == [4, 3, 3]
+        set_stock(session, product_id, available=2, shards=1)
+        assert _shards(session, product_id) == [2]
+        stock = get_stock(session, product_id)
+        assert stock is not None and (stock.available, stock.shards) == (2, 1)
+
+
+def test_take_stock_falls_back_to_several_shards(products: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    _, tracked, untracked = products
+    with Session(engine) as session:
+        set_stock(session, tracked, available=10, shards=2)
+        # One shard covers 3; 6 needs both of them
+        take_stock(session, {tracked: 3, untracked: 5})
+        take_stock(session, {tracked: 6})
+        session.commit()
+        assert sum(_shards(session, tracked)) == 1
+        assert get_stock(session, untracked) is None
+
+
+def test_take_stock_rejects_oversell(products: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    _, first, second = products
+    with Session(engine) as session:
+        set_stock(session, first, available=3, shards=2)
+        set_stock(session, second, available=5, shards=1)
+        with pytest.raises(HTTPException) as e:
+            take_stock(session, {first: 4, second: 1})
+        assert e.value.status_code == 409
+        assert str(first) in e.value.detail and str(second) not in e.value.detail
+        session.rollback()
+        assert (sum(_shards(session, first)), sum(_shards(session, second))) == (3, 5)
+
+
+def test_overlapping_carts_do_not_deadlock(products: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    _, first, second = products
+    with Session(engine) as session:
+        set_stock(session, first, available=200, shards=4)
+        set_stock(session, second, available=200, shards=4)
+
+    def checkout(n: int) -> None:
+        # Half the carts list the products the other way round
+        cart = {first: 1, second: 1} if n % 2 else {second: 1, first: 1}
+        with Session(engine) as session:
+            take_stock(session, cart)
+            session.commit()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(checkout, range(80)))
+    with Session(engine) as session:
+        assert (sum(_shards(session, first)), sum(_shards(session, second))) == (120, 120)
+
+
+def test_reservations_are_claimed_once_and_reaped(products: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    user_id, product_id, _ = products
+    with Session(engine) as session:
+        set_stock(session, product_id, available=5, shards=1)
+        reservation = reservations.create_reservation(session, user_id, {product_id: 2})
+        assert _shards(session, product_id) == [3]
+
+        for other_user, cart, status in [
+            (uuid.uuid4(), None, 404),
+            (user_id, {product_id: 1}, 400),
+        ]:
+            with pytest.raises(HTTPException) as e:
+                reservations.claim_reservation(reservation.id, other_user, cart)
+            assert e.value.status_code == status
+
+        reservations.cancel_reservation(session, reservation.id, user_id)
+        assert _shards(session, product_id) == [5]
+        with pytest.raises(HTTPException) as e:
+            reservations.claim_reservation(reservation.id, user_id)
+        assert e.value.status_code == 404
+
+        expired = reservations.create_reservation(session, user_id, {product_id: 4})
+        reaped = reservations.reap_expired_reservations(
+            session, now=time.time() + settings.INVENTORY_RESERVATION_TTL + 1
+        )
+        assert reaped >= 1
+        assert _shards(session, product_id) == [5]
+        with pytest.raises(HTTPException):
+            reservations.claim_reservation(expired.id, user_id)
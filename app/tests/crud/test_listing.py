@@ -0,0 +1,135 @@
+import uuid
+from collections.abc import Generator
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from sqlmodel import Session, delete
+
+from app.apis.events import handlers
+from app.apis.events.models import StreamEvent
+from app.apis.inventory.services import set_stock
+from app.apis.products.listing import refresh_stock
+from app.apis.products.models import Product, ProductListing, ProductListingResponse
+from app.apis.users.models import User
+from app.utils.database import engine
+from app.utils.responses import response_columns
+
+
+@pytest.fixture
+def owner() -> Generator[uuid.UUID, None, None]:
+    with Session(engine) as session:
+        user = User(
+            email=f"{uuid.uuid4().hex}@listing.test", user_name="Listing", phone="0000000000", hashed_password="x"
+        )
+        session.add(user)
+        session.commit()
+        yield user.id
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def _card(session: Session, product_id: uuid.UUID) -> dict[str, Any] | None:
+    """
+    The product's card, None when it has none.
+    """
+    session.expire_all()
+    card = session.get(ProductListing, product_id)
+    if card is None:
+        return None
+    return card.model_dump(include={"owner_id", "owner_name", "title", "description", "price", "stock", "created_at"})
+
+
+def _expected(session: Session, product: Product, stock: int | None = None) -> dict[str, Any]:
+    session.refresh(product)
+    owner = session.get(User, product.owner_id)
+    return {
+        "owner_id": product.owner_id,
+        "owner_name": owner.user_name,
+        "title": product.title,
+        "description": product.description,
+        "price": product.price,
+        "stock": stock,
+        "created_at": product.created_at,
+    }
+
+
+def _event(type: str) -> StreamEvent:
+    return StreamEvent(
+        id=1,
+        type=type,
+        aggregate_id=uuid.uuid4(),
+        payload={},
+        created_at=datetime.utcnow(),
+        stream="events:inventory",
+        message_id="1-0",
+    )
+
+
+def test_listing_has_every_card_field() -> None:
+    columns = response_columns(ProductListing, ProductListingResponse)
+    assert [column.key for column in columns] == list(ProductListingResponse.model_fields)
+
+
+def test_stock_is_refreshed_on_inventory_changes_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    refreshed: list[list[uuid.UUID]] = []
+
+    class FakeSession:
+        def __init__(self, engine: object) -> None:
+            pass
+
+        def __enter__(self) -> "FakeSession":
+            return self
+
+        def __exit__(self, *args: object) -> None:
+            pass
+
+        def commit(self) -> None:
+            pass
+
+    monkeypatch.setattr(handlers, "Session", FakeSession)
+    monkeypatch.setattr(handlers, "refresh_stock", lambda session, ids: refreshed.append(ids))
+
+    handlers.update_listing_stock(_event("inventory.changed"))
+    handlers.update_listing_stock(_event("order.created"))
+    assert len(refreshed) == 1 and len(refreshed[0]) == 1
+
+
+def test_cards_follow_product_writes(owner: uuid.UUID) -> None:
+    with Session(engine) as session:
+        product = Product(owner_id=owner, title="Aspirin", description="100mg", price=Decimal("2.50"))
+        session.add(product)
+        session.commit()
+        assert _card(session, product.id) == _expected(session, product)
+
+        product.title, product.price = "Aspirin Forte", Decimal("3.10")
+        session.add(product)
+        session.commit()
+        assert _card(session, product.id) == _expected(session, product)
+
+        product.deleted_at = datetime.utcnow()
+        session.add(product)
+        session.commit()
+        assert _card(session, product.id) is None
+
+
+def test_cards_follow_owner_renames_and_stock(owner: uuid.UUID) -> None:
+    with Session(engine) as session:
+        product = Product(owner_id=owner, title="Ibuprofen")
+        session.add(product)
+        session.commit()
+
+        user = session.get(User, owner)
+        user.user_name = "Renamed pharmacy"
+        session.add(user)
+        session.commit()
+        assert _card(session, product.id) == _expected(session, product)
+
+        set_stock(session, product.id, available=7, shards=2)
+        assert refresh_stock(session, [product.id]) == 1
+        session.commit()
+        assert _card(session, product.id) == _expected(session, product, stock=7)
+        # Unchanged stock leaves the card alone
+        assert refresh_stock(session, [product.id]) == 0
@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.apis.messaging import routes
+from app.apis.messaging.schemas import TopicCommand
+from app.apis.messaging.services import (
+    EventStream,
+    Gateway,
+    backlog_key,
+    notification,
+    request_token,
+    subprotocol_token,
+    topic_channel,
+    user_channel,
+)
+from app.models import AuthUser
+from app.utils.config import settings
+from app.utils.redis_db import redis_client
+
+
+def test_topics_cannot_name_other_channels() -> None:
+    assert TopicCommand(action="subscribe", topic="product:0f8e-11").topic == "product:0f8e-11"
+    assert TopicCommand(action="unsubscribe", topic="announcements").topic == "announcements"
+    for topic in ("ws:user:1", "Product:1", "product:", "product:1:2", ""):
+        with pytest.raises(ValidationError):
+            TopicCommand.model_validate({"action": "subscribe", "topic": topic})
+
+
+def test_user_and_topic_channels_are_disjoint() -> None:
+    assert user_channel("1") == "ws:user:1"
+    assert topic_channel("user:1") == "ws:topic:user:1"
+
+
+def test_token_is_read_from_the_subprotocols() -> None:
+    assert subprotocol_token(["access_token", "abc.def"]) == "abc.def"
+    assert subprotocol_token(["chat", "access_token", "abc.def"]) == "abc.def"
+    assert subprotocol_token(["access_token"]) is None
+    assert subprotocol_token([]) is None
+
+
+def test_token_is_never_read_from_the_query() -> None:
+    assert request_token("Bearer abc.def", "cookie") == "abc.def"
+    assert request_token(None, "cookie") == "cookie"
+    assert request_token("Basic abc", None) is None
+
+
+def test_event_stream_slots_are_taken_at_the_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    gateway = Gateway()
+    user = AuthUser(id=str(uuid.uuid4()), user_name="Events", email="events@example.com", permissions=[])
+    monkeypatch.setattr(routes, "gateway", gateway)
+    monkeypatch.setattr(routes, "authenticate", lambda token: user)
+    monkeypatch.setattr(settings, "SSE_MAX_CONNECTIONS", 1)
+
+    class Stream:
+        def __init__(self, user_id: str) -> None:
+            self.user_id = user_id
+
+        async def frames(self, last_event_id: str | None) -> AsyncIterator[str]:
+            yield f"id: {last_event_id}\n\n"
+
+    async def noop(stream: Stream) -> None:
+        pass
+
+    monkeypatch.setattr(routes, "EventStream", Stream)
+    monkeypatch.setattr(gateway, "connect", noop)
+    monkeypatch.setattr(gateway, "disconnect", noop)
+
+    async def run() -> None:
+        first = await routes.notification_events(access_token="token")
+        with pytest.raises(HTTPException) as e:
+            await routes.notification_events(access_token="token")
+        assert e.value.status_code == 503
+        # A client that left before the body started gives its slot back
+        await first.background()
+        assert gateway.event_streams == 0
+
+        second = await routes.notification_events(access_token="token", last_event_id="1-0")
+        assert [frame async for frame in second.body_iterator] == ["id: 1-0\n\n"]
+        await second.background()
+        assert gateway.event_streams == 0
+
+    asyncio.run(run())
+
+
+def test_notification_is_encoded_once_as_json() -> None:
+    message = orjson.loads(notification("product.updated", {"fields": ["price"]}, topic="product:1"))
+    assert message["type"] == "product.updated"
+    assert message["topic"] == "product:1"
+    assert message["data"] == {"fields": ["price"]}
+    assert message["sent_at"]
+
+
+def test_event_stream_skips_events_it_already_sent() -> None:
+    async def first_frames(count: int) -> list[str]:
+        stream = EventStream("1")
+        for event_id, message in [("5-0", "a"), ("4-9", "b"), ("", "c"), ("5-0", "d"), ("5-1", "e")]:
+            stream.offer(message, event_id)
+        frames = stream.frames()
+        return [await frames.__anext__() for _ in range(count)]
+
+    assert asyncio.run(first_frames(3)) == ["id: 5-0\ndata: a\n\n", "data: c\n\n", "id: 5-1\ndata: e\n\n"]
+
+
+def test_event_stream_resets_only_when_the_backlog_lost_events() -> None:
+    user_id = str(uuid.uuid4())
+    key = backlog_key(user_id)
+    ids = [redis_client.xadd(key, {"message": message}) for message in "abcd"]
+    redis_client.xtrim(key, maxlen=2, approximate=False)
+
+    async def first_frames(last_event_id: str, count: int) -> list[str]:
+        frames = EventStream(user_id).frames(last_event_id)
+        return [await frames.__anext__() for _ in range(count)]
+
+    async def resume() -> tuple[list[str], list[str]]:
+        return await first_frames(ids[2], 1), await first_frames(ids[0], 3)
+
+    try:
+        current, behind = asyncio.run(resume())
+    finally:
+        redis_client.delete(key)
+    # The client's last entry is still there: nothing was missed
+    assert current == [f"id: {ids[3]}\ndata: d\n\n"]
+    assert orjson.loads(behind[0].removeprefix("data: "))["type"] == "reset"
+    assert behind[1:] == [f"id: {ids[2]}\ndata: c\n\n", f"id: {ids[3]}\ndata: d\n\n"]
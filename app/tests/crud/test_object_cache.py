@@ -0,0 +1,65 @@
+import time
+import uuid
+
+from sqlmodel import Session
+
+from app.apis.products.models import Product
+from app.apis.products.utils import product_cache
+from app.apis.users import services as users
+from app.apis.users.models import CachedUser, User
+from app.utils.database import engine
+from app.utils.object_cache import CacheStats, LRUCache, NegativeCache, ObjectCache
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    stats = CacheStats()
+    cache = LRUCache(maxsize=2, ttl=60, stats=stats)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert stats.evictions == 1
+
+
+def test_lru_expires_entries() -> None:
+    cache = LRUCache(maxsize=2, ttl=0.01, stats=CacheStats())
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") == (False, None)
+    assert len(cache) == 0
+
+
+def test_view_keeps_credentials_out_of_the_cache() -> None:
+    cache = ObjectCache(f"test_user_{uuid.uuid4().hex}", User, view=CachedUser)
+    user = User(email="view@example.com", user_name="View", phone="0000000000", hashed_password="secret")
+    cached = cache.get_or_load(user.id, lambda: user)
+    assert isinstance(cached, CachedUser) and cached.email == user.email
+    assert not hasattr(cached, "hashed_password")
+    assert "secret" not in str(cache.local.get(cache._key(user.id)))
+
+
+def test_negative_cache_ignores_misses_recorded_after_discard() -> None:
+    cache = NegativeCache(f"test_{uuid.uuid4().hex}")
+    cache.add("a@example.com")
+    assert cache.contains("a@example.com")
+    cache.discard("a@example.com")
+    # A lookup that read the table before the row was created
+    cache.add("a@example.com")
+    assert not cache.contains("a@example.com")
+
+
+def test_deleting_a_user_drops_their_cached_products() -> None:
+    with Session(engine) as session:
+        user = User(email=f"{uuid.uuid4().hex}@cache.test", user_name="Cache", phone="0000000000", hashed_password="x")
+        session.add(user)
+        session.flush()
+        product = Product(owner_id=user.id, title="Cached")
+        session.add(product)
+        session.commit()
+        user_id, product_id = user.id, product.id
+        assert product_cache.get(session, product_id) is not None
+
+        assert users.delete_user(user_id, session)
+        assert product_cache.get(session, product_id) is None
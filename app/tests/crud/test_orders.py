@@ -0,0 +1,117 @@
+import uuid
+from collections.abc import Generator
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, delete, select
+
+from app.apis.inventory import reservations
+from app.apis.inventory.services import get_stock, set_stock
+from app.apis.orders.models import Order, OrderItem
+from app.apis.orders.schemas import CheckoutItem
+from app.apis.orders.services import create_order, get_order, get_order_response
+from app.apis.products.models import Product
+from app.apis.users.models import User
+from app.utils.database import engine
+
+
+@pytest.fixture
+def cart() -> Generator[tuple[uuid.UUID, uuid.UUID, uuid.UUID], None, None]:
+    """
+    A buyer and two priced products with 10 in stock each.
+    """
+    with Session(engine) as session:
+        user = User(
+            email=f"{uuid.uuid4().hex}@orders.test", user_name="Orders", phone="0000000000", hashed_password="x"
+        )
+        session.add(user)
+        session.flush()
+        first = Product(owner_id=user.id, title="First", price=Decimal("2.50"))
+        second = Product(owner_id=user.id, title="Second", price=Decimal("4.00"))
+        session.add_all([first, second])
+        session.commit()
+        set_stock(session, first.id, available=10, shards=1)
+        set_stock(session, second.id, available=10, shards=1)
+        yield user.id, first.id, second.id
+        session.exec(delete(Order).where(Order.user_id == user.id))
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def _available(session: Session, product_id: uuid.UUID) -> int:
+    stock = get_stock(session, product_id)
+    assert stock is not None
+    return stock.available
+
+
+def test_checkout_inserts_order_and_items_in_cart_order(cart: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    user_id, first, second = cart
+    items = [
+        CheckoutItem(product_id=second, quantity=1),
+        CheckoutItem(product_id=first, quantity=2),
+        CheckoutItem(product_id=second, quantity=1),
+    ]
+    with Session(engine) as session:
+        order = create_order(session, user_id, items)
+        assert (order.total, order.item_count, order.status) == (Decimal("13.00"), 4, "pending")
+        assert [(item.product_id, item.quantity, item.unit_price) for item in order.items] == [
+            (second, 2, Decimal("4.00")),
+            (first, 2, Decimal("2.50")),
+        ]
+        stored = get_order(session, order.id)
+        assert stored is not None and get_order_response(session, stored) == order
+        assert (_available(session, first), _available(session, second)) == (8, 8)
+
+
+def test_retried_checkout_replays_the_order(cart: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    user_id, first, second = cart
+    items = [CheckoutItem(product_id=first, quantity=3)]
+    key = uuid.uuid4().hex
+    with Session(engine) as session:
+        order = create_order(session, user_id, items, idempotency_key=key)
+        assert create_order(session, user_id, items, idempotency_key=key) == order
+        # The retry's stock was given back with its rolled back insert
+        assert _available(session, first) == 7
+
+        with pytest.raises(HTTPException) as e:
+            create_order(session, user_id, [CheckoutItem(product_id=second, quantity=1)], idempotency_key=key)
+        assert e.value.status_code == 422
+        assert _available(session, second) == 10
+
+        ids = session.exec(select(Order.id).where(Order.user_id == user_id)).all()
+        assert ids == [order.id]
+
+
+def test_lost_race_returns_the_reserved_stock(cart: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    user_id, first, _ = cart
+    items = [CheckoutItem(product_id=first, quantity=2)]
+    key = uuid.uuid4().hex
+    with Session(engine) as session:
+        create_order(session, user_id, items, idempotency_key=key)
+        reservation = reservations.create_reservation(session, user_id, {first: 2})
+        assert _available(session, first) == 6
+
+        # A checkout of the reserved cart with a key already taken doesn't use the reservation
+        with pytest.raises(HTTPException) as e:
+            create_order(session, user_id, items, idempotency_key=key, reservation_id=reservation.id)
+        assert e.value.status_code == 422
+        assert reservations.claim_reservation(reservation.id, user_id, {first: 2})
+        assert _available(session, first) == 6
+
+
+def test_replay_of_a_removed_order_asks_to_retry(cart: tuple[uuid.UUID, uuid.UUID, uuid.UUID]) -> None:
+    user_id, first, _ = cart
+    items = [CheckoutItem(product_id=first, quantity=1)]
+    key = uuid.uuid4().hex
+    with Session(engine) as session:
+        order = create_order(session, user_id, items, idempotency_key=key)
+        # As if its partition had been detached
+        session.exec(delete(OrderItem).where(OrderItem.order_id == order.id))
+        session.exec(delete(Order).where(Order.id == order.id))
+        session.commit()
+
+        with pytest.raises(HTTPException) as e:
+            create_order(session, user_id, items, idempotency_key=key)
+        assert e.value.status_code == 409
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import orjson
+
+from app.apis.events.models import OutboxEvent
+from app.apis.events.outbox import _message, stream_for
+
+
+def test_events_are_streamed_by_aggregate() -> None:
+    assert stream_for("product.created") == "events:product"
+    assert stream_for("order.payment.failed") == "events:order"
+    assert stream_for("user") == "events:user"
+
+
+def test_message_fields_are_strings() -> None:
+    aggregate_id = uuid.uuid4()
+    event = OutboxEvent(
+        id=42,
+        event_type="order.created",
+        aggregate_id=aggregate_id,
+        payload={"total": str(Decimal("4.00"))},
+        created_at=datetime(2026, 10, 19, 12, 0),
+    )
+    message = _message(event)
+    assert all(isinstance(value, str) for value in message.values())
+    assert message["id"] == "42"
+    assert message["aggregate_id"] == str(aggregate_id)
+    assert orjson.loads(message["payload"]) == {"total": "4.00"}
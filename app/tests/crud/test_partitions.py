@@ -0,0 +1,110 @@
+import re
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from app.apis.orders.partitions import (
+    add_months,
+    create_partitions,
+    detach_partitions,
+    is_partition,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from app.apis.orders.services import get_order, get_paginated_orders
+from app.models import AuthUser
+from app.utils.database import engine
+from app.utils.ids import uuid7, uuid7_time
+
+
+def test_month_arithmetic_crosses_years() -> None:
+    month = month_start(datetime(2026, 11, 17, 8, 30))
+    assert month == datetime(2026, 11, 1)
+    assert add_months(month, 2) == datetime(2027, 1, 1)
+    assert add_months(month, -11) == datetime(2025, 12, 1)
+    assert partition_name("order", add_months(month, 2)) == "order_p202701"
+
+
+def test_is_partition_only_matches_order_tables() -> None:
+    assert is_partition("order_p202701")
+    assert is_partition("orderitem_p202701")
+    assert not is_partition("order")
+    assert not is_partition("product_p202701")
+
+
+def test_uuid7_carries_its_creation_time() -> None:
+    at = datetime(2026, 10, 19, 12, 30, 15, 123456)
+    id = uuid7(at)
+    assert id.version == 7
+    assert id.variant == uuid.RFC_4122
+    assert uuid7_time(id) == datetime(2026, 10, 19, 12, 30, 15, 123000)
+    assert uuid7(datetime(2026, 10, 19, 12, 30, 16)) > id
+    assert uuid7_time(uuid.uuid4()) is None
+
+
+def test_partitions_are_created_and_detached() -> None:
+    # Months long before any real order; DDL is rolled back with the session
+    january, march = datetime(1990, 1, 1), datetime(1990, 3, 1)
+    with Session(engine) as session:
+        created = create_partitions(session, january, datetime(1990, 2, 15))
+        assert created == ["order_p199001", "order_p199002", "orderitem_p199001", "orderitem_p199002"]
+        assert create_partitions(session, january, datetime(1990, 2, 15)) == []
+        assert list_partitions(session, "order")[january] == "order_p199001"
+
+        detached = detach_partitions(session, datetime(1990, 2, 10))
+        assert detached == ["orderitem_p199001", "order_p199001"]
+        assert january not in list_partitions(session, "order")
+        assert datetime(1990, 2, 1) in list_partitions(session, "orderitem")
+        # Kept as plain tables, without foreign keys into the order tables
+        foreign_keys = session.execute(
+            text("""
+                SELECT count(*) FROM pg_constraint
+                JOIN pg_class child ON child.oid = pg_constraint.conrelid
+                JOIN pg_class parent ON parent.oid = pg_constraint.confrelid
+                WHERE child.relname = 'orderitem_p199001' AND contype = 'f' AND parent.relname = 'order'
+            """)
+        ).scalar_one()
+        assert foreign_keys == 0
+        assert detach_partitions(session, march)[-1] == "order_p199002"
+        session.rollback()
+
+
+def _scanned_partitions(session: Session, query: Callable[[], Any]) -> list[set[str]]:
+    """
+    Run query and return, per statement it sent, the partitions its plan scans.
+    """
+    statements = []
+
+    def capture(_conn: Any, _cursor: Any, statement: str, parameters: Any, *_: Any) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        query()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    scanned = []
+    for statement, parameters in statements:
+        plan = "\n".join(session.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters).scalars())
+        scanned.append(set(re.findall(r"\border(?:item)?_p\d{6}\b", plan)))
+    return scanned
+
+
+def test_order_reads_scan_one_partition() -> None:
+    now = datetime.utcnow()
+    user = AuthUser(id=str(uuid.uuid4()), user_name="Orders", email="orders@example.com", permissions=[], is_verified=False)
+    with Session(engine) as session:
+        create_partitions(session, add_months(month_start(now), -1), now)
+        session.commit()
+        current = {partition_name("order", month_start(now))}
+
+        assert _scanned_partitions(session, lambda: get_order(session, uuid7(now))) == [current]
+        scanned = _scanned_partitions(
+            session, lambda: get_paginated_orders(session, user, since=month_start(now), until=now)
+        )
+        assert scanned == [current, current]
@@ -0,0 +1,73 @@
+import uuid
+from collections.abc import Generator
+
+import pytest
+from sqlmodel import Session, delete, select
+
+from app.apis.products.batch import (
+    batch_create_products,
+    batch_delete_products,
+    batch_update_products,
+)
+from app.apis.products.models import Product, ProductCreate
+from app.apis.products.schemas import ProductBatchUpdateItem
+from app.apis.users.models import User
+from app.models import AuthUser
+from app.utils.database import engine
+
+
+@pytest.fixture
+def seller() -> Generator[AuthUser, None, None]:
+    with Session(engine) as session:
+        user = User(email=f"{uuid.uuid4().hex}@batch.test", user_name="Batch", phone="0000000000", hashed_password="x")
+        session.add(user)
+        session.commit()
+        yield AuthUser(id=str(user.id), user_name=user.user_name, email=user.email)
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def _create(session: Session, seller: AuthUser, *titles: str) -> list[uuid.UUID]:
+    response = batch_create_products(session, uuid.UUID(seller.id), [ProductCreate(title=title) for title in titles])
+    assert response.succeeded == len(titles)
+    return [result.id for result in response.results]
+
+
+def test_batch_create_keeps_item_order(seller: AuthUser) -> None:
+    with Session(engine) as session:
+        ids = _create(session, seller, "Aspirin", "Ibuprofen", "Paracetamol")
+        titles = dict(session.exec(select(Product.id, Product.title).where(Product.id.in_(ids))).all())
+        assert [titles[id] for id in ids] == ["Aspirin", "Ibuprofen", "Paracetamol"]
+
+
+def test_batch_update_reports_row_errors(seller: AuthUser) -> None:
+    other = AuthUser(id=str(uuid.uuid4()), user_name="Other", email="other@batch.test")
+    with Session(engine) as session:
+        first, second = _create(session, seller, "Aspirin", "Ibuprofen")
+        items = [
+            ProductBatchUpdateItem(id=first, description="500mg"),
+            ProductBatchUpdateItem(id=second, title=None),
+            ProductBatchUpdateItem(id=uuid.uuid4(), title="Missing"),
+            ProductBatchUpdateItem(id=first, title="Twice"),
+        ]
+        response = batch_update_products(session, seller, items)
+        assert [result.status for result in response.results] == [200, 422, 404, 400]
+        assert response.results[1].detail == "May not be null: title"
+        assert (response.succeeded, response.failed) == (1, 3)
+        assert session.get(Product, second).title == "Ibuprofen"
+
+        denied = batch_update_products(session, other, [ProductBatchUpdateItem(id=first, title="Stolen")])
+        assert denied.results[0].status == 400
+        session.expire_all()
+        product = session.get(Product, first)
+        assert (product.title, product.description) == ("Aspirin", "500mg")
+
+
+def test_batch_delete(seller: AuthUser) -> None:
+    with Session(engine) as session:
+        ids = _create(session, seller, "Aspirin", "Ibuprofen")
+        response = batch_delete_products(session, seller, [ids[0], uuid.uuid4()])
+        assert [result.status for result in response.results] == [200, 404]
+        assert session.get(Product, ids[0]) is None
+        assert session.get(Product, ids[1]) is not None
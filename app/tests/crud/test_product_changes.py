@@ -0,0 +1,177 @@
+import base64
+import gzip
+import time
+import uuid
+from collections.abc import Generator
+from datetime import datetime, timedelta
+from typing import Any
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlmodel import Session, delete, select
+
+from app.apis.products import changes
+from app.apis.products.changes import (
+    decode_cursor,
+    encode_cursor,
+    get_changes,
+    purge_tombstones,
+)
+from app.apis.products.models import Product, ProductTombstone
+from app.apis.users.models import User
+from app.models import AuthUser
+from app.utils.config import settings
+from app.utils.database import engine
+from app.utils.responses import CompressedJSONResponse
+
+
+@pytest.fixture
+def owner() -> Generator[AuthUser, None, None]:
+    """
+    An unverified owner: the feed only shows them their own products.
+    """
+    with Session(engine) as session:
+        user = User(
+            email=f"{uuid.uuid4().hex}@changes.test", user_name="Changes", phone="0000000000", hashed_password="x"
+        )
+        session.add(user)
+        session.commit()
+        yield AuthUser(id=str(user.id), user_name=user.user_name, email="changes@example.com", permissions=[])
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(ProductTombstone).where(ProductTombstone.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def _add(owner: AuthUser, *titles: str) -> list[uuid.UUID]:
+    with Session(engine) as session:
+        products = [Product(owner_id=uuid.UUID(owner.id), title=title) for title in titles]
+        session.add_all(products)
+        session.commit()
+        return [product.id for product in products]
+
+
+def _sync(owner: AuthUser, since: str | None = None, limit: int | None = None) -> dict[str, Any]:
+    with Session(engine) as session:
+        return get_changes(session, owner, since, limit)
+
+
+def test_cursor_round_trip() -> None:
+    id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(123456789, id)) == (123456789, id)
+
+
+def test_bad_and_expired_cursors() -> None:
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not a cursor")
+    assert error.value.status_code == 400
+
+    issued = time.time() - 31 * 86400
+    cursor = changes._CURSOR.pack(1, uuid.uuid4().bytes, int(issued))
+    expired = base64.urlsafe_b64encode(cursor).decode().rstrip("=")
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(expired)
+    assert error.value.status_code == 410
+
+
+def test_only_large_bodies_are_gzipped_for_clients_that_accept_it() -> None:
+    small = CompressedJSONResponse({"upserts": []}, accept_encoding="gzip, br")
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+
+    content = {"upserts": [["title"] * 10] * 100}
+    large = CompressedJSONResponse(content, accept_encoding="gzip, br")
+    assert large.headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(large.body)) == content
+    assert int(large.headers["content-length"]) == len(large.body)
+
+    assert "content-encoding" not in CompressedJSONResponse(content).headers
+
+
+def test_writes_are_stamped_and_hard_deletes_leave_tombstones(owner: AuthUser) -> None:
+    with Session(engine) as session:
+        product = Product(owner_id=uuid.UUID(owner.id), title="Aspirin")
+        session.add(product)
+        session.flush()
+        xid = session.execute(text("SELECT pg_current_xact_id()::text::bigint")).scalar_one()
+        session.commit()
+        session.refresh(product)
+        assert product.change_xid == xid
+
+        product.title = "Aspirin 100mg"
+        session.add(product)
+        session.commit()
+        session.refresh(product)
+        assert product.change_xid > xid
+
+        session.exec(delete(Product).where(Product.id == product.id))
+        session.commit()
+        tombstone = session.get(ProductTombstone, product.id)
+        assert tombstone is not None
+        assert (tombstone.owner_id, tombstone.change_xid > product.change_xid) == (uuid.UUID(owner.id), True)
+
+
+def test_feed_pages_through_upserts_and_deletes(owner: AuthUser) -> None:
+    first, second, third = _add(owner, "First", "Second", "Third")
+
+    # Written by one transaction, they page in id order
+    page = _sync(owner, limit=2)
+    assert page["has_more"] and len(page["upserts"]) == 2
+    synced = [row[0] for row in page["upserts"]]
+    page = _sync(owner, page["cursor"], limit=2)
+    assert not page["has_more"] and len(page["upserts"]) == 1
+    synced += [row[0] for row in page["upserts"]]
+    assert synced == sorted([first, second, third])
+    assert _sync(owner, page["cursor"])["upserts"] == []
+
+    with Session(engine) as session:
+        renamed = session.get(Product, first)
+        renamed.title = "First, renamed"
+        soft_deleted = session.get(Product, second)
+        soft_deleted.deleted_at = datetime.utcnow()
+        session.add_all([renamed, soft_deleted])
+        session.commit()
+        session.exec(delete(Product).where(Product.id == third))
+        session.commit()
+
+    changed = _sync(owner, page["cursor"])
+    assert [(row[0], row[1]) for row in changed["upserts"]] == [(first, "First, renamed")]
+    assert sorted(changed["deleted"]) == sorted([second, third])
+    # Other owners' changes are not in the feed
+    assert all(row[4] == uuid.UUID(owner.id) for row in _sync(owner)["upserts"])
+
+
+def test_feed_waits_for_older_running_transactions(owner: AuthUser) -> None:
+    cursor = _sync(owner)["cursor"]
+    with Session(engine) as slow:
+        # Takes its xid first, commits last
+        early = Product(owner_id=uuid.UUID(owner.id), title="Early")
+        slow.add(early)
+        slow.flush()
+        xid = slow.execute(text("SELECT pg_current_xact_id()::text::bigint")).scalar_one()
+        (late,) = _add(owner, "Late")
+
+        # Neither is served, nor skipped by the cursor
+        page = _sync(owner, cursor)
+        assert page["upserts"] == []
+        assert decode_cursor(page["cursor"])[0] < xid
+        slow.commit()
+        early_id = early.id
+
+    assert [row[0] for row in _sync(owner, page["cursor"])["upserts"]] == [early_id, late]
+
+
+def test_purge_keeps_tombstones_within_retention(owner: AuthUser) -> None:
+    (product_id,) = _add(owner, "Purged")
+    with Session(engine) as session:
+        session.exec(delete(Product).where(Product.id == product_id))
+        session.commit()
+        purge_tombstones(session)
+        assert session.get(ProductTombstone, product_id) is not None
+
+        later = datetime.utcnow() + timedelta(days=settings.PRODUCT_TOMBSTONE_RETENTION_DAYS + 1)
+        assert purge_tombstones(session, now=later) >= 1
+        ids = session.exec(select(ProductTombstone.product_id).where(ProductTombstone.owner_id == uuid.UUID(owner.id)))
+        assert ids.all() == []
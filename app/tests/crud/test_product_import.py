@@ -0,0 +1,84 @@
+import io
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlmodel import Session, delete
+
+from app.apis.products.feed_sync import content_hash
+from app.apis.products.importer import import_products, validate_batch
+from app.apis.products.models import Product
+from app.apis.products.schemas import ProductFeedRow
+from app.apis.products.utils import batched, detect_format, iter_rows
+from app.apis.users.models import User
+from app.utils.database import engine
+
+
+def test_iter_rows_csv() -> None:
+    stream = io.BytesIO(b"title,description\nAspirin,\nIbuprofen,200mg\n")
+    rows = list(iter_rows(stream, "csv"))
+    assert rows == [
+        (2, {"title": "Aspirin", "description": None}, None),
+        (3, {"title": "Ibuprofen", "description": "200mg"}, None),
+    ]
+
+
+def test_iter_rows_ndjson_reports_bad_lines() -> None:
+    stream = io.BytesIO(b'{"title": "Aspirin"}\n\nnot json\n[1, 2]\n')
+    rows = list(iter_rows(stream, "ndjson"))
+    assert rows[0] == (1, {"title": "Aspirin"}, None)
+    assert rows[1][0] == 3 and rows[1][1] is None
+    assert rows[2] == (4, None, "expected a JSON object")
+    assert not stream.closed
+
+
+def test_validate_batch_keeps_valid_rows() -> None:
+    batch = [
+        (2, {"title": "Aspirin"}),
+        (3, {"title": ""}),
+        (4, {"title": "Ibuprofen", "description": "200mg"}),
+        (5, {"description": "no title"}),
+    ]
+    products, errors = validate_batch(batch)
+    assert [(line, product.title) for line, product in products] == [
+        (2, "Aspirin"),
+        (4, "Ibuprofen"),
+    ]
+    assert [error.line for error in errors] == [3, 5]
+    assert errors[0].errors[0].startswith("title:")
+
+
+def test_batched_and_detect_format() -> None:
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert detect_format("feed.jsonl") == "ndjson"
+    assert detect_format("feed.csv") == "csv"
+    assert detect_format("upload", "text/csv") == "csv"
+    assert detect_format("feed.xlsx") is None
+
+
+def test_feed_content_hash_tracks_synced_fields() -> None:
+    row = ProductFeedRow(sku="A1", title="Aspirin", description="100mg")
+    same = ProductFeedRow(sku="B2", title="Aspirin", description="100mg")
+    changed = ProductFeedRow(sku="A1", title="Aspirin", description="300mg")
+    assert len(content_hash(row)) == 32
+    assert content_hash(row) == content_hash(same)
+    assert content_hash(row) != content_hash(changed)
+
+
+def test_reimport_restores_soft_deleted_products() -> None:
+    with Session(engine) as session:
+        user = User(email=f"{uuid.uuid4().hex}@import.test", user_name="Import", phone="0000000000", hashed_password="x")
+        session.add(user)
+        session.flush()
+        product = Product(owner_id=user.id, title="Aspirin", deleted_at=datetime.utcnow())
+        session.add(product)
+        session.commit()
+        try:
+            report = import_products(session, user.id, io.BytesIO(b"title,price\nAspirin,2.50\n"), "csv")
+            assert report.imported == 1
+            session.refresh(product)
+            assert product.deleted_at is None and product.price == Decimal("2.50")
+        finally:
+            session.exec(delete(Product).where(Product.owner_id == user.id))
+            session.exec(delete(User).where(User.id == user.id))
+            session.commit()
@@ -0,0 +1,104 @@
+"""
+Every filter and sort combination GET /products accepts must be served by
+an index of productlisting. Sequential scans are disabled for the EXPLAIN,
+so the planner only picks one when no index can serve the query; a full
+index scan stands in for one too, unless the index yields the page order
+and the scan stops at the limit.
+"""
+import uuid
+from collections.abc import Generator
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+from app.apis.products.facets import facet_counts
+from app.apis.products.listing import LISTING_SORTS, listing_filters, listing_order
+from app.apis.products.models import ProductListing
+from app.utils.database import engine
+
+FILTERS: dict[str, dict[str, Any]] = {
+    "none": {},
+    "owner": {"owner_id": uuid.uuid4()},
+    "title_prefix": {"title_prefix": "Para_100%"},
+    "created": {"created_from": datetime(2026, 1, 1), "created_to": datetime(2026, 2, 1)},
+    "price": {"price_min": Decimal("1.00"), "price_max": Decimal("9.99")},
+    "owner_title_prefix": {"owner_id": uuid.uuid4(), "title_prefix": "ibu"},
+    "owner_created": {"owner_id": uuid.uuid4(), "created_from": datetime(2026, 1, 1)},
+    "owner_price": {"owner_id": uuid.uuid4(), "price_max": Decimal("5")},
+}
+SORTS = [*LISTING_SORTS, *(f"-{key}" for key in LISTING_SORTS)]
+
+
+@pytest.fixture(scope="module")
+def session() -> Generator[Session, None, None]:
+    with Session(engine) as session:
+        session.execute(text("SET enable_seqscan = off"))
+        yield session
+        session.rollback()
+
+
+def _plan(session: Session, statement: Any) -> str:
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return "\n".join(session.execute(text(f"EXPLAIN {sql}")).scalars())
+
+
+def _assert_indexed(plan: str, ordered_scan_ok: bool) -> None:
+    assert "Seq Scan" not in plan, plan
+    ordered_scan = ordered_scan_ok and "Sort" not in plan
+    assert "Index Cond" in plan or ordered_scan, plan
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("filters", FILTERS)
+def test_listing_pages_use_an_index(session: Session, filters: str, sort: str) -> None:
+    statement = (
+        select(ProductListing.id, ProductListing.title)
+        .where(*listing_filters(**FILTERS[filters]))
+        .order_by(*listing_order(sort))
+        .limit(100)
+    )
+    _assert_indexed(_plan(session, statement), ordered_scan_ok=True)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_listing_counts_use_an_index(session: Session, filters: str) -> None:
+    statement = select(func.count()).select_from(ProductListing).where(*listing_filters(**FILTERS[filters]))
+    _assert_indexed(_plan(session, statement), ordered_scan_ok=filters == "none")
+
+
+def test_unknown_sort_is_rejected() -> None:
+    with pytest.raises(HTTPException) as error:
+        listing_order("stock")
+    assert error.value.status_code == 400
+
+
+def test_unindexed_filter_is_caught(session: Session) -> None:
+    statement = (
+        select(ProductListing.id)
+        .where(ProductListing.stock > 5)
+        .order_by(ProductListing.stock)
+        .limit(100)
+    )
+    with pytest.raises(AssertionError):
+        _assert_indexed(_plan(session, statement), ordered_scan_ok=True)
+
+
+def test_facets_match_one_count_per_value(session: Session) -> None:
+    filters = {"title_prefix": "a", "price_max": Decimal("50")}
+    result = facet_counts(session, ["price_band", "seller"], filters, size=1000)
+
+    matching = listing_filters(**filters)
+    assert result["count"] == session.execute(select(func.count()).where(*matching)).scalar_one()
+    # Seller counts ignore the seller filter only, price bands the price filters
+    for value in result["facets"]["seller"]:
+        count = select(func.count()).where(*matching, ProductListing.owner_id == value["value"])
+        assert value["count"] == session.execute(count).scalar_one()
+    bands = {value["value"]: value["count"] for value in result["facets"]["price_band"]}
+    unpriced = select(func.count()).where(*listing_filters(title_prefix="a"), ProductListing.price.is_(None))
+    assert bands.get(None, 0) == session.execute(unpriced).scalar_one()
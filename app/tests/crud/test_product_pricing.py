@@ -0,0 +1,87 @@
+import io
+import uuid
+from collections.abc import Generator
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, delete, select
+
+from app.apis.products.models import Product
+from app.apis.products.pricing import check_rules, reprice_products
+from app.apis.products.schemas import RepricingRules
+from app.apis.users.models import User
+from app.utils.database import engine
+
+PRICES = {"A1": Decimal("10.00"), "A2": Decimal("19.99"), "A3": None, "A4": Decimal("4.00")}
+
+
+@pytest.fixture
+def owner() -> Generator[uuid.UUID, None, None]:
+    with Session(engine) as session:
+        user = User(
+            email=f"{uuid.uuid4().hex}@pricing.test", user_name="Pricing", phone="0000000000", hashed_password="x"
+        )
+        session.add(user)
+        session.flush()
+        session.add_all(
+            Product(owner_id=user.id, sku=sku, title=f"Product {sku}", price=price) for sku, price in PRICES.items()
+        )
+        session.commit()
+        yield user.id
+        session.exec(delete(Product).where(Product.owner_id == user.id))
+        session.exec(delete(User).where(User.id == user.id))
+        session.commit()
+
+
+def _prices(session: Session, owner_id: uuid.UUID) -> dict[str, Decimal | None]:
+    return dict(session.exec(select(Product.sku, Product.price).where(Product.owner_id == owner_id)).all())
+
+
+def test_check_rules() -> None:
+    check_rules(RepricingRules(adjustment=Decimal("-0.1")), with_costs=False)
+    check_rules(RepricingRules(margin=Decimal("0.3")), with_costs=True)
+    for rules, with_costs in [
+        (RepricingRules(), False),
+        (RepricingRules(margin=Decimal("0.3")), False),
+        (RepricingRules(adjustment=Decimal("0.1")), True),
+    ]:
+        with pytest.raises(HTTPException) as e:
+            check_rules(rules, with_costs)
+        assert e.value.status_code == 400
+
+
+def test_dry_run_reports_without_writing(owner: uuid.UUID) -> None:
+    rules = RepricingRules(adjustment=Decimal("-0.1"), ending=Decimal("0.99"), max_change=Decimal("0.08"))
+    with Session(engine) as session:
+        report = reprice_products(session, owner, rules)
+        assert (report.dry_run, report.matched, report.changed, report.updated) == (True, 4, 3, 0)
+        # 10.00 -> 9.00 -> 9.99; 19.99 -> 17.99 -> 18.99, within 8%; 4.00 -> 3.60 -> 3.99
+        assert {change.sku: change.new_price for change in report.changes} == {
+            "A1": Decimal("9.99"),
+            "A2": Decimal("18.99"),
+            "A4": Decimal("3.99"),
+        }
+        assert report.changes[0].sku == "A2"
+        assert report.decreased == 3
+        assert _prices(session, owner) == PRICES
+
+
+def test_cost_feed_reprices_listed_skus(owner: uuid.UUID) -> None:
+    costs = io.BytesIO(b"sku,cost\nA1,8.00\nA3,2.50\nA1,7.00\nA4,nope\nZZ,1\n")
+    rules = RepricingRules(margin=Decimal("0.4"), round_to=Decimal("0.05"), min_price=Decimal("5"))
+    with Session(engine) as session:
+        report = reprice_products(session, owner, rules, costs, "csv", dry_run=False)
+        assert (report.received, report.failed) == (5, 1)
+        assert report.errors[0].line == 5
+        assert (report.matched, report.changed, report.updated) == (2, 2, 2)
+        # The last cost of A1 wins: 7.00 * 1.4 = 9.80; A3 gets its first price: 3.50 -> 5
+        assert _prices(session, owner) == {**PRICES, "A1": Decimal("9.80"), "A3": Decimal("5.00")}
+
+
+def test_prices_over_the_column_limit_are_reported_not_written(owner: uuid.UUID) -> None:
+    costs = io.BytesIO(b"sku,cost\nA1,9999999999.9999\nA2,10.00\n")
+    with Session(engine) as session:
+        report = reprice_products(session, owner, RepricingRules(margin=Decimal("100")), costs, "csv", dry_run=False)
+        assert (report.matched, report.overflowed, report.changed, report.updated) == (2, 1, 1, 1)
+        assert _prices(session, owner) == {**PRICES, "A2": Decimal("1010.00")}
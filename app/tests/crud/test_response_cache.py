@@ -0,0 +1,32 @@
+from fastapi import Request, Response
+
+from app.models import AuthUser
+from app.utils import response_cache
+
+
+def _request(query: str = "", if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request(
+        {"type": "http", "method": "GET", "path": "/api/v1/products/", "query_string": query.encode(), "headers": headers}
+    )
+
+
+def test_user_scope_separates_owners() -> None:
+    verified = AuthUser(id="a", user_name="a", email="a@x.com", is_verified=True)
+    owner = AuthUser(id="b", user_name="b", email="b@x.com", is_verified=False)
+    assert response_cache.user_scope(verified) == "all"
+    assert response_cache.user_scope(owner) == "owner:b"
+
+
+def test_put_returns_304_for_matching_etag() -> None:
+    response = response_cache.put(_request(), None, Response(b'{"count":0}'), ttl=60)
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        cached = response_cache.put(_request(if_none_match=header), None, Response(b'{"count":0}'), ttl=60)
+        assert cached.status_code == 304
+        assert cached.body == b""
+
+    changed = response_cache.put(_request(if_none_match=etag), None, Response(b'{"count":1}'), ttl=60)
+    assert changed.status_code == 200
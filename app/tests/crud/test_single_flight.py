@@ -0,0 +1,41 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_load() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+    started = threading.Barrier(8)
+
+    def load() -> int:
+        nonlocal calls
+        calls += 1
+        time.sleep(0.1)
+        return 42
+
+    def request() -> tuple[int, bool]:
+        started.wait()
+        return flight.do("product:1", load)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: request(), range(8)))
+
+    assert calls == 1
+    assert all(value == 42 for value, _ in results)
+    assert sum(shared for _, shared in results) == 7
+
+
+def test_errors_reach_every_waiter_and_are_not_cached() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+
+    def fail() -> int:
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: 1) == (1, False)
@@ -0,0 +1,47 @@
+import time
+import uuid
+
+from sqlmodel import Session
+
+from app.apis.products.utils import _access_key, hot_product_ids, record_product_access
+from app.utils.redis_db import redis_client
+from app.utils.warmup import Warmup
+
+
+def test_warmup_reports_steps_and_becomes_ready() -> None:
+    def fail(_session: Session, _deadline: float) -> int:
+        raise RuntimeError("boom")
+
+    def slow(_session: Session, _deadline: float) -> int:
+        time.sleep(0.05)
+        return 1
+
+    warmup = Warmup()
+    assert not warmup.ready
+    warmup.run({"roles": lambda _session, _deadline: 3, "broken": fail, "slow": slow, "late": slow}, budget=0.03)
+
+    assert warmup.ready
+    assert warmup.steps["roles"]["items"] == 3
+    assert warmup.steps["broken"]["status"] == "failed"
+    assert warmup.steps["slow"]["status"] == "ok"
+    assert warmup.steps["late"] == {"status": "skipped"}
+
+
+def test_warmup_is_ready_once_budget_runs_out() -> None:
+    warmup = Warmup()
+    warmup.deadline = time.monotonic() - 1
+    assert warmup.ready and not warmup.done.is_set()
+
+
+def test_sampled_product_reads_are_scaled_up() -> None:
+    id = uuid.uuid4()
+    key = _access_key(int(time.time() // 3600))
+    record_product_access(id, sample_rate=0)
+    assert redis_client.zscore(key, str(id)) is None
+    record_product_access(id, sample_rate=0.25)
+    record_product_access(id, sample_rate=1)
+    # A sampled read at a quarter rate stands for four reads
+    assert redis_client.zscore(key, str(id)) in (1, 5)
+    redis_client.zincrby(key, 1e9, str(id))
+    assert hot_product_ids(1) == [id]
+    redis_client.zrem(key, str(id))
@@ -0,0 +1,147 @@
+"""
+Redis-bitmap Bloom filter.
+
+A "no" from might_contain() is certain, so lookups for keys that were never
+added can be answered without touching the database; a "yes" may be a
+false positive and still needs the real query. The filter is rebuilt from
+the source of truth into a side key and swapped in with RENAME, and add()
+writes to both keys while a rebuild runs so nothing added meanwhile is lost.
+add() only sets bits in keys that exist: a filter that was never built (or
+was flushed) must stay missing, not become a filter of the few values added
+since, which would answer "no" for everything else. One rebuild runs at a
+time, under a lock.
+"""
+import hashlib
+from collections.abc import Iterable
+
+from redis.exceptions import RedisError
+
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+from app.utils.single_flight import RedisLock
+
+# SETBIT on each of the filter and the side key that exists
+_ADD_IF_EXISTS_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        for _, offset in ipairs(ARGV) do
+            redis.call('setbit', key, offset, 1)
+        end
+    end
+end
+return 0
+"""
+
+# Swap the side key in only while the rebuild still holds the lock: a rebuild
+# whose lock expired may have had its side key replaced by a newer one
+_SWAP_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('rename', KEYS[2], KEYS[3])
+redis.call('set', KEYS[4], ARGV[2])
+redis.call('del', KEYS[1])
+return 1
+"""
+
+
+class BloomFilter:
+    """
+    Args:
+        name: Redis key of the bitmap
+        bits: Size of the bitmap; about 10 bits per expected item gives a 1%
+            false positive rate with 7 hashes
+        hashes: Number of bit positions per item
+    """
+
+    def __init__(self, name: str, bits: int, hashes: int) -> None:
+        self.key = f"bloom:{name}"
+        self.building_key = f"{self.key}:next"
+        self.lock_key = f"{self.key}:rebuild"
+        # Number of values of the last rebuild, set with the swap
+        self.built_key = f"{self.key}:built"
+        self.bits = bits
+        self.hashes = hashes
+
+    def _offsets(self, value: str) -> list[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def might_contain(self, value: str) -> bool:
+        """
+        False only when value was certainly never added. Until the filter has
+        been built, and when Redis is unavailable, every value might exist.
+        """
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.exists(self.key)
+            for offset in self._offsets(value):
+                pipeline.getbit(self.key, offset)
+            built, *bits = pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Bloom filter {self.key} unavailable: {e}")
+            return True
+        return not built or all(bits)
+
+    def built(self) -> bool:
+        """
+        Whether the filter exists and was made by a rebuild, rather than left
+        over from before add() checked for it.
+        """
+        try:
+            return redis_client.exists(self.key, self.built_key) == 2
+        except RedisError:
+            return False
+
+    def add(self, value: str) -> None:
+        """
+        Add value to the filter, and to the side key while a rebuild runs.
+        Does nothing until the filter has been built.
+        """
+        try:
+            redis_client.eval(_ADD_IF_EXISTS_SCRIPT, 2, self.key, self.building_key, *self._offsets(value))
+        except RedisError as e:
+            logger.error(f"Bloom filter {self.key} add failed: {e}")
+
+    def start_rebuild(self, ttl_ms: int = 300_000) -> RedisLock | None:
+        """
+        Take the rebuild lock and create the side key. Call before reading the
+        source of truth, so values added after that read also land in the new
+        filter.
+
+        Returns:
+            The lock to pass to finish_rebuild, None when another rebuild is running
+        """
+        lock = RedisLock(self.lock_key, ttl_ms)
+        if not lock.acquire():
+            return None
+        pipeline = redis_client.pipeline()
+        pipeline.delete(self.building_key)
+        pipeline.setbit(self.building_key, 0, 0)
+        pipeline.execute()
+        return lock
+
+    def finish_rebuild(self, lock: RedisLock, values: Iterable[str], batch_size: int = 10_000) -> int | None:
+        """
+        Add values to the side key and atomically swap it in, then release lock.
+
+        Returns:
+            Number of values added, None when the lock expired meanwhile and
+            the filter was left as it was
+        """
+        count = 0
+        pipeline = redis_client.pipeline(transaction=False)
+        for value in values:
+            for offset in self._offsets(value):
+                pipeline.setbit(self.building_key, offset, 1)
+            count += 1
+            if count % batch_size == 0:
+                pipeline.execute()
+        pipeline.execute()
+        if not redis_client.eval(_SWAP_SCRIPT, 4, lock.name, self.building_key, self.key, self.built_key, lock.token, count):
+            logger.warning(f"Bloom filter {self.key} rebuild lost its lock, discarded")
+            return None
+        return count
@@ -61,6 +61,118 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: str | None = None
 
+    # Bulk product import
+    PRODUCT_IMPORT_BATCH_SIZE: int = 5000
+    PRODUCT_IMPORT_MAX_ERRORS: int = 1000
+    # Supplier feed sync skips deletions when more than this share of the
+    # owner's catalog is missing from the feed (truncated or broken file)
+    PRODUCT_SYNC_MAX_DELETE_RATIO: float = 0.5
+    # Bulk repricing: rows written per UPDATE, and changes listed in a report
+    PRODUCT_REPRICE_BATCH_SIZE: int = 10_000
+    PRODUCT_REPRICE_DIFF_SIZE: int = 1000
+
+    # Max items per /products/batch request
+    PRODUCT_BATCH_MAX_ITEMS: int = 500
+    # Max ids per /products/lookup request
+    PRODUCT_LOOKUP_MAX_IDS: int = 100
+
+    # Rows fetched per round-trip by streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Redis response cache, TTLs in seconds
+    RESPONSE_CACHE_ENABLED: bool = True
+    PRODUCTS_LIST_CACHE_TTL: int = 60
+    PRODUCT_DETAIL_CACHE_TTL: int = 300
+    PRODUCT_FACETS_CACHE_TTL: int = 60
+
+    # Two-tier object cache: Redis (L2) TTL, in-process LRU (L1) size and TTL
+    OBJECT_CACHE_TTL: int = 600
+    OBJECT_CACHE_L1_SIZE: int = 10_000
+    OBJECT_CACHE_L1_TTL: float = 30.0
+    # Stale entries are kept this much longer and served while one worker,
+    # holding a short Redis lock, reloads them
+    OBJECT_CACHE_STALE_TTL: int = 60
+    OBJECT_CACHE_LOCK_TTL_MS: int = 2000
+    # How long a worker without the lock waits for the holder before loading itself
+    OBJECT_CACHE_LOCK_WAIT: float = 0.5
+    # Seconds a lookup that matched no row is remembered
+    NEGATIVE_CACHE_TTL: int = 30
+    # Bloom filter of registered emails, about 1% false positives at 1.7M users
+    EMAIL_FILTER_BITS: int = 1 << 24
+    EMAIL_FILTER_HASHES: int = 7
+
+    # Startup warm-up: readiness reports not-ready until it finishes, or
+    # until the time budget (seconds) runs out
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIME_BUDGET: float = 15.0
+    WARMUP_TOP_PRODUCTS: int = 1000
+    PRODUCT_ACCESS_WINDOW_HOURS: int = 24
+    # Share of product reads counted; each sampled read counts 1/rate, so
+    # the ranking holds while most reads skip Redis
+    PRODUCT_ACCESS_SAMPLE_RATE: float = 0.05
+
+    # Product change feed: default page size, and days tombstones of deleted
+    # products (and so sync cursors) stay valid
+    PRODUCT_CHANGES_PAGE_SIZE: int = 1000
+    PRODUCT_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Upper bounds of the price band facet; prices at or above the last
+    # bound make the open-ended top band
+    PRODUCT_PRICE_BANDS: list[int] = [5, 10, 20, 50, 100, 200]
+
+    # Memory-mapped catalog snapshot shared by the workers of a host: file
+    # path, and seconds between rebuilds (when products changed)
+    CATALOG_SNAPSHOT_ENABLED: bool = True
+    CATALOG_SNAPSHOT_PATH: str = "/tmp/drughub/catalog.snapshot"
+    CATALOG_SNAPSHOT_INTERVAL: float = 60.0
+
+    # Checkout limits
+    ORDER_MAX_ITEMS: int = 100
+    ORDER_MAX_QUANTITY: int = 1000
+    # Idempotency-Key results are replayed for this long (seconds); a request
+    # still running after IDEMPOTENCY_LOCK_TTL no longer blocks retries
+    IDEMPOTENCY_TTL: int = 24 * 3600
+    IDEMPOTENCY_LOCK_TTL: int = 60
+    # Monthly order partitions created in advance, and months kept attached
+    # (0 keeps all)
+    ORDER_PARTITIONS_AHEAD: int = 3
+    ORDER_PARTITION_RETENTION_MONTHS: int = 36
+    # Default window of the order history list, in days
+    ORDER_HISTORY_DAYS: int = 365
+
+    # Outbox relay to Redis Streams: rows per batch, idle poll interval
+    # (seconds) and approximate entries kept per stream
+    EVENT_RELAY_BATCH_SIZE: int = 500
+    EVENT_RELAY_INTERVAL: float = 0.5
+    EVENT_STREAM_MAXLEN: int = 1_000_000
+    # Consumers reclaim messages left unacknowledged this long (ms) by a
+    # crashed worker, and dead-letter them after this many deliveries
+    EVENT_CLAIM_IDLE_MS: int = 60_000
+    EVENT_MAX_DELIVERIES: int = 5
+
+    # WebSocket gateway: messages buffered per connection before a client
+    # too slow to read them is disconnected, and topics one connection may follow
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_MAX_TOPICS: int = 50
+    # Server-Sent Events: notifications kept per user for Last-Event-ID
+    # resume and for how long (seconds), seconds of silence before a
+    # heartbeat, and open event streams per worker
+    SSE_BACKLOG_SIZE: int = 500
+    SSE_BACKLOG_TTL: int = 3600
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    SSE_MAX_CONNECTIONS: int = 1000
+
+    # Stock shards per product, more for hot products
+    INVENTORY_MAX_SHARDS: int = 64
+    # Seconds stock stays held for a reservation before the reaper returns it
+    INVENTORY_RESERVATION_TTL: int = 900
+    INVENTORY_REAPER_INTERVAL: float = 5.0
+    INVENTORY_REAPER_BATCH_SIZE: int = 500
+
+    # Drug interaction dataset (CSV or NDJSON of ingredient pairs), unset to
+    # disable interaction checks, and seconds between checks for a new file
+    INTERACTIONS_DATASET_PATH: str | None = None
+    INTERACTIONS_RELOAD_INTERVAL: float = 5.0
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -1,9 +1,9 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import cache
 from pathlib import Path
 from typing import Any
 
-
 import emails  # type: ignore
 import jwt
 from jinja2 import Template
@@ -20,11 +20,29 @@ class EmailData:
     subject: str
 
 
+TEMPLATES_DIR = Path(__file__).parent.parent / "email-templates" / "build"
+
+
+@cache
+def get_email_template(template_name: str) -> Template:
+    """
+    Read and compile a template once per worker.
+    """
+    return Template((TEMPLATES_DIR / template_name).read_text())
+
+
+def compile_email_templates() -> int:
+    """
+    Compile every built template ahead of the first email, returns how many.
+    """
+    names = [path.name for path in TEMPLATES_DIR.glob("*.html")]
+    for name in names:
+        get_email_template(name)
+    return len(names)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    html_content = get_email_template(template_name).render(context)
     return html_content
 
 
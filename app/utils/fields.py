@@ -0,0 +1,63 @@
+"""
+Sparse fieldsets for list endpoints (?fields=id,title).
+
+The requested fields are selected as plain columns, so no ORM objects are
+hydrated, and the rows are serialized with a schema holding only those
+fields. Schemas are built once per (model, fields) pair and cached.
+"""
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    """
+    Validate a comma separated field list against a response model.
+
+    Returns:
+        The requested fields in the model's declaration order, so the same
+        set always maps to the same cached schema, or None when not given
+    Raises:
+        HTTPException: On unknown fields
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+@lru_cache(maxsize=256)
+def projection_adapter(model: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter[Any]:
+    """
+    Build the {"data": [...], "count": n} page schema for a subset of fields.
+    """
+    name = f"{model.__name__}[{','.join(fields)}]"
+    row = TypedDict(name, {field: model.model_fields[field].annotation for field in fields})  # type: ignore[misc]
+
+    class Page(TypedDict):
+        data: list[row]
+        count: int
+
+    Page.__name__ = Page.__qualname__ = f"{name}Page"
+    return TypeAdapter(Page)
+
+
+def projection_response(
+    model: type[BaseModel], fields: tuple[str, ...], rows: Sequence[Row], count: int
+) -> Response:
+    """
+    Serialize column rows straight to a JSON response with the cached schema.
+    """
+    adapter = projection_adapter(model, fields)
+    content = adapter.dump_json({"data": [row._asdict() for row in rows], "count": count})
+    return Response(content=content, media_type="application/json")
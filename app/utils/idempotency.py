@@ -0,0 +1,116 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+The first request with a key claims it in Redis, runs, and stores its
+response for IDEMPOTENCY_TTL; retries with the same key and body get the
+stored response back without running the handler again. A retry that
+arrives while the first request is still running gets a 409, and reusing a
+key for a different body is rejected with a 422.
+"""
+import hashlib
+from collections.abc import Callable
+from contextlib import suppress
+from typing import Annotated, Any
+
+import orjson
+from fastapi import Header, HTTPException, Response
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+from app.utils.responses import FastJSONResponse
+
+IdempotencyKey = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    """
+    Hash of a request body; retries with a key must send the same one.
+    """
+    body = orjson.dumps(payload.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _replay(stored: dict[str, Any], fingerprint: str) -> Response:
+    if stored["state"] == "processing":
+        raise HTTPException(
+            status_code=409, detail="A request with this Idempotency-Key is still being processed"
+        )
+    if stored["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different request"
+        )
+    return Response(
+        content=stored["body"],
+        status_code=stored["status_code"],
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def run_idempotent(
+    scope: str,
+    key: str | None,
+    payload: BaseModel,
+    handler: Callable[[], BaseModel],
+    status_code: int = 200,
+) -> Response:
+    """
+    Run handler at most once per (scope, key) and replay its response.
+
+    Args:
+        scope: Namespace of the key, e.g. "orders:<user id>", so clients can't collide
+        key: Idempotency-Key header value; without one the handler just runs
+        payload: Request body, retries must send the same one
+        handler: Does the work and returns the response model
+        status_code: Status of the fresh response
+    Raises:
+        HTTPException: 409 while the first request runs, 422 on a reused key
+    """
+    if key is None:
+        return FastJSONResponse(handler().model_dump(mode="json"), status_code=status_code)
+
+    redis_key = f"idem:{scope}:{key}"
+    fingerprint = request_fingerprint(payload)
+    try:
+        claimed = redis_client.set(
+            redis_key,
+            orjson.dumps({"state": "processing", "fingerprint": fingerprint}),
+            nx=True,
+            ex=settings.IDEMPOTENCY_LOCK_TTL,
+        )
+        stored = None if claimed else redis_client.get(redis_key)
+    except RedisError as e:
+        # Handlers keep their own durable guard, e.g. a unique key column
+        logger.error(f"Idempotency store unavailable, running {redis_key} unguarded: {e}")
+        return FastJSONResponse(handler().model_dump(mode="json"), status_code=status_code)
+
+    if not claimed:
+        if stored is None:
+            # Expired between SET and GET, treat as still in flight
+            stored = orjson.dumps({"state": "processing"})
+        return _replay(orjson.loads(stored), fingerprint)
+
+    try:
+        response = FastJSONResponse(handler().model_dump(mode="json"), status_code=status_code)
+    except BaseException:
+        # Failed requests can be retried with the same key
+        with suppress(RedisError):
+            redis_client.delete(redis_key)
+        raise
+
+    record = {
+        "state": "done",
+        "fingerprint": fingerprint,
+        "status_code": status_code,
+        "body": bytes(response.body).decode(),
+    }
+    try:
+        redis_client.set(redis_key, orjson.dumps(record), ex=settings.IDEMPOTENCY_TTL)
+    except RedisError as e:
+        logger.error(f"Idempotent response for {redis_key} not stored: {e}")
+    return response
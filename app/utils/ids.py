@@ -0,0 +1,33 @@
+"""
+Time-ordered UUIDs (version 7, RFC 9562).
+
+The first 48 bits are the creation time in Unix milliseconds, so ids of
+rows in time-partitioned tables tell which partition the row is in, and a
+lookup by id alone can still be pruned to a single partition.
+"""
+import secrets
+import uuid
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def uuid7(at: datetime) -> uuid.UUID:
+    """
+    New random UUIDv7 for the naive UTC time at.
+    """
+    ms = (at - _EPOCH) // timedelta(milliseconds=1)
+    value = (ms & (1 << 48) - 1) << 80 | secrets.randbits(80)
+    # Version 7 and the RFC 4122 variant
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return uuid.UUID(int=value)
+
+
+def uuid7_time(id: uuid.UUID) -> datetime | None:
+    """
+    Millisecond the id was created at, as naive UTC; None for other UUID versions.
+    """
+    if id.version != 7:
+        return None
+    return _EPOCH + timedelta(milliseconds=id.int >> 80)
@@ -0,0 +1,391 @@
+"""
+Two-tier cache for rows fetched by primary key.
+
+Lookups go through a bounded in-process LRU (L1) first, then Redis (L2), and
+only reach Postgres when both miss. Writes call invalidate(), which drops
+the local and Redis entries and publishes the keys on a pub/sub channel so
+every other worker evicts its L1 copy too. L1 entries also expire after
+OBJECT_CACHE_L1_TTL, which bounds staleness if a message is ever lost.
+
+Misses are coalesced: concurrent callers in a worker share one load, and
+across workers a short Redis lock elects the one that reloads an expired
+entry while the others keep serving the stale copy (stale-while-revalidate).
+
+Ids that don't exist are cached too, for NEGATIVE_CACHE_TTL, so repeated
+lookups of missing rows (scrapers, stale links) don't reach Postgres.
+
+Cached objects are detached copies: use them for reads, and session.get()
+for rows that are about to be modified. A cache can store a view of the row
+(a model with a subset of its fields) instead of the row itself, to keep
+columns such as credentials out of Redis.
+"""
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any, Generic, TypeVar
+
+import orjson
+from redis.client import PubSubWorkerThread
+from redis.exceptions import RedisError
+from sqlmodel import Session, SQLModel
+
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+from app.utils.single_flight import RedisLock, SingleFlight
+
+T = TypeVar("T", bound=SQLModel)
+
+INVALIDATION_CHANNEL = "oc:invalidate"
+
+
+class CacheStats:
+    """
+    Hit/miss counters of one cache.
+    """
+
+    def __init__(self) -> None:
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Callers that shared another caller's load, and stale L2 entries served
+        # while another worker refreshed them
+        self.coalesced = 0
+        self.stale_hits = 0
+        # Lookups answered from a cached "does not exist"
+        self.negative_hits = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return dict(vars(self))
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU with a per-entry TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stats: CacheStats) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = stats
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ObjectCache(Generic[T]):
+    """
+    L1/L2 cache of one table model, keyed by primary key.
+
+    Args:
+        name: Cache name, used in Redis keys, invalidation messages and metrics
+        model: Table model to cache
+        ttl: Seconds an entry is fresh; Redis keeps it OBJECT_CACHE_STALE_TTL
+            longer to serve while it is being refreshed
+        view: Model the rows are stored and returned as, built from their
+            attributes; defaults to model
+    """
+
+    def __init__(
+        self, name: str, model: type[SQLModel], ttl: int | None = None, view: type[T] | None = None
+    ) -> None:
+        self.name = name
+        self.model = model
+        self.view: type[T] = view or model  # type: ignore[assignment]
+        self.ttl = ttl or settings.OBJECT_CACHE_TTL
+        self.stats = CacheStats()
+        self.local = LRUCache(settings.OBJECT_CACHE_L1_SIZE, settings.OBJECT_CACHE_L1_TTL, self.stats)
+        self._flight: SingleFlight[dict[str, Any] | None] = SingleFlight()
+        # Called with the evicted ids, or None when the cache is cleared, in
+        # this worker and in every other one
+        self.listeners: list[Callable[[Iterable[Any] | None], None]] = []
+        caches[name] = self
+
+    def _key(self, id: Any) -> str:
+        return f"oc:{self.name}:{id}"
+
+    def _dump(self, obj: SQLModel) -> dict[str, Any]:
+        if self.view is not self.model:
+            obj = self.view.model_validate(obj, from_attributes=True)
+        return obj.model_dump(mode="json")
+
+    def _l2_get(self, key: str) -> tuple[dict[str, Any] | None, bool]:
+        """
+        Return the L2 data for key and whether it is still fresh.
+        """
+        try:
+            raw = redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Object cache {self.name} read failed: {e}")
+            return None, False
+        if not raw:
+            return None, False
+        entry = orjson.loads(raw)
+        return entry["data"], entry["fresh_until"] > time.time()
+
+    def _l2_set(self, key: str, data: dict[str, Any] | None) -> None:
+        """
+        Store data, or None to record that the row doesn't exist.
+        """
+        if data is None:
+            ttl = stale_ttl = settings.NEGATIVE_CACHE_TTL
+        else:
+            ttl, stale_ttl = self.ttl, self.ttl + settings.OBJECT_CACHE_STALE_TTL
+        entry = {"data": data, "fresh_until": time.time() + ttl}
+        try:
+            redis_client.set(key, orjson.dumps(entry), ex=stale_ttl)
+        except RedisError as e:
+            logger.warning(f"Object cache {self.name} write failed: {e}")
+
+    def _wait_for_refresh(self, key: str) -> dict[str, Any] | None:
+        """
+        Poll L2 while another worker holds the reload lock.
+        """
+        deadline = time.monotonic() + settings.OBJECT_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.02)
+            data, fresh = self._l2_get(key)
+            if fresh:
+                return data
+        return None
+
+    def _load(self, key: str, loader: Callable[[], SQLModel | None]) -> dict[str, Any] | None:
+        """
+        Fill one key from L2 or the loader. Runs once per key per worker at a time.
+        """
+        data, fresh = self._l2_get(key)
+        if fresh:
+            if data is None:
+                self.stats.negative_hits += 1
+            else:
+                self.stats.l2_hits += 1
+            self.local.set(key, data)
+            return data
+
+        lock = RedisLock(f"{key}:lock", settings.OBJECT_CACHE_LOCK_TTL_MS)
+        locked = lock.acquire()
+        if not locked:
+            # Another worker is reloading: serve the stale copy, or wait for its result
+            if data is not None:
+                self.stats.stale_hits += 1
+                return data
+            data = self._wait_for_refresh(key)
+            if data is not None:
+                self.stats.l2_hits += 1
+                self.local.set(key, data)
+                return data
+
+        try:
+            self.stats.misses += 1
+            obj = loader()
+            data = self._dump(obj) if obj is not None else None
+            self._l2_set(key, data)
+            self.local.set(key, data)
+            return data
+        finally:
+            if locked:
+                lock.release()
+
+    def get_or_load(self, id: Any, loader: Callable[[], SQLModel | None]) -> T | None:
+        """
+        Return the cached object for id, calling loader on a miss.
+        """
+        key = self._key(id)
+        found, data = self.local.get(key)
+        if found:
+            if data is None:
+                self.stats.negative_hits += 1
+                return None
+            self.stats.l1_hits += 1
+            return self.view.model_validate(data)
+
+        data, shared = self._flight.do(key, lambda: self._load(key, loader))
+        if shared:
+            self.stats.coalesced += 1
+        return self.view.model_validate(data) if data is not None else None
+
+    def get(self, session: Session, id: Any) -> T | None:
+        """
+        Cached session.get(model, id).
+        """
+        return self.get_or_load(id, lambda: session.get(self.model, id))
+
+    def prime(self, objs: Iterable[SQLModel], id_field: str = "id") -> int:
+        """
+        Fill L1 and L2 with rows loaded in bulk, e.g. during warm-up.
+
+        Returns:
+            Number of rows cached
+        """
+        entries = {self._key(getattr(obj, id_field)): self._dump(obj) for obj in objs}
+        for key, data in entries.items():
+            self.local.set(key, data)
+        if entries:
+            fresh_until = time.time() + self.ttl
+            try:
+                pipeline = redis_client.pipeline(transaction=False)
+                for key, data in entries.items():
+                    entry = orjson.dumps({"data": data, "fresh_until": fresh_until})
+                    pipeline.set(key, entry, ex=self.ttl + settings.OBJECT_CACHE_STALE_TTL)
+                pipeline.execute()
+            except RedisError as e:
+                logger.warning(f"Object cache {self.name} prime failed: {e}")
+        return len(entries)
+
+    def evict_local(self, *ids: Any) -> None:
+        for id in ids:
+            self.local.delete(self._key(id))
+        for listener in self.listeners:
+            listener(ids)
+
+    def clear_local(self) -> None:
+        self.local.clear()
+        for listener in self.listeners:
+            listener(None)
+
+    def invalidate(self, *ids: Any) -> None:
+        """
+        Drop ids from every tier and every worker. Call after the write is committed.
+        """
+        if not ids:
+            return
+        self.stats.invalidations += len(ids)
+        self.evict_local(*ids)
+        try:
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.delete(*(self._key(id) for id in ids))
+            pipeline.publish(
+                INVALIDATION_CHANNEL, orjson.dumps({"cache": self.name, "ids": [str(id) for id in ids]})
+            )
+            pipeline.execute()
+        except RedisError as e:
+            logger.error(f"Object cache {self.name} invalidation failed: {e}")
+
+    def clear(self) -> None:
+        """
+        Drop every entry of this cache, for bulk writes (imports, feed syncs)
+        that don't know which rows they touched. Scans the Redis keyspace, so
+        prefer invalidate() when the ids are known.
+        """
+        self.stats.invalidations += 1
+        self.clear_local()
+        try:
+            keys = list(redis_client.scan_iter(match=self._key("*"), count=1000))
+            for start in range(0, len(keys), 1000):
+                redis_client.delete(*keys[start:start + 1000])
+            redis_client.publish(INVALIDATION_CHANNEL, orjson.dumps({"cache": self.name, "all": True}))
+        except RedisError as e:
+            logger.error(f"Object cache {self.name} invalidation failed: {e}")
+
+
+caches: dict[str, ObjectCache[Any]] = {}
+
+
+class NegativeCache:
+    """
+    Short-lived Redis record of lookup keys known to match no row, for
+    lookups that don't go by primary key (e.g. users by email).
+
+    discard() leaves a marker instead of deleting the entry, and add() never
+    overwrites one, so a lookup that missed just before the row was created
+    can't record the miss after it.
+    """
+
+    def __init__(self, name: str, ttl: int | None = None) -> None:
+        self.name = name
+        self.ttl = ttl or settings.NEGATIVE_CACHE_TTL
+
+    def _key(self, value: str) -> str:
+        return f"neg:{self.name}:{value}"
+
+    def contains(self, value: str) -> bool:
+        try:
+            return redis_client.get(self._key(value)) == "1"
+        except RedisError as e:
+            logger.warning(f"Negative cache {self.name} unavailable: {e}")
+            return False
+
+    def add(self, value: str) -> None:
+        try:
+            redis_client.set(self._key(value), 1, ex=self.ttl, nx=True)
+        except RedisError as e:
+            logger.warning(f"Negative cache {self.name} write failed: {e}")
+
+    def discard(self, value: str) -> None:
+        """
+        Forget a miss, e.g. once the row has been created, and keep misses
+        of value from being recorded for the next ttl seconds.
+        """
+        try:
+            redis_client.set(self._key(value), 0, ex=self.ttl)
+        except RedisError as e:
+            logger.error(f"Negative cache {self.name} invalidation failed: {e}")
+
+
+def _on_invalidation(message: dict[str, Any]) -> None:
+    try:
+        payload = orjson.loads(message["data"])
+        cache = caches.get(payload["cache"])
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        logger.warning(f"Ignoring malformed cache invalidation: {message.get('data')!r}")
+        return
+    if cache is None:
+        return
+    if payload.get("all"):
+        cache.clear_local()
+    else:
+        cache.evict_local(*payload.get("ids", []))
+
+
+def start_invalidation_listener() -> PubSubWorkerThread | None:
+    """
+    Subscribe this worker to invalidations from other workers.
+    Returns the listener thread, or None when Redis is unavailable.
+    """
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: _on_invalidation})
+    except RedisError as e:
+        logger.error(f"Object cache invalidation listener not started: {e}")
+        return None
+    return pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Counters and L1 sizes of all caches.
+    """
+    return {name: {**cache.stats.as_dict(), "l1_size": len(cache.local)} for name, cache in caches.items()}
@@ -1,8 +1,13 @@
 from datetime import datetime
 from app.utils.config import settings
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
 redis_client = Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB, decode_responses=True)
+# For code running on the event loop, e.g. the WebSocket gateway
+async_redis_client = AsyncRedis(
+    host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB, decode_responses=True
+)
 
 async def set_redis_key(key: str, value: str, expiration: int = 3600) -> None:
     """
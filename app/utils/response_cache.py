@@ -0,0 +1,139 @@
+"""
+Redis-backed HTTP response cache with ETags.
+
+Cache keys combine the route and query string with a permission scope, so
+verified users and owners never share a cached view. Every key also embeds
+the current version of its tags; invalidating a tag is a single INCR, and
+entries built for older versions are simply never read again and expire
+with their TTL.
+
+Usage in a route:
+
+    key = response_cache.build_key(request, user_scope(current_user), tags=("products",))
+    if cached := response_cache.get(request, key):
+        return cached
+    ...
+    return response_cache.put(request, key, response, ttl=settings.PRODUCTS_LIST_CACHE_TTL)
+"""
+import hashlib
+from collections.abc import Iterable
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from redis.exceptions import RedisError
+
+from app.models import AuthUser
+from app.utils.config import settings
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+
+KEY_PREFIX = "rc"
+
+
+def user_scope(current_user: AuthUser) -> str:
+    """
+    Permission scope of a cached response: verified users see every product,
+    others only their own.
+    """
+    return "all" if current_user.is_verified else f"owner:{current_user.id}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _respond(request: Request, body: bytes, etag: str, media_type: str, status: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Cache": status}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def build_key(
+    request: Request, scope: str, tags: Iterable[str], query: str | None = None
+) -> str | None:
+    """
+    Build the cache key of a request, or None when the cache is unavailable.
+
+    Args:
+        request: Incoming request, its path and sorted query string are hashed
+        scope: Permission scope, see user_scope
+        tags: Tags the response depends on, e.g. "products" or "product:<id>"
+        query: Normalized query to hash instead of the query string, so
+            requests that differ only in spelling share an entry
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    tags = list(tags)
+    try:
+        versions = redis_client.mget([_tag_key(tag) for tag in tags])
+    except RedisError as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return None
+    if query is None:
+        query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(f"{request.url.path}?{query}".encode(), digest_size=16).hexdigest()
+    version = ".".join(value or "0" for value in versions)
+    return f"{KEY_PREFIX}:{scope}:{version}:{digest}"
+
+
+def get(request: Request, key: str | None) -> Response | None:
+    """
+    Return the cached response (or a 304) for a key, None on a miss.
+    """
+    if key is None:
+        return None
+    try:
+        entry = redis_client.hgetall(key)
+    except RedisError as e:
+        logger.warning(f"Response cache read failed: {e}")
+        return None
+    if not entry:
+        return None
+    return _respond(request, entry["body"].encode(), entry["etag"], entry["media_type"], "HIT")
+
+
+def put(request: Request, key: str | None, response: Response, ttl: int) -> Response:
+    """
+    Store a freshly built 200 response and return it with its ETag set.
+    """
+    body = bytes(response.body)
+    etag = _etag(body)
+    media_type = response.media_type or "application/json"
+    if key is not None and response.status_code == 200:
+        try:
+            pipeline = redis_client.pipeline()
+            pipeline.hset(key, mapping={"body": body.decode(), "etag": etag, "media_type": media_type})
+            pipeline.expire(key, ttl)
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning(f"Response cache write failed: {e}")
+    return _respond(request, body, etag, media_type, "MISS")
+
+
+def invalidate(*tags: str) -> None:
+    """
+    Invalidate every cached response that depends on one of the tags.
+    Call after the write is committed.
+    """
+    if not tags:
+        return
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        for tag in tags:
+            pipeline.incr(_tag_key(tag))
+        pipeline.execute()
+    except RedisError as e:
+        logger.error(f"Response cache invalidation failed for {tags}: {e}")
@@ -0,0 +1,81 @@
+"""
+Fast response serialization.
+
+Routes normally return ORM objects, which FastAPI validates again through
+response_model before JSON encoding. List routes instead select the response
+columns as plain tuples and return a FastJSONResponse: FastAPI skips
+response_model validation for Response instances and orjson encodes UUIDs
+and datetimes natively.
+"""
+import gzip
+from collections.abc import Sequence
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Row
+from sqlmodel import SQLModel
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson-backed response for data that is already valid, e.g. rows straight
+    from SQL. Keep response_model on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class CompressedJSONResponse(FastJSONResponse):
+    """
+    FastJSONResponse gzipped when the client accepts it and the body is big
+    enough to gain from it.
+    """
+
+    min_size = 512
+
+    def __init__(self, content: Any, accept_encoding: str | None = None, **kwargs: Any) -> None:
+        self.accepts_gzip = "gzip" in (accept_encoding or "")
+        self.compressed = False
+        super().__init__(content, **kwargs)
+        self.headers["Vary"] = "Accept-Encoding"
+        if self.compressed:
+            self.headers["Content-Encoding"] = "gzip"
+
+    def render(self, content: Any) -> bytes:
+        body = super().render(content)
+        if self.accepts_gzip and len(body) >= self.min_size:
+            self.compressed = True
+            return gzip.compress(body, compresslevel=6, mtime=0)
+        return body
+
+
+def _default(value: Any) -> Any:
+    # Decimals are rendered as strings, like pydantic does for response_model routes
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def response_columns(table: type[SQLModel], model: type[BaseModel]) -> list[Any]:
+    """
+    Columns of a table model matching the fields of a response model.
+    """
+    return [getattr(table, name) for name in model.model_fields]
+
+
+def rows_to_dicts(rows: Sequence[Row]) -> list[dict[str, Any]]:
+    """
+    Build response rows from SQL result tuples without model instances.
+    """
+    return [row._asdict() for row in rows]
+
+
+def page_response(rows: Sequence[Row], count: int) -> FastJSONResponse:
+    """
+    {"data": [...], "count": n} list response straight from result tuples.
+    """
+    return FastJSONResponse({"data": rows_to_dicts(rows), "count": count})
@@ -4,7 +4,7 @@ import jwt
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError,InvalidSignatureError
 from passlib.context import CryptContext
 from app.utils.database import SessionDep 
-from sqlmodel import select,Session
+from sqlmodel import Session
 from collections.abc import Callable
 from app.utils.config import settings
 from app.models import AuthUser, TokenPayload  
@@ -13,6 +13,7 @@ from fastapi.security import OAuth2PasswordBearer
 from pydantic import  ValidationError
 from sqlalchemy import text
 from app.utils.logging_utitl import logger
+from app.apis.users.cache import role_cache, user_cache
 
 
 # Password hashing context
@@ -91,12 +92,12 @@ def get_user_permissions(user_id: str, session: SessionDep) -> List[str]:
     Returns:
         List of unique permissions
     """
-    # Fetch user
-    user = session.get(User, user_id)
+    # Fetch user and roles through the object cache
+    user = user_cache.get(session, user_id)
     if not user or not user.role_ids:
         return []
-    # Fetch roles and combine permissions
-    roles = session.exec(select(Role).where(Role.id.in_(user.role_ids))).all()
+    roles = [role for role in (role_cache.get(session, role_id) for role_id in user.role_ids) if role]
+    # Combine permissions
     permissions = list({perm for role in roles for perm in role.permissions})  # Deduplicate
     return permissions
 
@@ -172,17 +173,21 @@ def get_current_user(
             detail="Invalid token signature",
         )
         
-    table_name = "public.user"  # Replace with your actual table name
+    # Fetch user details through the object cache, so hot tokens don't query Postgres
+    # A token outliving its user (deleted since) no longer authenticates anyone
+    user = user_cache.get(session, token_data.sub)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User no longer exists",
+        )
 
-    # Fetch user details if a function is provided, otherwise use token data
-    # Use raw SQL with string table name to fetch status fields
-    query = text(f"SELECT is_verified FROM {table_name} WHERE id = :id")
-    result = session.execute(query, {"id": token_data.sub}).mappings().fetchone()
-    
     auth_user = AuthUser(
         id=token_data.sub,
+        user_name=user.user_name,
+        email=user.email,
         permissions=token_data.permissions,
-        is_verified=result["is_verified"] if result else False
+        is_verified=user.is_verified,
     )
     
     if not auth_user.is_active:
@@ -214,4 +219,5 @@ def get_current_active_superuser(current_user: CurrentUser) -> AuthUser:
 # Example usage in endpoint dependencies
 RequireEditProduct = Annotated[AuthUser, Depends(require_permissions(["edit_products"]))]
 RequireViewOrder = Annotated[AuthUser, Depends(require_permissions(["view_orders"]))]
+RequireCreateOrder = Annotated[AuthUser, Depends(require_permissions(["create_orders"]))]
 RequireViewProfile = Annotated[AuthUser, Depends(require_permissions(["view_profile"]))]
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Request coalescing for cache misses.
+
+SingleFlight lets one thread per key run a load while concurrent callers
+for the same key wait for its result. RedisLock does the same across
+workers: only the holder of a short lock reloads an expired entry, the
+others serve the stale copy or wait briefly for the holder to fill it.
+"""
+import threading
+import uuid
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+from redis.exceptions import RedisError
+
+from app.utils.logging_utitl import logger
+from app.utils.redis_db import redis_client
+
+T = TypeVar("T")
+
+# Delete the lock only if it still holds our token, so a holder whose lock
+# expired mid-load can't release the next holder's lock
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Run at most one load per key at a time inside this worker.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> tuple[T, bool]:
+        """
+        Call fn, or wait for the call already in flight for key.
+
+        Returns:
+            fn's result and whether it was shared from another caller's call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class RedisLock:
+    """
+    Short non-blocking Redis lock, used to elect the one worker that reloads a key.
+    """
+
+    def __init__(self, name: str, ttl_ms: int) -> None:
+        self.name = name
+        self.ttl_ms = ttl_ms
+        self.token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        """
+        Take the lock. When Redis is down every worker acts as the holder.
+        """
+        try:
+            return bool(redis_client.set(self.name, self.token, nx=True, px=self.ttl_ms))
+        except RedisError as e:
+            logger.warning(f"Lock {self.name} unavailable: {e}")
+            return True
+
+    def release(self) -> None:
+        try:
+            redis_client.eval(_RELEASE_SCRIPT, 1, self.name, self.token)
+        except RedisError as e:
+            logger.warning(f"Lock {self.name} release failed: {e}")
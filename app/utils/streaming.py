@@ -0,0 +1,113 @@
+"""
+Streaming exports.
+
+Rows are read through a server-side cursor (yield_per / stream_results) and
+serialized partition by partition, so memory stays flat no matter how many
+rows are exported.
+"""
+import csv
+import io
+import json
+import uuid
+import zlib
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, Select
+from sqlmodel import Session
+
+from app.utils.config import settings
+from app.utils.database import engine
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID | Decimal):
+        return str(value)
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stream_partitions(statement: Select, yield_per: int = settings.EXPORT_BATCH_SIZE) -> Iterator[Sequence[Row]]:
+    """
+    Execute a select on a server-side cursor and yield its rows in partitions.
+
+    Opens its own session: the request session is closed before a streaming
+    response body is sent.
+    """
+    with Session(engine) as session:
+        result = session.execute(statement.execution_options(yield_per=yield_per))
+        yield from result.partitions()
+
+
+def iter_ndjson(partitions: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    """
+    Serialize row partitions to newline delimited JSON, one chunk per partition.
+    """
+    for rows in partitions:
+        yield "".join(
+            json.dumps(row._asdict(), default=_json_default, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+
+def iter_csv(partitions: Iterator[Sequence[Row]], columns: Sequence[str]) -> Iterator[bytes]:
+    """
+    Serialize row partitions to CSV with a header line, one chunk per partition.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks into a single gzip stream.
+    """
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(
+    statement: Select, fmt: ExportFormat, filename: str, gzip: bool = False
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse that exports the rows of a select as NDJSON or CSV.
+
+    Args:
+        statement: Column select to export, its column labels become the field names
+        fmt: "ndjson" or "csv"
+        filename: Download file name without extension
+        gzip: Compress the body (sent with Content-Encoding: gzip)
+    """
+    partitions = stream_partitions(statement)
+    if fmt == "csv":
+        chunks = iter_csv(partitions, [column.name for column in statement.selected_columns])
+    else:
+        chunks = iter_ndjson(partitions)
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
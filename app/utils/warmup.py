@@ -0,0 +1,67 @@
+"""
+Startup cache warm-up.
+
+Steps run in order in a background thread when a worker starts, each with
+its own database session and the shared deadline, so the worker can answer
+liveness probes while readiness stays false until warm-up is done. Steps
+check the deadline between batches; a step that overruns it anyway doesn't
+hold readiness back past the budget.
+"""
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlmodel import Session
+
+from app.utils.database import engine
+from app.utils.logging_utitl import logger
+
+# (session, deadline as time.monotonic()) -> number of items warmed
+WarmupStep = Callable[[Session, float], int]
+
+
+class Warmup:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.deadline: float | None = None
+        self.steps: dict[str, dict[str, Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        if self.done.is_set():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def run(self, steps: dict[str, WarmupStep], budget: float) -> None:
+        started = time.monotonic()
+        self.deadline = started + budget
+        for name, step in steps.items():
+            if time.monotonic() >= self.deadline:
+                self.steps[name] = {"status": "skipped"}
+                continue
+            step_started = time.monotonic()
+            try:
+                with Session(engine) as session:
+                    items = step(session, self.deadline)
+                result: dict[str, Any] = {"status": "ok", "items": items}
+            except Exception as e:
+                # A failed step leaves its cache cold, it doesn't block readiness
+                logger.error(f"Warm-up step {name} failed: {e}")
+                result = {"status": "failed", "error": str(e)}
+            result["seconds"] = round(time.monotonic() - step_started, 3)
+            self.steps[name] = result
+        logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s: {self.steps}")
+        self.done.set()
+
+    def start(self, steps: dict[str, WarmupStep], budget: float) -> threading.Thread:
+        self.deadline = time.monotonic() + budget
+        thread = threading.Thread(target=self.run, args=(steps, budget), name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def report(self) -> dict[str, Any]:
+        return {"ready": self.ready, "finished": self.done.is_set(), "steps": self.steps}
+
+
+warmup = Warmup()
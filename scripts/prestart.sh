@@ -11,4 +11,7 @@ alembic upgrade head
 
 # # Create initial data in DB
 # python app/initial_data.py
+
+# Catalog snapshot the workers share
+python -m app.scripts.build_catalog_snapshot
 exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8080} --workers 4